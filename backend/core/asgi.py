@@ -3,6 +3,9 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The Server-Sent Events endpoints (usability.events) need an ASGI server, and
+publish in-process: run a single worker, e.g. ``uvicorn core.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
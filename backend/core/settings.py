@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'usability.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -136,6 +137,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the frontend read how long admission control asks it to back off
+CORS_EXPOSE_HEADERS = ['Retry-After']
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -145,3 +149,53 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
 }
+
+# Cache used for dashboard reads; entries are keyed on the change feed's
+# high-water mark, so each server process can keep its own
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'usability',
+    }
+}
+
+# Seconds a cached dashboard read is kept; superseded reads are never served
+USABILITY_CACHE_TIMEOUT = 300
+
+# Route session update, completion and analytics to the native async views
+# (usability.async_views); enable when serving with an ASGI server such as
+# uvicorn, under WSGI (runserver) they only add a thread hop
+USABILITY_ASYNC_VIEWS = False
+
+# Commit metrics updates in batches from a single writer thread
+# (usability.group_commit), for SQLite under many concurrent sessions
+USABILITY_GROUP_COMMIT = False
+# How long the writer waits for more updates to join a batch, and the batch cap
+USABILITY_GROUP_COMMIT_WINDOW_MS = 5
+USABILITY_GROUP_COMMIT_MAX_BATCH = 200
+
+# Acknowledge metrics updates and completions once they are appended to a
+# local journal (usability.journal), and apply them to the database in the
+# background; replay with the replay_journal command after a crash
+USABILITY_JOURNAL = False
+USABILITY_JOURNAL_DIR = BASE_DIR / 'journal'
+# Size at which the journal starts a new segment file, and the number of
+# records applied per transaction
+USABILITY_JOURNAL_SEGMENT_BYTES = 16 * 1024 * 1024
+USABILITY_JOURNAL_APPLY_BATCH = 500
+
+# A metrics update that matches the stored session is not written; its
+# time_spent_sec counts as unchanged while within this many seconds of the
+# stored value. Above 0 a completion can be scored with a time that much
+# behind, so only exact repeats are skipped by default
+USABILITY_HEARTBEAT_TIME_RESOLUTION_SEC = 0
+
+# Admission control (usability.admission): requests per second admitted to
+# the session write endpoints and dashboard reads, and the burst allowed
+# above that rate; beyond it requests are answered with 429 and Retry-After
+USABILITY_ADMISSION = False
+USABILITY_ADMISSION_RATE = 200
+USABILITY_ADMISSION_BURST = 400
+# Metrics updates per second admitted per session, and their burst
+USABILITY_ADMISSION_SESSION_RATE = 2
+USABILITY_ADMISSION_SESSION_BURST = 10
@@ -1,7 +1,31 @@
 from rest_framework.test import APITestCase
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+from django.urls import clear_url_caches, resolve
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import datetime, timedelta, timezone as dt_timezone
+import asyncio
+import base64
+import importlib
 from rest_framework import status
+import csv
+import gzip
+import io
 import json
-from usability.models import FormOutput
+import msgpack
+from usability.models import FormOutput, UserGroup
+from usability import async_views, views
+from usability import urls as usability_urls
+from core import urls as core_urls
+from usability.events import SUBSCRIBER_QUEUE_SIZE, SUMMARY_TOPIC, EventStream, SummaryStream, broker
+from usability.renderers import to_columns
+from usability.rescoring import recalculate_range
+from usability.serializers import FormOutputSerializer
+from usability.pacing import ingest_load
+from usability.stats import heartbeat_writes
 
 
 class APIEndpointsIntegrationTestCase(APITestCase):
@@ -153,3 +177,1151 @@ class APIEndpointsIntegrationTestCase(APITestCase):
         )
         
         self.assertEqual(response.status_code, 400)
+
+    def test_batch_update_sessions_api(self):
+        """Test batch endpoint applies updates and completions for many sessions"""
+        other_session = FormOutput.objects.create(
+            session_id='integration_test_002',
+            completion_status='failure'
+        )
+        
+        payload = {
+            'updates': [
+                {'session_id': self.test_session.session_id, 'time_spent_sec': 80.0, 'steps_taken': 10},
+                {'session_id': other_session.session_id, 'fields_completed': 3, 'backtracks': 2},
+                {'session_id': 'missing_session', 'steps_taken': 4},
+            ],
+            'completions': [
+                {'session_id': other_session.session_id, 'completion_status': 'partial'},
+            ]
+        }
+        
+        response = self.client.post(
+            '/api/sessions/batch/',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.json()
+        results = {result['session_id']: result for result in data['results']}
+        self.assertEqual(set(results), {self.test_session.session_id, other_session.session_id})
+        self.assertEqual(data['errors'], [{'session_id': 'missing_session', 'error': 'Session not found'}])
+        
+        # Verify writes and recalculated metrics match a regular save
+        session = FormOutput.objects.get(session_id=self.test_session.session_id)
+        self.assertEqual(session.time_spent_sec, 80.0)
+        self.assertEqual(session.steps_taken, 10)
+        effectiveness = session.effectiveness
+        session.save()
+        self.assertEqual(session.effectiveness, effectiveness)
+        
+        other = FormOutput.objects.get(session_id=other_session.session_id)
+        self.assertEqual(other.completion_status, 'partial')
+        self.assertEqual(other.fields_completed, 3)
+        self.assertEqual(other.satisfaction, 34.0)
+        self.assertEqual(results[other.session_id]['usability_index'], round(other.usability_index, 1))
+        self.assertEqual(other.user_groups.get().partial_fields_completed, 3)
+
+    def test_batch_update_sessions_validation(self):
+        """Test batch endpoint rejects malformed payloads"""
+        response = self.client.post(
+            '/api/sessions/batch/',
+            data=json.dumps({'updates': {'session_id': self.test_session.session_id}}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        
+        payload = {
+            'updates': [{'session_id': self.test_session.session_id, 'time_spent_sec': 'invalid_time'}],
+            'completions': [{'session_id': self.test_session.session_id, 'completion_status': 'invalid_status'}]
+        }
+        response = self.client.post(
+            '/api/sessions/batch/',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+        self.assertEqual(len(response.json()['errors']), 2)
+
+
+class DeltaUpdateTestCase(APITestCase):
+    """Delta-mode metric updates increment the counters in the database"""
+    
+    def setUp(self):
+        self.session = FormOutput.objects.create(
+            session_id='delta_001', time_spent_sec=20.0, steps_taken=3, backtracks=1,
+            fields_completed=2, total_steps=7, completion_status='partial'
+        )
+        self.url = f'/api/sessions/{self.session.session_id}/update/'
+    
+    def test_increments_are_not_lost(self):
+        # Two clients reporting from the same starting counts both count
+        for _ in range(2):
+            response = self.client.post(self.url, {'deltas': {'backtracks': 1, 'steps_taken': 2}}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.backtracks, self.session.steps_taken), (3, 7))
+        self.assertEqual(response.json()['backtracks'], 3)
+        self.assertEqual(response.json()['usability_index'], round(self.session.usability_index, 1))
+    
+    def test_no_read_before_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, {'deltas': {'error_counts': 1}, 'time_spent_sec': 25.0}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('SELECT', 'UPDATE'))]
+        self.assertTrue(statements[0].startswith('UPDATE "usability_formoutput"'))
+        self.assertIn('"error_counts" = ("usability_formoutput"."error_counts" + 1)', statements[0])
+        
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.error_counts, self.session.time_spent_sec), (1, 25.0))
+        efficiency = self.session.efficiency
+        self.session.save()
+        self.assertEqual(self.session.efficiency, efficiency)
+    
+    def test_invalid_deltas(self):
+        for payload in (
+            {'deltas': {'backtracks': -1}},
+            {'deltas': {'usability_index': 5}},
+            {'deltas': {'backtracks': 1}, 'backtracks': 4},
+            {'deltas': [1]},
+        ):
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+            self.assertIn('deltas', response.json())
+        
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.backtracks, 1)
+
+
+class UpsertOnFirstUpdateTestCase(APITestCase):
+    """The first metrics update of an unknown session_id creates the session"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def session_writes(self, queries):
+        return [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT INTO "usability_formoutput"', 'UPDATE "usability_formoutput"'))
+        ]
+    
+    def test_first_update_creates_session(self):
+        payload = {'time_spent_sec': 12.0, 'steps_taken': 2, 'fields_completed': 1, 'completion_status': 'partial'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/sessions/client0001/update/', payload, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.session_writes(queries)), 1)
+        session = FormOutput.objects.get(session_id='client0001')
+        self.assertEqual((session.steps_taken, session.fields_completed), (2, 1))
+        self.assertEqual(response.json()['usability_index'], round(session.usability_index, 1))
+        self.assertEqual(self.client.get('/api/dashboard/summary/').json()['partial_sessions'], 1)
+        
+        # Later updates write the same row: the fields sent and their metrics
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/sessions/client0001/update/', {'steps_taken': 5}, format='json')
+        writes = self.session_writes(queries)
+        self.assertEqual(len(writes), 1)
+        assignments = writes[0].split(' WHERE ')[0]
+        self.assertIn('"steps_taken" = 5', assignments)
+        self.assertIn('"usability_index"', assignments)
+        for untouched in ('"created_at"', '"time_spent_sec"', '"completion_status"'):
+            self.assertNotIn(untouched, assignments)
+        session = FormOutput.objects.get(session_id='client0001')
+        self.assertEqual(session.steps_taken, 5)
+        usability_index = session.usability_index
+        session.save()
+        self.assertEqual(session.usability_index, usability_index)
+        self.assertEqual(FormOutput.objects.count(), 1)
+    
+    def test_first_delta_update_creates_session(self):
+        for _ in range(2):
+            response = self.client.post('/api/sessions/client0002/update/', {'deltas': {'backtracks': 1}}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(FormOutput.objects.get(session_id='client0002').backtracks, 2)
+    
+    def test_invalid_session_id_rejected(self):
+        response = self.client.post('/api/sessions/not.valid/update/', {'steps_taken': 1}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FormOutput.objects.exists())
+        
+        # Invalid payloads create nothing
+        response = self.client.post('/api/sessions/client0003/update/', {'time_spent_sec': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FormOutput.objects.exists())
+
+
+class SkipUnchangedUpdateTestCase(APITestCase):
+    """Metrics updates that would not change the session are not written"""
+    
+    def setUp(self):
+        heartbeat_writes.reset()
+        ingest_load.reset()
+        self.payload = {
+            'time_spent_sec': 20.0, 'steps_taken': 4, 'backtracks': 1, 'fields_completed': 3, 'completion_status': 'partial'
+        }
+        self.first = self.client.post('/api/sessions/skip_001/update/', self.payload, format='json').json()
+        self.assertEqual(self.first.pop('next_update_in_ms'), 2000)
+    
+    def post(self, **changes):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/sessions/skip_001/update/', {**self.payload, **changes}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.session_reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'WHERE "usability_formoutput"."session_id" =' in query['sql']
+        ]
+        writes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('UPDATE', 'INSERT'))]
+        return response.json(), writes
+    
+    def test_repeated_heartbeats_are_skipped(self):
+        updated_at = FormOutput.objects.get(session_id='skip_001').updated_at
+        
+        analytics, writes = self.post()
+        self.assertEqual(writes, [])
+        # Idle sessions are asked to send their updates less often
+        self.assertEqual(analytics.pop('next_update_in_ms'), 5000)
+        self.assertEqual(analytics, self.first)
+        
+        # Later times are only ignored with a resolution configured
+        with override_settings(USABILITY_HEARTBEAT_TIME_RESOLUTION_SEC=5):
+            for time_spent_sec in (22.0, 25.0):
+                analytics, writes = self.post(time_spent_sec=time_spent_sec)
+                self.assertEqual(writes, [])
+                self.assertEqual(analytics.pop('next_update_in_ms'), 5000)
+                self.assertEqual(analytics, self.first)
+        
+        session = FormOutput.objects.get(session_id='skip_001')
+        self.assertEqual((session.time_spent_sec, session.updated_at), (20.0, updated_at))
+        self.assertEqual(heartbeat_writes.snapshot(), {'applied': 1, 'skipped': 3})
+    
+    def test_changed_heartbeats_are_written(self):
+        analytics, writes = self.post(backtracks=2)
+        self.assertTrue(writes)
+        self.assertEqual(analytics['backtracks'], 2)
+        # The row read to compare with is the one written
+        self.assertEqual(len(self.session_reads), 1)
+        
+        # By default any change of time is written, so a completion that
+        # follows scores the latest time
+        _, writes = self.post(backtracks=2, time_spent_sec=21.0)
+        self.assertTrue(writes)
+        self.assertEqual(FormOutput.objects.get(session_id='skip_001').time_spent_sec, 21.0)
+        
+        with override_settings(USABILITY_HEARTBEAT_TIME_RESOLUTION_SEC=5):
+            _, writes = self.post(backtracks=2, time_spent_sec=27.0)
+            self.assertTrue(writes)
+            _, writes = self.post(backtracks=2, time_spent_sec=29.0)
+            self.assertEqual(writes, [])
+        
+        response = self.client.get('/api/ingest/stats/')
+        self.assertEqual(response.json()['heartbeat_writes'], {'applied': 4, 'skipped': 1})
+    
+    def test_sync_view_skips_unchanged_updates(self):
+        request = RequestFactory().post('/', json.dumps(self.payload), content_type='application/json')
+        response = views.update_session_metrics(request, 'skip_001')
+        
+        self.assertEqual({**response.data, 'next_update_in_ms': None}, {**self.first, 'next_update_in_ms': None})
+        self.assertEqual(heartbeat_writes.snapshot(), {'applied': 1, 'skipped': 1})
+
+
+class DashboardSummaryCacheTestCase(APITestCase):
+    """Dashboard summary is computed in one query and cached until the next write"""
+    
+    url = '/api/dashboard/summary/'
+    
+    def setUp(self):
+        cache.clear()
+        for index, status_value in enumerate(['success', 'success', 'partial', 'failure']):
+            FormOutput.objects.create(
+                session_id=f'summary_cache_{index}',
+                time_spent_sec=60.0,
+                steps_taken=7,
+                completion_status=status_value,
+                fields_completed=7 if status_value == 'success' else 3,
+                total_steps=7
+            )
+    
+    def test_summary_uses_single_query_then_cache(self):
+        # Reading the change feed's high-water mark takes one index lookup per table
+        with self.assertNumQueries(4):
+            first = self.client.get(self.url).json()
+        with self.assertNumQueries(3):
+            second = self.client.get(self.url).json()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first['total_sessions'], 4)
+        self.assertEqual(first['successful_sessions'], 2)
+        self.assertEqual(first['partial_sessions'], 1)
+        self.assertEqual(first['failed_sessions'], 1)
+        self.assertEqual(first['success_rate'], 50.0)
+    
+    def test_writes_from_other_processes_invalidate_the_cache(self):
+        self.assertEqual(self.client.get(self.url).json()['total_sessions'], 4)
+        
+        # A management command in another process has a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other-process'
+        }}):
+            call_command('generate_data', count=5, stdout=io.StringIO())
+        
+        self.assertEqual(self.client.get(self.url).json()['total_sessions'], 9)
+    
+    def test_empty_summary(self):
+        FormOutput.objects.all().delete()
+        data = self.client.get(self.url).json()
+        
+        self.assertEqual(data['total_sessions'], 0)
+        self.assertEqual(data['success_rate'], 0.0)
+        self.assertEqual(data['avg_usability_index'], 0.0)
+    
+    def test_session_writes_invalidate_cache(self):
+        self.client.get(self.url)
+        
+        response = self.client.post('/api/sessions/create/', {}, format='json')
+        session_id = response.json()['session_id']
+        self.assertEqual(self.client.get(self.url).json()['total_sessions'], 5)
+        
+        self.client.post(f'/api/sessions/{session_id}/complete/', {'completion_status': 'success'}, format='json')
+        self.assertEqual(self.client.get(self.url).json()['successful_sessions'], 3)
+    
+    def test_bulk_writes_invalidate_cache(self):
+        self.client.get(self.url)
+        
+        FormOutput.objects.bulk_create([FormOutput(session_id='summary_cache_bulk', completion_status='partial')])
+        self.assertEqual(self.client.get(self.url).json()['partial_sessions'], 2)
+        
+        FormOutput.objects.filter(completion_status='failure').update(completion_status='success')
+        self.assertEqual(self.client.get(self.url).json()['successful_sessions'], 3)
+        
+        FormOutput.objects.filter(session_id='summary_cache_0').delete()
+        self.assertEqual(self.client.get(self.url).json()['total_sessions'], 4)
+
+
+class DashboardTrendsTestCase(APITestCase):
+    """Integration tests for the rollup-backed trends endpoint"""
+    
+    url = '/api/dashboard/trends/'
+    
+    def setUp(self):
+        day = datetime(2026, 5, 1, tzinfo=dt_timezone.utc)
+        sessions = [
+            (day + timedelta(hours=9, minutes=5), 'success', 60.0),
+            (day + timedelta(hours=9, minutes=40), 'failure', 20.0),
+            (day + timedelta(hours=11), 'success', 80.0),
+            (day + timedelta(days=1, hours=2), 'partial', 40.0),
+        ]
+        for index, (created_at, status_value, time_spent) in enumerate(sessions):
+            FormOutput.objects.create(
+                session_id=f'trends_{index}',
+                created_at=created_at,
+                completion_status=status_value,
+                time_spent_sec=time_spent,
+                fields_completed=7 if status_value == 'success' else 3
+            )
+    
+    def test_daily_trends(self):
+        response = self.client.get(self.url, {'granularity': 'day', 'from': '2026-05-01', 'to': '2026-05-03'})
+        
+        self.assertEqual(response.status_code, 200)
+        buckets = response.json()['buckets']
+        self.assertEqual([bucket['sessions'] for bucket in buckets], [3, 1])
+        self.assertEqual(buckets[0]['success_rate'], 66.7)
+        self.assertEqual(buckets[0]['avg_time_spent'], 53.3)
+        self.assertEqual(buckets[1]['partial_sessions'], 1)
+        expected_ui = sum(
+            FormOutput.objects.get(session_id=f'trends_{index}').usability_index for index in range(3)
+        ) / 3
+        self.assertAlmostEqual(buckets[0]['avg_usability_index'], expected_ui, delta=0.05)
+    
+    def test_hourly_trends_read_rollups_only(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {'granularity': 'hour', 'from': '2026-05-01T00:00:00', 'to': '2026-05-02T00:00:00'}
+            )
+        
+        buckets = response.json()['buckets']
+        self.assertEqual([bucket['bucket_start'][:13] for bucket in buckets], ['2026-05-01T09', '2026-05-01T11'])
+        self.assertEqual(buckets[0]['sessions'], 2)
+        self.assertEqual(buckets[0]['success_rate'], 50.0)
+    
+    def test_invalid_parameters(self):
+        cases = [
+            {'granularity': 'week'},
+            {'from': 'yesterday'},
+            {'from': '2026-05-02', 'to': '2026-05-01'},
+            {'granularity': 'hour', 'from': '2020-01-01', 'to': '2026-01-01'},
+        ]
+        for params in cases:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+
+class SessionCursorPaginationTestCase(APITestCase):
+    """Integration tests for keyset pagination of the session lists"""
+    
+    def setUp(self):
+        # Several sessions share a timestamp, so ties are broken by id
+        base = datetime(2026, 6, 1, tzinfo=dt_timezone.utc)
+        FormOutput.objects.bulk_create([
+            FormOutput(session_id=f'page_{index:03d}', created_at=base + timedelta(minutes=index // 3))
+            for index in range(23)
+        ])
+        self.expected = list(
+            FormOutput.objects.order_by('-created_at', '-id').values_list('session_id', flat=True)
+        )
+    
+    def collect(self, url, params):
+        """Follow next_cursor until the last page, returns session ids and page count"""
+        session_ids, pages, cursor = [], 0, None
+        while True:
+            response = self.client.get(url, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            session_ids += [session['session_id'] for session in data['results']]
+            pages += 1
+            cursor = data['next_cursor']
+            if cursor is None:
+                self.assertIsNone(data['next'])
+                return session_ids, pages
+            self.assertIn('cursor=', data['next'])
+    
+    def test_recent_sessions_pages_through_all(self):
+        session_ids, pages = self.collect('/api/dashboard/recent/', {'limit': 'all', 'page_size': 10})
+        
+        self.assertEqual(session_ids, self.expected)
+        self.assertEqual(pages, 3)
+    
+    def test_list_view_is_paginated(self):
+        session_ids, pages = self.collect('/api/sessions/', {'page_size': 5})
+        
+        self.assertEqual(session_ids, self.expected)
+        self.assertEqual(pages, 5)
+    
+    def test_cursor_is_stable_under_inserts(self):
+        first = self.client.get('/api/dashboard/recent/', {'limit': 'all', 'page_size': 10}).json()
+        FormOutput.objects.create(session_id='page_new')
+        second = self.client.get('/api/dashboard/recent/', {'cursor': first['next_cursor'], 'page_size': 10}).json()
+        
+        self.assertEqual([session['session_id'] for session in second['results']], self.expected[10:20])
+    
+    def test_page_size_and_limit_capped(self):
+        FormOutput.objects.bulk_create([FormOutput(session_id=f'page_extra_{index}') for index in range(600)])
+        
+        page = self.client.get('/api/sessions/', {'page_size': 10000}).json()
+        self.assertEqual(len(page['results']), 500)
+        self.assertIsNotNone(page['next_cursor'])
+        
+        recent = self.client.get('/api/dashboard/recent/', {'limit': 10000}).json()
+        self.assertEqual(len(recent), 500)
+    
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/dashboard/recent/', {'cursor': 'not-a-cursor'})
+        
+        self.assertEqual(response.status_code, 404)
+    
+    def test_tampered_cursor_values(self):
+        for ordering, value in (('time_spent_sec', 'abc'), ('-usability_index', None), ('steps_taken', [1]),
+                                ('created_at', 5)):
+            cursor = base64.urlsafe_b64encode(json.dumps([ordering, value, 1]).encode()).decode()
+            response = self.client.get('/api/sessions/query/', {'ordering': ordering, 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, ordering)
+
+
+class SessionQueryTestCase(APITestCase):
+    """Integration tests for the filtered session query endpoint"""
+    
+    url = '/api/sessions/query/'
+    
+    def setUp(self):
+        base = datetime(2026, 7, 1, tzinfo=dt_timezone.utc)
+        for index in range(12):
+            FormOutput.objects.create(
+                session_id=f'query_{index:02d}',
+                created_at=base + timedelta(days=index),
+                completion_status=['success', 'partial', 'failure'][index % 3],
+                time_spent_sec=10.0 * (index + 1),
+                steps_taken=7,
+                fields_completed=7 if index % 3 == 0 else 3
+            )
+    
+    def query(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [session['session_id'] for session in response.json()['results']]
+    
+    def test_filters(self):
+        self.assertEqual(self.query(completion_status='success'), ['query_09', 'query_06', 'query_03', 'query_00'])
+        self.assertEqual(
+            self.query(completion_status='partial,failure', created_after='2026-07-05', created_before='2026-07-09'),
+            ['query_07', 'query_05', 'query_04']
+        )
+        self.assertEqual(self.query(min_time_spent='95', max_time_spent='110'), ['query_10', 'query_09'])
+        
+        threshold = FormOutput.objects.get(session_id='query_03').usability_index
+        for session_id in self.query(min_usability_index=str(threshold)):
+            self.assertGreaterEqual(FormOutput.objects.get(session_id=session_id).usability_index, threshold)
+    
+    def test_ordering_by_metric_with_cursor(self):
+        expected = list(
+            FormOutput.objects.order_by('usability_index', 'id').values_list('session_id', flat=True)
+        )
+        first = self.client.get(self.url, {'ordering': 'usability_index', 'page_size': 5}).json()
+        second = self.client.get(
+            self.url, {'ordering': 'usability_index', 'page_size': 5, 'cursor': first['next_cursor']}
+        ).json()
+        
+        session_ids = [session['session_id'] for session in first['results'] + second['results']]
+        self.assertEqual(session_ids, expected[:10])
+        
+        # A cursor is only valid for the ordering it was issued for
+        response = self.client.get(self.url, {'ordering': '-time_spent_sec', 'cursor': first['next_cursor']})
+        self.assertEqual(response.status_code, 404)
+
+    def test_stale_rows_use_current_metrics(self):
+        # Rows scored under an older formula version, whose stored index is far off
+        FormOutput.objects.filter(session_id__in=['query_01', 'query_02']).update(
+            metrics_version=0, usability_index=100.0
+        )
+        current = {}
+        for session in FormOutput.objects.all():
+            session.refresh_stale_metrics()
+            current[session.session_id] = (session.usability_index, session.pk)
+
+        expected = sorted(current, key=current.get, reverse=True)
+        self.assertEqual(self.query(ordering='-usability_index', page_size='20'), expected)
+
+        threshold = current['query_01'][0] + 0.01
+        expected = [session_id for session_id in expected if current[session_id][0] >= threshold]
+        self.assertEqual(
+            self.query(ordering='-usability_index', min_usability_index=str(threshold), page_size='20'), expected
+        )
+        self.assertNotIn('query_01', expected)
+
+    def test_invalid_parameters(self):
+        cases = [
+            {'completion_status': 'done'},
+            {'created_after': 'last week'},
+            {'min_usability_index': 'high'},
+            {'ordering': 'session_id'},
+        ]
+        for params in cases:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+
+class SessionFieldsTestCase(APITestCase):
+    """Integration tests for the lean session list serialization and sparse fieldsets"""
+    
+    def setUp(self):
+        base = datetime(2026, 8, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        for index in range(6):
+            FormOutput.objects.create(
+                session_id=f'fields_{index}',
+                created_at=base + timedelta(hours=index),
+                completion_status=['success', 'partial', 'failure'][index % 3],
+                time_spent_sec=12.5 * (index + 1),
+                steps_taken=7 + index,
+                backtracks=index % 2,
+                error_counts=index % 3,
+                fields_completed=7 if index % 3 == 0 else 4
+            )
+        # One row scored under an older formula version is rescored on read
+        FormOutput.objects.filter(session_id='fields_1').update(metrics_version=0, usability_index=1.0)
+    
+    def expected(self):
+        sessions = FormOutput.objects.order_by('-created_at', '-id')
+        return json.loads(json.dumps(FormOutputSerializer(sessions, many=True).data))
+    
+    def test_default_output_matches_model_serializer(self):
+        recent = self.client.get('/api/dashboard/recent/', {'limit': 50}).json()
+        page = self.client.get('/api/dashboard/recent/', {'limit': 'all'}).json()
+        query = self.client.get('/api/sessions/query/').json()
+        
+        self.assertEqual(recent, self.expected())
+        self.assertEqual(page['results'], self.expected())
+        self.assertEqual(query['results'], self.expected())
+        self.assertNotEqual(recent[4]['usability_index'], 1.0)
+    
+    def test_sparse_fieldset(self):
+        recent = self.client.get('/api/dashboard/recent/', {'fields': 'session_id,usability_index'}).json()
+        
+        self.assertEqual(
+            recent,
+            [{'session_id': session['session_id'], 'usability_index': session['usability_index']}
+             for session in self.expected()]
+        )
+    
+    def test_sparse_fieldset_pages_on_unselected_ordering(self):
+        params = {'fields': 'session_id', 'ordering': 'time_spent_sec', 'page_size': 4}
+        first = self.client.get('/api/sessions/query/', params).json()
+        second = self.client.get('/api/sessions/query/', {**params, 'cursor': first['next_cursor']}).json()
+        
+        self.assertEqual(
+            [session['session_id'] for session in first['results'] + second['results']],
+            [f'fields_{index}' for index in range(6)]
+        )
+        self.assertEqual(set(first['results'][0]), {'session_id'})
+    
+    def test_invalid_fields(self):
+        for url in ('/api/dashboard/recent/', '/api/sessions/query/'):
+            response = self.client.get(url, {'fields': 'session_id,secret'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.json())
+
+
+class SessionListFormatsTestCase(APITestCase):
+    """Integration tests for the columnar encodings of the session lists"""
+    
+    columnar = 'application/vnd.usability.columnar+json'
+    
+    def setUp(self):
+        FormOutput.objects.bulk_create([
+            FormOutput(session_id=f'format_{index:02d}', completion_status=['success', 'partial', 'failure'][index % 3],
+                       time_spent_sec=5.5 * index, steps_taken=7, fields_completed=index % 8)
+            for index in range(30)
+        ])
+    
+    def test_json_is_default(self):
+        response = self.client.get('/api/dashboard/recent/', {'limit': 5})
+        
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsInstance(response.json(), list)
+    
+    def test_columnar_json_carries_same_values(self):
+        rows = self.client.get('/api/dashboard/recent/', {'limit': 30}).json()
+        response = self.client.get('/api/dashboard/recent/', {'limit': 30}, HTTP_ACCEPT=self.columnar)
+        
+        self.assertEqual(response['Content-Type'], self.columnar)
+        self.assertEqual(json.loads(response.content), to_columns(rows))
+        self.assertEqual(len(json.loads(response.content)['session_id']), 30)
+        self.assertLess(len(response.content), len(json.dumps(rows)))
+    
+    def test_columnar_pages_keep_cursor(self):
+        page = self.client.get('/api/sessions/', {'page_size': 10}).json()
+        response = self.client.get('/api/sessions/', {'page_size': 10, 'format': 'columnar'})
+        columns = json.loads(response.content)
+        
+        self.assertEqual(columns['next_cursor'], page['next_cursor'])
+        self.assertEqual(columns['results'], to_columns(page['results']))
+        
+        sparse = self.client.get(
+            '/api/sessions/query/', {'fields': 'session_id,usability_index', 'format': 'columnar'}
+        ).json()
+        self.assertEqual(list(sparse['results']), ['session_id', 'usability_index'])
+    
+    def test_errors_are_not_columnar(self):
+        response = self.client.get('/api/dashboard/recent/', {'fields': 'bogus'}, HTTP_ACCEPT=self.columnar)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', json.loads(response.content))
+    
+    def test_msgpack_carries_same_values(self):
+        rows = self.client.get('/api/dashboard/recent/', {'limit': 30}).json()
+        response = self.client.get('/api/dashboard/recent/', {'limit': 30}, HTTP_ACCEPT='application/msgpack')
+        
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), to_columns(rows))
+
+
+class ConditionalGetTestCase(APITestCase):
+    """Integration tests for ETag / Last-Modified on the polled dashboard endpoints"""
+    
+    def setUp(self):
+        cache.clear()
+        self.session = FormOutput.objects.create(
+            session_id='conditional_001', time_spent_sec=30.0, steps_taken=5, fields_completed=4,
+            completion_status='partial'
+        )
+    
+    def test_summary_not_modified_without_building_it(self):
+        response = self.client.get('/api/dashboard/summary/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        # Only the change feed's high-water mark is read
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        
+        FormOutput.objects.create(session_id='conditional_002')
+        response = self.client.get('/api/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['total_sessions'], 2)
+    
+    def test_writes_from_other_processes_change_the_etag(self):
+        etag = self.client.get('/api/dashboard/summary/')['ETag']
+        
+        # A management command in another process has a cache of its own
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other-process'
+        }}):
+            call_command('generate_data', count=5, stdout=io.StringIO())
+        
+        response = self.client.get('/api/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_sessions'], 6)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_recent_etag_depends_on_request(self):
+        etag = self.client.get('/api/dashboard/recent/', {'limit': 5})['ETag']
+        
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/dashboard/recent/', {'limit': 5}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        for params, headers in (({'limit': 6}, {}), ({'limit': 5}, {'HTTP_ACCEPT': 'application/vnd.usability.columnar+json'})):
+            response = self.client.get('/api/dashboard/recent/', params, HTTP_IF_NONE_MATCH=etag, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+    
+    def test_session_analytics_validators(self):
+        url = f'/api/sessions/{self.session.session_id}/analytics/'
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        
+        # One lookup of updated_at, no analytics built
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # Writes to other sessions keep this one's validators
+        FormOutput.objects.create(session_id='conditional_other')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        self.client.post(f'/api/sessions/{self.session.session_id}/update/', {'steps_taken': 9}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['steps'], 9)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_bulk_writes_change_session_validators(self):
+        url = f'/api/sessions/{self.session.session_id}/analytics/'
+        etag = self.client.get(url)['ETag']
+        FormOutput.objects.filter(pk=self.session.pk).update(backtracks=2)
+        
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        
+        etag = self.client.get(url)['ETag']
+        self.session.refresh_from_db()
+        self.session.error_counts = 1
+        FormOutput.objects.bulk_update([self.session], ['error_counts'])
+        
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+    
+    def test_missing_session_has_no_validators(self):
+        response = self.client.get('/api/sessions/missing/analytics/')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ChangeFeedTestCase(APITestCase):
+    """Integration tests for the incremental dashboard change feed"""
+    
+    url = '/api/dashboard/changes/'
+    
+    def setUp(self):
+        for index in range(5):
+            session = FormOutput.objects.create(session_id=f'feed_{index}', steps_taken=index)
+            if index % 2 == 0:
+                UserGroup.objects.create(form_output=session, outcome='failure')
+    
+    def sync(self, since=0, after='', **params):
+        """Follow has_more from since, returns the merged changes and the final high-water mark"""
+        merged = {'sessions': [], 'user_groups': [], 'deleted_sessions': [], 'deleted_user_groups': []}
+        while True:
+            response = self.client.get(self.url, {'since': since, 'after': after, **params})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertGreaterEqual(data['high_water_mark'], since)
+            for key in merged:
+                merged[key] += data[key]
+            since = data['high_water_mark']
+            after = data['after'] or ''
+            if not data['has_more']:
+                return merged, since
+    
+    def test_full_sync_in_bounded_calls(self):
+        first = self.client.get(self.url, {'limit': 3}).json()
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['sessions']) + len(first['user_groups']), 3)
+        
+        changes, high_water_mark = self.sync(limit=3)
+        self.assertEqual(sorted(session['session_id'] for session in changes['sessions']),
+                         [f'feed_{index}' for index in range(5)])
+        self.assertEqual(len(changes['user_groups']), 3)
+        self.assertEqual(set(changes['sessions'][0]), set(FormOutputSerializer.Meta.fields))
+        
+        # Nothing changed since
+        with self.assertNumQueries(3):
+            caught_up = self.client.get(self.url, {'since': high_water_mark}).json()
+        self.assertEqual(caught_up['high_water_mark'], high_water_mark)
+        self.assertEqual(caught_up['sessions'], [])
+        self.assertFalse(caught_up['has_more'])
+    
+    def test_only_changed_rows(self):
+        _, high_water_mark = self.sync()
+        
+        self.client.post('/api/sessions/feed_3/update/', {'backtracks': 2}, format='json')
+        self.client.post('/api/sessions/feed_1/complete/', {'completion_status': 'partial'}, format='json')
+        FormOutput.objects.create(session_id='feed_new')
+        
+        changes, _ = self.sync(high_water_mark)
+        self.assertEqual([session['session_id'] for session in changes['sessions']], ['feed_3', 'feed_1', 'feed_new'])
+        self.assertEqual(changes['sessions'][0]['backtracks'], 2)
+        self.assertEqual([group['outcome'] for group in changes['user_groups']], ['partial'])
+    
+    def test_deletions(self):
+        _, high_water_mark = self.sync()
+        session = FormOutput.objects.get(session_id='feed_2')
+        user_group = session.user_groups.get().pk
+        
+        session.delete()
+        FormOutput.objects.filter(session_id='feed_4').delete()
+        UserGroup.objects.filter(form_output__session_id='feed_0').delete()
+        
+        changes, _ = self.sync(high_water_mark)
+        self.assertEqual([deleted['session_id'] for deleted in changes['deleted_sessions']], ['feed_2', 'feed_4'])
+        self.assertEqual(len(changes['deleted_user_groups']), 3)
+        self.assertIn(user_group, changes['deleted_user_groups'])
+        self.assertEqual(changes['sessions'], [])
+
+    def test_deleting_the_newest_rows(self):
+        newest = FormOutput.objects.create(session_id='feed_newest')
+        _, high_water_mark = self.sync()
+        self.assertEqual(high_water_mark, newest.change_seq)
+
+        pk = newest.pk
+        newest.delete()
+        changes, high_water_mark = self.sync(high_water_mark)
+        self.assertEqual(changes['deleted_sessions'], [{'id': pk, 'session_id': 'feed_newest'}])
+
+        created = FormOutput.objects.bulk_create([FormOutput(session_id=f'feed_many_{i}') for i in range(30)])
+        _, high_water_mark = self.sync(high_water_mark)
+        FormOutput.objects.filter(pk__in=[session.pk for session in created]).delete()
+        changes, _ = self.sync(high_water_mark, limit=7)
+        self.assertEqual(sorted(deleted['id'] for deleted in changes['deleted_sessions']),
+                         [session.pk for session in created])
+
+    def test_bulk_writes(self):
+        _, high_water_mark = self.sync()
+        
+        # One UPDATE larger than the limit is split across calls
+        FormOutput.objects.filter(session_id__startswith='feed_').update(error_counts=1)
+        response = self.client.get(self.url, {'since': high_water_mark, 'limit': 2}).json()
+        self.assertEqual(len(response['sessions']), 2)
+        self.assertTrue(response['has_more'])
+        self.assertEqual(response['after'], response['sessions'][-1]['id'])
+        changes, high_water_mark = self.sync(response['high_water_mark'], after=response['after'], limit=2)
+        self.assertEqual(sorted(session['id'] for session in response['sessions'] + changes['sessions']),
+                         sorted(FormOutput.objects.values_list('id', flat=True)))
+        
+        sessions = list(FormOutput.objects.filter(session_id__in=['feed_0', 'feed_1']))
+        for session in sessions:
+            session.extra_clicks = 4
+        FormOutput.objects.bulk_update(sessions, ['extra_clicks'])
+        FormOutput.objects.bulk_create([FormOutput(session_id='feed_bulk')])
+        
+        changes, _ = self.sync(high_water_mark)
+        self.assertEqual(sorted(session['session_id'] for session in changes['sessions']),
+                         ['feed_0', 'feed_1', 'feed_bulk'])
+    
+    def test_rescoring_is_not_a_change(self):
+        # Rows scored under an older formula version, with different metrics
+        FormOutput.objects.update(metrics_version=0, efficiency=1.0, usability_index=1.0)
+        _, high_water_mark = self.sync()
+        stamps = set(FormOutput.objects.values_list('pk', 'updated_at', 'change_seq'))
+        
+        stats = recalculate_range(0, FormOutput.objects.latest('pk').pk + 1)
+        self.assertEqual(stats['changed'], 5)
+        FormOutput.objects.update(metrics_version=0)
+        FormOutput.objects.recalculate_metrics()
+        
+        self.assertFalse(FormOutput.objects.stale().exists())
+        self.assertEqual(set(FormOutput.objects.values_list('pk', 'updated_at', 'change_seq')), stamps)
+        changes, _ = self.sync(high_water_mark)
+        self.assertEqual(changes['sessions'], [])
+    
+    def test_invalid_parameters(self):
+        for params in ({'since': 'abc'}, {'since': -1}, {'limit': 'x'}, {'after': 'x'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.json())
+
+
+class EventStreamTestCase(APITestCase):
+    """Integration tests for the Server-Sent Events streams"""
+    
+    def setUp(self):
+        cache.clear()
+        FormOutput.objects.create(session_id='events_001', steps_taken=3, fields_completed=2, completion_status='partial')
+    
+    def post_committed(self, url, data):
+        """POST and run the on-commit callbacks that publish events"""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, format='json')
+    
+    async def next_event(self, events):
+        chunk = await asyncio.wait_for(anext(events), timeout=5)
+        event, data = chunk.decode().strip().split('\n')
+        return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+    
+    async def test_session_analytics_pushed_on_update(self):
+        response = await self.async_client.get('/api/sessions/events_001/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        
+        event, analytics = await self.next_event(events)
+        self.assertEqual((event, analytics['steps']), ('analytics', 3))
+        
+        await sync_to_async(self.post_committed)('/api/sessions/events_001/update/', {'steps_taken': 8})
+        event, analytics = await self.next_event(events)
+        self.assertEqual((event, analytics['steps']), ('analytics', 8))
+        
+        await sync_to_async(self.post_committed)('/api/sessions/events_001/complete/', {'completion_status': 'success'})
+        event, analytics = await self.next_event(events)
+        self.assertEqual(analytics['current_step'], 7)
+    
+    async def test_summary_deltas_pushed_on_completion(self):
+        response = await self.async_client.get('/api/dashboard/events/')
+        events = aiter(response.streaming_content)
+        
+        event, summary = await self.next_event(events)
+        self.assertEqual((event, summary['total_sessions'], summary['successful_sessions']), ('summary', 1, 0))
+        
+        await sync_to_async(self.post_committed)('/api/sessions/events_001/complete/', {'completion_status': 'success'})
+        event, delta = await self.next_event(events)
+        summary.update(delta)
+        self.assertEqual(summary['successful_sessions'], 1)
+        
+        # Later deltas carry only the fields that changed
+        await sync_to_async(FormOutput.objects.create)(session_id='events_002')
+        await sync_to_async(self.post_committed)('/api/sessions/events_002/complete/', {'completion_status': 'failure'})
+        event, delta = await self.next_event(events)
+        self.assertEqual(delta['failed_sessions'], 1)
+        self.assertNotIn('successful_sessions', delta)
+        summary.update(delta)
+        
+        current = (await sync_to_async(self.client.get)('/api/dashboard/summary/')).json()
+        self.assertEqual(summary, current)
+    
+    async def test_stream_closes_and_unsubscribes(self):
+        subscription = broker.subscribe('session:events_close')
+        stream = EventStream(subscription, ['initial'])
+        
+        self.assertEqual(await anext(stream), 'initial')
+        broker.publish('session:events_close', 'analytics', {'steps': 1})
+        self.assertIn('"steps": 1', await asyncio.wait_for(anext(stream), timeout=5))
+        
+        stream.close()
+        self.assertFalse(broker.has_subscribers('session:events_close'))
+    
+    async def test_slow_subscriber_is_disconnected(self):
+        subscription = broker.subscribe('session:events_slow')
+        stream = EventStream(subscription)
+        
+        for index in range(SUBSCRIBER_QUEUE_SIZE + 1):
+            broker.publish('session:events_slow', 'analytics', {'steps': index})
+        await asyncio.sleep(0)
+        
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertFalse(broker.has_subscribers('session:events_slow'))
+    
+    async def test_summary_deltas_follow_each_client(self):
+        first = SummaryStream(broker.subscribe(SUMMARY_TOPIC), {'total_sessions': 1, 'failed_sessions': 1})
+        second = SummaryStream(broker.subscribe(SUMMARY_TOPIC), {'total_sessions': 2, 'failed_sessions': 1})
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        await anext(first)
+        await anext(second)
+        
+        # Back to what the first client already has: only the second is told
+        broker.publish(SUMMARY_TOPIC, 'summary', {'total_sessions': 1, 'failed_sessions': 1})
+        broker.publish(SUMMARY_TOPIC, 'summary', {'total_sessions': 1, 'failed_sessions': 0})
+        self.assertIn('data: {"total_sessions": 1}', await asyncio.wait_for(anext(second), timeout=5))
+        self.assertIn('data: {"failed_sessions": 0}', await asyncio.wait_for(anext(second), timeout=5))
+        self.assertIn('data: {"failed_sessions": 0}', await asyncio.wait_for(anext(first), timeout=5))
+    
+    def test_streams_refused_without_asgi(self):
+        for url in ['/api/sessions/events_001/events/', '/api/dashboard/events/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+            self.assertIn('error', response.json())
+        self.assertFalse(broker.has_subscribers(SUMMARY_TOPIC))
+    
+    async def test_unknown_session(self):
+        response = await self.async_client.get('/api/sessions/missing/events/')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(broker.has_subscribers('session:missing'))
+
+
+def reload_urlconf():
+    """Route the session hot path again for the current USABILITY_ASYNC_VIEWS"""
+    importlib.reload(usability_urls)
+    importlib.reload(core_urls)
+    clear_url_caches()
+
+
+class AsyncSessionViewsTestCase(APITestCase):
+    """The async hot-path views answer like the synchronous DRF views"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Runs after the setting is restored, routing back to the sync views
+        cls.addClassCleanup(reload_urlconf)
+        cls.enterClassContext(override_settings(USABILITY_ASYNC_VIEWS=True))
+        reload_urlconf()
+    
+    def setUp(self):
+        cache.clear()
+        for session_id in ('sync_001', 'async_001'):
+            FormOutput.objects.create(
+                session_id=session_id, time_spent_sec=40.0, steps_taken=6, backtracks=1,
+                fields_completed=3, total_steps=7, completion_status='partial'
+            )
+    
+    def call(self, view_name, method, session_id, data=None):
+        """Call the sync and async versions of a view on their own session, return (status, json) of each"""
+        results = []
+        for module, factory, prefix in ((views, RequestFactory(), 'sync'), (async_views, AsyncRequestFactory(), 'async')):
+            path = f'/api/sessions/{prefix}_{session_id}/'
+            if method == 'post':
+                request = factory.post(path, data if isinstance(data, str) else json.dumps(data or {}), content_type='application/json')
+            else:
+                request = factory.get(path)
+            view = getattr(module, view_name)
+            if iscoroutinefunction(view):
+                response = async_to_sync(view)(request, f'{prefix}_{session_id}')
+            else:
+                response = view(request, f'{prefix}_{session_id}')
+                response.render()
+            body = json.loads(response.content)
+            if isinstance(body, dict):
+                # Each version works on its own session
+                body.pop('session_id', None)
+                if isinstance(body.get('data'), dict):
+                    for field in ('id', 'session_id', 'created_at'):
+                        body['data'].pop(field)
+            results.append((response.status_code, body))
+        return results
+    
+    def test_routes_use_async_views(self):
+        for action in ('update', 'complete', 'analytics'):
+            self.assertTrue(iscoroutinefunction(resolve(f'/api/sessions/abc/{action}/').func))
+    
+    def test_update_matches_sync_view(self):
+        for payload in ({'steps_taken': 9, 'backtracks': 2}, {'time_spent_sec': 'invalid'}, {}):
+            sync_result, async_result = self.call('update_session_metrics', 'post', '001', payload)
+            self.assertEqual(async_result, sync_result)
+        self.assertEqual(sync_result[0], status.HTTP_200_OK)
+        
+        sync_session = FormOutput.objects.get(session_id='sync_001')
+        async_session = FormOutput.objects.get(session_id='async_001')
+        self.assertEqual((async_session.steps_taken, async_session.usability_index), (sync_session.steps_taken, sync_session.usability_index))
+    
+    def test_complete_matches_sync_view(self):
+        payload = {'completion_status': 'success', 'user_group_data': {'success_best_area': 'navigation'}}
+        sync_result, async_result = self.call('complete_session', 'post', '001', payload)
+        
+        self.assertEqual(async_result, sync_result)
+        self.assertEqual(UserGroup.objects.get(form_output__session_id='async_001').success_best_area, 'navigation')
+    
+    def test_invalid_completion_rejected(self):
+        for payload in (
+            {'completion_status': 'done'},
+            {'user_group_data': {'favourite_colour': 'blue'}},
+            {'user_group_data': 'notes'},
+        ):
+            sync_result, async_result = self.call('complete_session', 'post', '001', payload)
+            self.assertEqual(async_result, sync_result)
+            self.assertEqual(sync_result[0], status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserGroup.objects.exists())
+        self.assertEqual(FormOutput.objects.get(session_id='sync_001').completion_status, 'partial')
+    
+    def test_analytics_and_errors_match_sync_view(self):
+        self.assertEqual(*self.call('get_session_analytics', 'get', '001'))
+        self.assertEqual(*self.call('update_session_metrics', 'post', 'missing', {}))
+        self.assertEqual(*self.call('get_session_analytics', 'get', 'missing'))
+        
+        sync_result, async_result = self.call('complete_session', 'post', '001', '{not json')
+        self.assertEqual(async_result[0], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(async_result[1]['detail'][:16], sync_result[1]['detail'][:16])
+    
+    def test_analytics_reads_the_session_once(self):
+        url = '/api/sessions/async_001/analytics/'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class SessionExportTestCase(APITestCase):
+    """Integration tests for the streaming session export"""
+    
+    url = '/api/export/sessions/'
+    
+    def setUp(self):
+        complete = FormOutput.objects.create(
+            session_id='export_001', completion_status='partial', fields_completed=3, time_spent_sec=42.0
+        )
+        UserGroup.objects.create(form_output=complete, outcome='partial', partial_abandon_reason='Too long')
+        FormOutput.objects.create(session_id='export_002')
+    
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+    
+    def test_csv_export_joins_outcomes(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+            body = self.read(response).decode()
+        
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['session_id'] for row in rows], ['export_001', 'export_002'])
+        self.assertEqual(rows[0]['user_group_outcome'], 'partial')
+        self.assertEqual(rows[0]['user_group_partial_abandon_reason'], 'Too long')
+        self.assertEqual(rows[1]['user_group_outcome'], '')
+        self.assertAlmostEqual(
+            float(rows[0]['usability_index']), FormOutput.objects.get(session_id='export_001').usability_index
+        )
+    
+    def test_gzipped_ndjson_export(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'gzip': '1', 'completion_status': 'partial'})
+        
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('sessions.ndjson.gz', response['Content-Disposition'])
+        lines = gzip.decompress(self.read(response)).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['session_id'], 'export_001')
+        self.assertEqual(records[0]['time_spent_sec'], 42.0)
+    
+    def test_invalid_format(self):
+        response = self.client.get(self.url, {'format': 'xlsx'})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
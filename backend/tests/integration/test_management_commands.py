@@ -0,0 +1,326 @@
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from usability.journal import Journal, segment_paths
+from usability.models import DashboardTotals, FormOutput, MetricsRollup, UserGroup
+from io import StringIO
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+class RecalculateMetricsCommandTestCase(TestCase):
+    """Integration tests for the recalculate_metrics management command"""
+    
+    def setUp(self):
+        """Create sessions and corrupt the stored metrics of some of them"""
+        sessions = [
+            FormOutput(
+                session_id=f'recalc_{i:03d}',
+                time_spent_sec=30 + i,
+                steps_taken=5 + (i % 10),
+                backtracks=i % 3,
+                error_counts=i % 4,
+                completion_status=['success', 'partial', 'failure'][i % 3],
+                fields_completed=i % 7,
+                total_steps=7
+            )
+            for i in range(30)
+        ]
+        for session in sessions:
+            session.update_all_metrics()
+        FormOutput.objects.bulk_create(sessions)
+        
+        self.expected = {
+            session.session_id: [getattr(session, field) for field in FormOutput.METRIC_FIELDS]
+            for session in sessions
+        }
+        self.stale_ids = [f'recalc_{i:03d}' for i in range(0, 30, 3)]
+        FormOutput.objects.filter(session_id__in=self.stale_ids).update(
+            effectiveness=0.0, efficiency=0.0, usability_index=0.0
+        )
+    
+    def stored_metrics(self):
+        return {
+            row[0]: list(row[1:])
+            for row in FormOutput.objects.values_list('session_id', *FormOutput.METRIC_FIELDS)
+        }
+    
+    def test_recalculates_only_changed_rows(self):
+        """Test chunked recalculation restores metrics and reports throughput"""
+        out = StringIO()
+        call_command('recalculate_metrics', chunk_size=7, stdout=out)
+        
+        self.assertEqual(self.stored_metrics(), self.expected)
+        self.assertIn('10 of 30 records updated', out.getvalue())
+        self.assertIn('records/s', out.getvalue())
+    
+    def test_dry_run_reports_without_writing(self):
+        """Test dry run reports changed rows and delta distribution only"""
+        before = self.stored_metrics()
+        out = StringIO()
+        call_command('recalculate_metrics', dry_run=True, stdout=out)
+        
+        self.assertEqual(self.stored_metrics(), before)
+        self.assertIn('10 records would change', out.getvalue())
+        self.assertIn('effectiveness:', out.getvalue())
+        self.assertIn('satisfaction: unchanged', out.getvalue())
+    
+    def test_resume_from_checkpoint(self):
+        """Test an interrupted run resumes and skips committed chunks"""
+        pks = sorted(FormOutput.objects.values_list('pk', flat=True))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'recalc.json')
+            # First chunk (containing the first stale row) is recorded as done
+            with open(path, 'w') as checkpoint_file:
+                json.dump({'min_pk': pks[0], 'max_pk': pks[-1], 'span': 10, 'completed': [0]}, checkpoint_file)
+            
+            out = StringIO()
+            call_command('recalculate_metrics', checkpoint=path, resume=True, stdout=out)
+            
+            self.assertFalse(os.path.exists(path))
+        
+        stored = self.stored_metrics()
+        self.assertIn('Resuming from', out.getvalue())
+        self.assertEqual(stored['recalc_000'][0], 0.0)
+        self.assertEqual(stored['recalc_012'], self.expected['recalc_012'])
+        self.assertIn('6 of 20 records updated', out.getvalue())
+    
+    def test_single_session(self):
+        """Test recalculation limited to one session"""
+        out = StringIO()
+        call_command('recalculate_metrics', session_id='recalc_003', stdout=out)
+        
+        stored = self.stored_metrics()
+        self.assertEqual(stored['recalc_003'], self.expected['recalc_003'])
+        self.assertEqual(stored['recalc_006'][0], 0.0)
+    
+    def test_sql_mode(self):
+        """Test rescoring the table with a single UPDATE statement"""
+        out = StringIO()
+        call_command('recalculate_metrics', sql=True, dry_run=True, stdout=out)
+        self.assertIn('10 records would change', out.getvalue())
+        
+        with self.assertNumQueries(1):
+            call_command('recalculate_metrics', sql=True, stdout=StringIO())
+        
+        stored = self.stored_metrics()
+        for session_id, expected in self.expected.items():
+            for actual_value, expected_value in zip(stored[session_id], expected):
+                self.assertAlmostEqual(actual_value, expected_value, delta=0.011)
+
+
+class ParallelWorkersTestCase(SimpleTestCase):
+    """
+    Runs the commands with --workers in a separate process
+
+    Worker processes cannot see the in-memory test database, so each test
+    migrates a throwaway SQLite file and points the commands at it.
+    """
+    
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'parallel_settings.py'), 'w') as settings_file:
+            settings_file.write(
+                'from core.settings import *\n'
+                f'DATABASES = {{"default": {{"ENGINE": "django.db.backends.sqlite3", '
+                f'"NAME": {os.path.join(directory, "db.sqlite3")!r}}}}}\n'
+            )
+        self.env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE='parallel_settings',
+            PYTHONPATH=os.pathsep.join([directory, str(settings.BASE_DIR)]),
+        )
+        self.manage('migrate', '--verbosity', '0')
+        self.manage('generate_data', '--count', '40')
+    
+    def manage(self, *args):
+        result = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *args],
+            env=self.env, capture_output=True, text=True, timeout=120
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn('Traceback', result.stderr)
+        return result.stdout
+    
+    def test_recalculate_metrics_with_workers(self):
+        output = self.manage('recalculate_metrics', '--workers', '2', '--chunk-size', '10')
+        
+        self.assertIn('Scanned 40 records', output)
+        self.assertIn('Successfully recalculated metrics', output)
+    
+    def test_backfill_rollups_with_workers(self):
+        output = self.manage('backfill_rollups', '--workers', '2', '--chunk-size', '10')
+        
+        self.assertIn('for 40 sessions in 4 chunks', output)
+
+
+class SweepMetricsCommandTestCase(TestCase):
+    """Integration tests for the sweep_metrics management command"""
+    
+    def test_upgrades_stale_rows_in_batches(self):
+        """Test sweeper upgrades every stale row and leaves current rows alone"""
+        FormOutput.objects.bulk_create([
+            FormOutput(
+                session_id=f'sweep_{i:03d}',
+                time_spent_sec=40 + i,
+                steps_taken=7 + (i % 4),
+                completion_status=['success', 'partial', 'failure'][i % 3],
+                fields_completed=i % 7,
+                total_steps=7
+            )
+            for i in range(25)
+        ])
+        current = FormOutput.objects.create(session_id='sweep_current', completion_status='success')
+        FormOutput.objects.filter(pk=current.pk).update(usability_index=1.0)
+        
+        out = StringIO()
+        call_command('sweep_metrics', batch_size=10, pause=0, stdout=out)
+        
+        self.assertFalse(FormOutput.objects.stale().exists())
+        self.assertIn('Upgraded 25 records in 3 batches', out.getvalue())
+        self.assertEqual(FormOutput.objects.get(pk=current.pk).usability_index, 1.0)
+        
+        for session in FormOutput.objects.exclude(pk=current.pk):
+            stored = session.usability_index
+            session.update_all_metrics()
+            self.assertEqual(stored, session.usability_index)
+    
+    def test_max_batches(self):
+        """Test sweeper stops after the requested number of batches"""
+        FormOutput.objects.bulk_create([FormOutput(session_id=f'sweep_{i:03d}') for i in range(5)])
+        
+        out = StringIO()
+        call_command('sweep_metrics', batch_size=2, max_batches=1, pause=0, stdout=out)
+        
+        self.assertEqual(FormOutput.objects.stale().count(), 3)
+        self.assertIn('3 stale records remain', out.getvalue())
+
+
+class RebuildTotalsCommandTestCase(TestCase):
+    """Integration tests for the rebuild_totals management command"""
+    
+    def test_rebuild_restores_totals(self):
+        """Test totals that drifted are recomputed from FormOutput"""
+        FormOutput.objects.create(session_id='rebuild_001', completion_status='success', fields_completed=7)
+        FormOutput.objects.create(session_id='rebuild_002', completion_status='failure')
+        DashboardTotals.objects.update(sessions=99)
+        
+        out = StringIO()
+        call_command('rebuild_totals', stdout=out)
+        
+        self.assertIn('Successfully rebuilt dashboard totals for 2 sessions', out.getvalue())
+        self.assertEqual(DashboardTotals.objects.get(completion_status='success').sessions, 1)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 0)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='failure').sessions, 1)
+
+
+class BackfillRollupsCommandTestCase(TestCase):
+    """Integration tests for the backfill_rollups management command"""
+    
+    def test_backfill_rebuilds_rollups(self):
+        """Test rollups are rebuilt from FormOutput across several chunks"""
+        for index in range(12):
+            FormOutput.objects.create(
+                session_id=f'backfill_{index:03d}',
+                completion_status=['success', 'partial', 'failure'][index % 3],
+                fields_completed=3
+            )
+        MetricsRollup.objects.all().delete()
+        
+        out = StringIO()
+        call_command('backfill_rollups', chunk_size=5, stdout=out)
+        
+        self.assertIn('for 12 sessions in 3 chunks', out.getvalue())
+        for granularity in ['hour', 'day']:
+            rows = MetricsRollup.objects.filter(granularity=granularity)
+            self.assertEqual(sum(row.sessions for row in rows), 12)
+
+
+class ExportSessionsCommandTestCase(TestCase):
+    """Integration tests for the export_sessions management command"""
+    
+    def setUp(self):
+        for index in range(5):
+            FormOutput.objects.create(session_id=f'export_cmd_{index}', completion_status='success', fields_completed=7)
+    
+    def test_export_to_stdout(self):
+        out = StringIO()
+        call_command('export_sessions', format='ndjson', chunk_size=2, stdout=out)
+        
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record['session_id'] for record in records], [f'export_cmd_{index}' for index in range(5)])
+    
+    def test_gzip_export_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sessions.csv.gz')
+            out = StringIO()
+            call_command('export_sessions', output=path, gzip=True, stdout=out)
+            
+            with gzip.open(path, 'rt') as export_file:
+                lines = export_file.read().splitlines()
+        
+        self.assertIn('Exported sessions to', out.getvalue())
+        self.assertTrue(lines[0].startswith('id,session_id,created_at'))
+        self.assertEqual(len(lines), 6)
+
+
+class ReplayJournalCommandTestCase(TestCase):
+    """Integration tests for the replay_journal management command"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+    
+    def test_replays_pending_records_after_a_crash(self):
+        log = Journal(self.directory).open()
+        log.append({'type': 'update', 'session_id': 'replay_001', 'deltas': None, 'values': {'steps_taken': 5}})
+        log.append({
+            'type': 'complete', 'session_id': 'replay_001', 'completion_status': 'failure', 'user_group_data': {}
+        })
+        log.close()
+        # A record torn by the crash, never acknowledged
+        with open(segment_paths(self.directory)[-1], 'ab') as segment:
+            segment.write(b'1234abcd {"seq":3,')
+        
+        out = StringIO()
+        call_command('replay_journal', directory=self.directory, stdout=out)
+        self.assertIn('Applied 2 journal records', out.getvalue())
+        self.assertIn('up to sequence 2', out.getvalue())
+        
+        session = FormOutput.objects.get(session_id='replay_001')
+        self.assertEqual((session.steps_taken, session.completion_status), (5, 'failure'))
+        self.assertEqual(UserGroup.objects.get(form_output=session).failure_steps_completed, 5)
+        
+        out = StringIO()
+        call_command('replay_journal', directory=self.directory, stdout=out)
+        self.assertIn('Applied 0 journal records', out.getvalue())
+        self.assertEqual(UserGroup.objects.count(), 1)
+    
+    def test_empty_directory(self):
+        out = StringIO()
+        call_command('replay_journal', directory=self.directory, stdout=out)
+        self.assertIn('No journal segments', out.getvalue())
+
+
+class BenchmarkHeartbeatsCommandTestCase(TransactionTestCase):
+    """Integration tests for the benchmark_heartbeats management command"""
+    
+    def test_group_commit_run_reports_latency_and_cleans_up(self):
+        out = StringIO()
+        call_command('benchmark_heartbeats', mode='group', sessions=4, heartbeats=3, stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('p99', output)
+        self.assertIn('written: 12 in', output)
+        self.assertIn('failed: 0', output)
+        self.assertFalse(FormOutput.objects.exists())
+    
+    def test_rejects_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_heartbeats', sessions=0, stdout=StringIO())
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from usability.models import FormOutput
+from usability.queries import build_session_query
+
+
+class SessionQueryPlanTestCase(TestCase):
+    """Filtered session queries must be answered from the composite indexes"""
+    
+    def setUp(self):
+        FormOutput.objects.bulk_create([
+            FormOutput(session_id=f'plan_{index:04d}', completion_status=['success', 'partial', 'failure'][index % 3])
+            for index in range(300)
+        ])
+    
+    def plan(self, params):
+        queryset, ordering = build_session_query(params)
+        plan = queryset.order_by(ordering, '-id')[:101].explain()
+        print(f"Query plan for {params}:\n  " + plan.replace('\n', '\n  '))
+        return plan
+    
+    def test_status_and_date_range_use_status_index(self):
+        plan = self.plan({'completion_status': 'success', 'created_after': '2026-01-01', 'created_before': '2026-02-01'})
+        
+        self.assertIn('formoutput_status_created_idx', plan)
+        self.assertNotIn('SCAN usability_formoutput\n', plan + '\n')
+    
+    def test_status_list_uses_status_index(self):
+        plan = self.plan({'completion_status': 'success,partial', 'min_usability_index': '50'})
+        
+        self.assertIn('formoutput_status_created_idx', plan)
+    
+    def test_date_range_uses_created_index(self):
+        plan = self.plan({'created_after': '2026-01-01', 'created_before': '2026-02-01'})
+        
+        self.assertIn('formoutput_created_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_default_listing_walks_created_index(self):
+        plan = self.plan({})
+        
+        self.assertIn('formoutput_created_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
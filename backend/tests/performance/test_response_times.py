@@ -1,6 +1,10 @@
-from django.test import TestCase, Client
+from django.test import AsyncRequestFactory, TestCase, Client
 from django.test.utils import override_settings
+from asgiref.sync import sync_to_async
+from usability import async_views, views
 from usability.models import FormOutput
+import asyncio
+import json
 import time
 import statistics
 from unittest import skipIf
@@ -131,6 +135,33 @@ class APIResponseTimeTestCase(PerformanceBaseTestCase):
             )
             
             print(f"Recent Sessions (limit={limit}) Performance: {stats['average']:.3f}s")
+    
+    def test_lean_serializer_performance(self):
+        """Test the .values() serialization path against FormOutputSerializer"""
+        from usability.serializers import FormOutputSerializer, FormOutputValuesSerializer
+        
+        sessions = FormOutput.objects.order_by('-created_at', '-id')
+        lean = FormOutputValuesSerializer()
+        
+        def model_path():
+            return FormOutputSerializer(sessions.all(), many=True).data
+        
+        def lean_path():
+            return lean.serialize(lean.values(sessions.all()))
+        
+        self.assertEqual(lean_path(), model_path())
+        
+        model_stats = self.measure_multiple_executions(model_path, iterations=10)
+        lean_stats = self.measure_multiple_executions(lean_path, iterations=10)
+        
+        self.assertLess(
+            lean_stats['median'], model_stats['median'],
+            f"Lean serializer {lean_stats['median']:.4f}s is not faster than ModelSerializer {model_stats['median']:.4f}s"
+        )
+        
+        print("Session Serialization (100 sessions):")
+        print(f"  ModelSerializer: {model_stats['median'] * 1000:.2f}ms")
+        print(f"  Values path: {lean_stats['median'] * 1000:.2f}ms")
 
 
 class DatabasePerformanceTestCase(PerformanceBaseTestCase):
@@ -220,6 +251,81 @@ class DatabasePerformanceTestCase(PerformanceBaseTestCase):
         
         print(f"Metrics Calculation Performance: {stats['average']:.3f}s")
 
+    
+    def test_batch_scoring_performance(self):
+        """Test vectorized scoring of a large batch against per-instance scoring"""
+        import numpy as np
+        from usability.batch_scoring import score_batch
+        
+        size = 200000
+        rng = np.random.default_rng(0)
+        columns = {
+            'time_spent_sec': rng.uniform(0, 200, size),
+            'steps_taken': rng.integers(0, 20, size),
+            'backtracks': rng.integers(0, 8, size),
+            'error_counts': rng.integers(0, 8, size),
+            'fields_completed': rng.integers(0, 8, size),
+            'total_steps': np.full(size, 7),
+            'completion_status': rng.choice(np.array(['success', 'partial', 'failure']), size),
+        }
+        
+        _, batch_time = self.measure_execution_time(score_batch, **columns)
+        
+        def score_instances(count=2000):
+            for i in range(count):
+                FormOutput(**{field: values[i] for field, values in columns.items()}).update_all_metrics()
+        
+        _, instance_time = self.measure_execution_time(score_instances)
+        projected_instance_time = instance_time * size / 2000
+        
+        self.assertLess(
+            batch_time,
+            self.performance_threshold['bulk_operation_time'],
+            f"Batch scoring of {size} sessions took {batch_time:.3f}s"
+        )
+        
+        print(f"Batch Scoring Performance ({size} sessions):")
+        print(f"  Vectorized: {batch_time:.3f}s")
+        print(f"  Per-instance (projected): {projected_instance_time:.3f}s")
+
+    def test_export_memory_is_flat(self):
+        """Test streaming export memory does not grow with the number of sessions"""
+        import tracemalloc
+        from usability.export import stream_export
+        
+        # Both runs span many chunks, so peak memory is set by one chunk and
+        # the gzip/CSV buffers, not by the number of rows
+        chunk_size = 500
+        
+        def peak_export_memory():
+            tracemalloc.start()
+            exported = sum(
+                len(chunk)
+                for chunk in stream_export(FormOutput.objects.all(), 'csv', gzip=True, chunk_size=chunk_size)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return exported, peak
+        
+        def add_sessions(start, count):
+            FormOutput.objects.bulk_create([
+                FormOutput(session_id=f'export_mem_{i:06d}', time_spent_sec=i % 120, steps_taken=7,
+                           completion_status=['success', 'partial', 'failure'][i % 3], fields_completed=i % 8)
+                for i in range(start, start + count)
+            ])
+        
+        add_sessions(0, 5000)
+        small_size, small_peak = peak_export_memory()
+        add_sessions(5000, 20000)
+        large_size, large_peak = peak_export_memory()
+        
+        self.assertGreater(large_size, small_size * 4)
+        self.assertLess(large_peak, small_peak * 1.5, "Export memory grew with the number of sessions")
+        
+        print("Streaming Export Peak Memory:")
+        print(f"  5,000 sessions ({5000 // chunk_size} chunks): {small_peak / 1024:.0f} KiB")
+        print(f"  25,000 sessions ({25000 // chunk_size} chunks): {large_peak / 1024:.0f} KiB")
+
 
 class LoadTestCase(PerformanceBaseTestCase):
     """Test system performance under load"""
@@ -280,3 +386,50 @@ class LoadTestCase(PerformanceBaseTestCase):
         print(f"  Average response time: {avg_response_time:.3f}s")
         print(f"  Max response time: {max(response_times):.3f}s")
         print(f"  Min response time: {min(response_times):.3f}s")
+
+
+class AsyncViewsBenchmarkTestCase(PerformanceBaseTestCase):
+    """Throughput of the sync and async session views under concurrent sessions"""
+    
+    concurrent_sessions = 500
+    
+    def setUp(self):
+        super().setUp()
+        FormOutput.objects.bulk_create([
+            FormOutput(session_id=f'{prefix}_{i:03d}', time_spent_sec=20.0, steps_taken=3, total_steps=7)
+            for prefix in ('sync', 'async')
+            for i in range(self.concurrent_sessions)
+        ])
+    
+    async def run_sessions(self, prefix, call):
+        """Run every simulated session concurrently: two heartbeats, an analytics poll, a completion"""
+        factory = AsyncRequestFactory()
+        
+        async def simulate(session_id):
+            for steps in (4, 5):
+                request = factory.post('/', json.dumps({'steps_taken': steps}), content_type='application/json')
+                assert (await call('update_session_metrics', request, session_id)).status_code == 200
+            assert (await call('get_session_analytics', factory.get('/'), session_id)).status_code == 200
+            request = factory.post('/', json.dumps({'completion_status': 'success'}), content_type='application/json')
+            assert (await call('complete_session', request, session_id)).status_code == 200
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(simulate(f'{prefix}_{i:03d}') for i in range(self.concurrent_sessions)))
+        return time.perf_counter() - start
+    
+    @skipIf(not django.conf.settings.DEBUG, "Load tests only run in DEBUG mode")
+    async def test_sync_and_async_throughput(self):
+        def call_sync(name, request, session_id):
+            # As the ASGI handler runs a sync view: on the shared sync thread
+            response = getattr(views, name)(request, session_id)
+            response.render()
+            return response
+        
+        async def call_async(name, request, session_id):
+            return await getattr(async_views, name)(request, session_id)
+        
+        sync_time = await self.run_sessions('sync', sync_to_async(call_sync))
+        async_time = await self.run_sessions('async', call_async)
+        
+        self.assertEqual(await FormOutput.objects.filter(completion_status='success').acount(), self.concurrent_sessions * 2)
+        self.assertLess(async_time, sync_time * 2, "Async views are much slower than the sync views")
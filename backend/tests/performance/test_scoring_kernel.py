@@ -0,0 +1,145 @@
+from django.test import TestCase
+from usability import scoring_kernel
+from usability.models import FormOutput
+import itertools
+import math
+import time
+
+
+def reference_scores(session):
+    """Direct per-call computation the kernel replaces (math.exp and full branching on every call)"""
+    if session.completion_status == 'success':
+        steps_completed_successfully = session.total_steps
+    elif session.completion_status == 'partial':
+        steps_completed_successfully = session.fields_completed
+    else:
+        steps_completed_successfully = 0
+    base_effectiveness = (steps_completed_successfully / session.total_steps) * 100
+    if session.error_counts > 0:
+        effectiveness_penalty = 25 * (1 - math.exp(-session.error_counts / 3))
+    else:
+        effectiveness_penalty = 0
+    effectiveness = round(max(0, base_effectiveness - effectiveness_penalty), 2)
+    
+    if session.time_spent_sec <= 0:
+        time_m = 0
+    elif session.time_spent_sec >= 90.0:
+        time_m = 100.0
+    else:
+        time_m = (session.time_spent_sec / 90.0) * 100
+    extra_steps = session.steps_taken - session.total_steps if session.steps_taken > session.total_steps else 0
+    total_inefficiencies = session.backtracks + extra_steps
+    if total_inefficiencies > 0:
+        efficiency_penalty = 25 * (1 - math.exp(-total_inefficiencies / 3))
+    else:
+        efficiency_penalty = 0
+    base_efficiency = max(0, time_m - efficiency_penalty)
+    
+    if session.completion_status == 'success':
+        efficiency = round(base_efficiency, 2)
+    elif session.completion_status == 'partial':
+        completion_ratio = session.fields_completed / session.total_steps
+        if total_inefficiencies > 0:
+            inefficiency_penalty = 15 * (1 - math.exp(-total_inefficiencies / 3))
+        else:
+            inefficiency_penalty = 0
+        efficiency = round(max(0, base_efficiency * completion_ratio + 5 * completion_ratio - inefficiency_penalty), 2)
+    elif session.fields_completed > 0:
+        completion_ratio = session.fields_completed / session.total_steps
+        if total_inefficiencies > 0:
+            inefficiency_penalty = 20 * (1 - math.exp(-total_inefficiencies / 3))
+        else:
+            inefficiency_penalty = 0
+        efficiency = round(max(0, base_efficiency * completion_ratio * 0.5 + 3 * completion_ratio - inefficiency_penalty), 2)
+    else:
+        efficiency = 0.0
+    
+    if session.completion_status == 'success':
+        satisfaction = 68.0
+    elif session.completion_status == 'partial':
+        satisfaction = 34.0
+    else:
+        satisfaction = 0.0
+    
+    usability_index = round(0.40 * effectiveness + 0.30 * efficiency + 0.30 * satisfaction, 2)
+    return effectiveness, efficiency, satisfaction, usability_index
+
+
+class ScoringKernelPerformanceTestCase(TestCase):
+    """Micro-benchmark of the precomputed scoring kernel on the heartbeat path"""
+    
+    def setUp(self):
+        """Build heartbeat-like sessions covering in-table and out-of-table values"""
+        self.sessions = [
+            FormOutput(
+                session_id=f'kernel_{i}',
+                completion_status=status,
+                time_spent_sec=time_spent,
+                steps_taken=steps,
+                backtracks=backtracks,
+                error_counts=errors,
+                fields_completed=fields,
+                total_steps=7
+            )
+            for i, (status, time_spent, steps, backtracks, errors, fields) in enumerate(itertools.product(
+                ['success', 'partial', 'failure'],
+                [0.0, 14.2, 58.7, 90.0, 131.5],
+                [3, 7, 12, 90],
+                [0, 1, 3, -1],
+                [0, 2, 5, 100],
+                [0, 4, 7],
+            ))
+        ]
+        
+        # Typical heartbeat values, all within the precomputed tables
+        self.heartbeats = [
+            session for session in self.sessions
+            if session.steps_taken < 90 and session.backtracks >= 0 and session.error_counts < 100
+        ]
+    
+    def test_kernel_matches_direct_computation(self):
+        """Test table-driven metrics are identical to direct computation"""
+        for session in self.sessions:
+            session.update_all_metrics()
+            self.assertEqual(
+                (session.effectiveness, session.efficiency, session.satisfaction, session.usability_index),
+                reference_scores(session),
+                f'Mismatch for {session.session_id}'
+            )
+            
+            for method in ['calculate_effectiveness', 'calculate_efficiency',
+                           'calculate_satisfaction', 'calculate_usability_index']:
+                stored = getattr(session, method.replace('calculate_', ''))
+                self.assertEqual(getattr(session, method)(), stored)
+    
+    def test_decay_table_fallback(self):
+        """Test values outside the table are computed directly"""
+        size = scoring_kernel.DECAY_TABLE_SIZE
+        self.assertEqual(scoring_kernel.decay(size + 5), 1 - math.exp(-(size + 5) / 3))
+        self.assertEqual(scoring_kernel.decay(2.5), 1 - math.exp(-2.5 / 3))
+        self.assertEqual(scoring_kernel.decay(-3), 0)
+        self.assertEqual(scoring_kernel.decay(4), 1 - math.exp(-4 / 3))
+    
+    def test_per_call_cost_before_and_after(self):
+        """Compare per-call cost of direct computation and update_all_metrics"""
+        iterations = 50
+        calls = len(self.heartbeats) * iterations
+        
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            for session in self.heartbeats:
+                reference_scores(session)
+        direct_cost = (time.perf_counter() - start_time) / calls
+        
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            for session in self.heartbeats:
+                session.update_all_metrics()
+        kernel_cost = (time.perf_counter() - start_time) / calls
+        
+        print(f"Scoring Kernel Per-Call Cost ({calls} calls):")
+        print(f"  Direct computation: {direct_cost * 1e6:.2f}us")
+        print(f"  Kernel (update_all_metrics): {kernel_cost * 1e6:.2f}us")
+        
+        # Generous bound to absorb timing noise on shared machines
+        self.assertLess(kernel_cost, direct_cost * 1.5)
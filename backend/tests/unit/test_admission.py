@@ -0,0 +1,140 @@
+from django.test import TestCase, override_settings
+from unittest import mock
+from usability import admission
+from usability.admission import COMPLETION, DASHBOARD, HEARTBEAT, AdmissionController
+from usability.stats import admitted_requests, shed_requests
+
+
+class AdmissionControllerTestCase(TestCase):
+    """Unit tests for the token buckets behind admission control"""
+
+    def setUp(self):
+        admitted_requests.reset()
+        shed_requests.reset()
+        # Freeze the clock, so buckets only refill when a test moves it
+        self.now = 100.0
+        patcher = mock.patch('usability.admission.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def admitted(self, controller, request_class, count, session_id=None):
+        return sum(controller.admit(request_class, session_id) is None for _ in range(count))
+
+    def test_dashboard_reads_are_shed_before_heartbeats_and_completions(self):
+        controller = AdmissionController(rate=1, burst=10, session_rate=100, session_burst=100)
+
+        # Reads leave 3 tokens, heartbeats 1, completions none
+        self.assertEqual(self.admitted(controller, DASHBOARD, 10), 7)
+        self.assertEqual(self.admitted(controller, HEARTBEAT, 10, 'session_a'), 2)
+        self.assertEqual(self.admitted(controller, COMPLETION, 10), 1)
+
+        self.assertEqual(admitted_requests.snapshot(), {'completion': 1, 'heartbeat': 2, 'dashboard': 7})
+        self.assertEqual(shed_requests.snapshot(), {'completion': 9, 'heartbeat': 8, 'dashboard': 3, 'session_limited': 0})
+
+    def test_buckets_refill_over_time(self):
+        controller = AdmissionController(rate=2, burst=4, session_rate=100, session_burst=100)
+        self.assertEqual(self.admitted(controller, COMPLETION, 5), 4)
+        self.assertAlmostEqual(controller.admit(COMPLETION), 0.5)
+
+        self.now += 1
+        self.assertEqual(self.admitted(controller, COMPLETION, 5), 2)
+
+    def test_sessions_are_limited_separately(self):
+        controller = AdmissionController(rate=100, burst=100, session_rate=1, session_burst=3)
+
+        self.assertEqual(self.admitted(controller, HEARTBEAT, 5, 'session_a'), 3)
+        self.assertEqual(self.admitted(controller, HEARTBEAT, 5, 'session_b'), 3)
+        self.assertEqual(self.admitted(controller, COMPLETION, 1), 1)
+        self.assertAlmostEqual(controller.admit(HEARTBEAT, 'session_a'), 1.0)
+        self.assertEqual(shed_requests.snapshot()['session_limited'], 5)
+
+    def test_requests_take_their_cost_in_tokens(self):
+        controller = AdmissionController(rate=1, burst=10, session_rate=100, session_burst=100)
+
+        # Updates must leave 1 token, so a batch of 10 waits for one more
+        self.assertIsNone(controller.admit(HEARTBEAT, tokens=4))
+        self.assertAlmostEqual(controller.admit(HEARTBEAT, tokens=6), 1.0)
+        self.assertIsNone(controller.admit(HEARTBEAT, tokens=5))
+        self.assertEqual(self.admitted(controller, COMPLETION, 2), 1)
+
+    def test_requests_costing_more_than_the_burst_wait_for_a_full_bucket(self):
+        controller = AdmissionController(rate=1, burst=10, session_rate=100, session_burst=100)
+        self.assertIsNone(controller.admit(COMPLETION))
+        self.assertAlmostEqual(controller.admit(COMPLETION, tokens=25), 1.0)
+
+        # Admitted in full once the bucket refills, leaving it 15 tokens in debt
+        self.now += 1
+        self.assertIsNone(controller.admit(COMPLETION, tokens=25))
+        self.assertAlmostEqual(controller.admit(COMPLETION), 16.0)
+
+
+@override_settings(
+    USABILITY_ADMISSION=True, USABILITY_ADMISSION_RATE=1, USABILITY_ADMISSION_BURST=5,
+    USABILITY_ADMISSION_SESSION_RATE=1, USABILITY_ADMISSION_SESSION_BURST=2
+)
+class AdmissionControlMiddlewareTestCase(TestCase):
+    """Requests turned away by admission control are answered with 429"""
+
+    def setUp(self):
+        admission.reset()
+        self.addCleanup(admission.reset)
+        shed_requests.reset()
+
+    def test_heartbeats_beyond_the_session_burst_are_shed(self):
+        statuses = [
+            self.client.post('/api/sessions/admit_001/update/', {'steps_taken': 1}, content_type='application/json')
+            for _ in range(3)
+        ]
+        self.assertEqual([response.status_code for response in statuses], [200, 200, 429])
+        self.assertEqual(statuses[-1]['Retry-After'], '1')
+        self.assertEqual(statuses[-1].json(), {'error': 'Too many requests, retry later'})
+
+        # Completions are still admitted, dashboard reads no longer are
+        response = self.client.post(
+            '/api/sessions/admit_001/complete/', {'completion_status': 'success'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/dashboard/summary/').status_code, 429)
+
+        stats = self.client.get('/api/ingest/stats/').json()
+        self.assertEqual(stats['shed_requests'], {'completion': 0, 'heartbeat': 1, 'dashboard': 1, 'session_limited': 1})
+        self.assertEqual(stats['admitted_requests']['completion'], 1)
+
+    async def test_async_requests_are_shed(self):
+        statuses = [
+            (await self.async_client.post(
+                '/api/sessions/admit_002/update/', {'steps_taken': 1}, content_type='application/json'
+            )).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_batches_take_a_token_per_entry(self):
+        batch = {
+            'updates': [{'session_id': f'admit_{i:03d}', 'steps_taken': 1} for i in range(3)],
+            'completions': [{'session_id': 'admit_000', 'completion_status': 'success'}],
+        }
+        response = self.client.post('/api/sessions/batch/', batch, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        # 4 of the 5 tokens are gone, and updates must leave half a token
+        response = self.client.post(
+            '/api/sessions/batch/', {'updates': batch['updates'][:1]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(shed_requests.snapshot()['heartbeat'], 1)
+
+    def test_retry_after_is_exposed_cross_origin(self):
+        for _ in range(2):
+            self.client.post('/api/sessions/admit_003/update/', {'steps_taken': 1}, content_type='application/json')
+        response = self.client.post(
+            '/api/sessions/admit_003/update/', {'steps_taken': 1}, content_type='application/json',
+            HTTP_ORIGIN='http://localhost:5173'
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://localhost:5173')
+        self.assertIn('Retry-After', response['Access-Control-Expose-Headers'].split(', '))
+
+    def test_other_routes_are_not_controlled(self):
+        for _ in range(10):
+            self.assertEqual(self.client.get('/api/sessions/').status_code, 200)
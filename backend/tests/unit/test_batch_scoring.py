@@ -0,0 +1,80 @@
+from django.test import TestCase
+from usability.batch_scoring import score_batch
+from usability.models import FormOutput
+import itertools
+import random
+
+
+class BatchScoringTestCase(TestCase):
+    """Unit tests for the vectorized NumPy scoring engine"""
+    
+    def score_with_model(self, rows):
+        """Score rows one at a time with the FormOutput methods"""
+        scores = []
+        for row in rows:
+            session = FormOutput(**row)
+            session.update_all_metrics()
+            scores.append({field: getattr(session, field) for field in FormOutput.METRIC_FIELDS})
+        return scores
+    
+    def score_with_engine(self, rows):
+        """Score rows as columns with the batch engine"""
+        columns = {
+            field: [row[field] for row in rows]
+            for field in ['time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+                          'fields_completed', 'total_steps', 'completion_status']
+        }
+        results = score_batch(**columns)
+        return [
+            {field: float(results[field][i]) for field in FormOutput.METRIC_FIELDS}
+            for i in range(len(rows))
+        ]
+    
+    def test_matches_model_on_grid(self):
+        """Test engine matches per-instance methods across a grid of inputs"""
+        rows = [
+            {
+                'completion_status': status,
+                'time_spent_sec': time_spent,
+                'steps_taken': steps,
+                'backtracks': backtracks,
+                'error_counts': errors,
+                'fields_completed': fields,
+                'total_steps': 7,
+            }
+            for status, time_spent, steps, backtracks, errors, fields in itertools.product(
+                ['success', 'partial', 'failure'],
+                [0.0, 0.5, 45.0, 60.0, 89.99, 90.0, 120.0],
+                [0, 7, 12],
+                [0, 1, 4],
+                [0, 2, 6],
+                [0, 3, 6, 7],
+            )
+        ]
+        
+        self.assertEqual(self.score_with_engine(rows), self.score_with_model(rows))
+    
+    def test_matches_model_on_random_sessions(self):
+        """Test engine matches per-instance methods bit for bit on random sessions"""
+        rng = random.Random(42)
+        rows = []
+        for _ in range(5000):
+            total_steps = rng.randint(1, 10)
+            rows.append({
+                'completion_status': rng.choice(['success', 'partial', 'failure']),
+                'time_spent_sec': rng.choice([rng.uniform(0, 200), round(rng.uniform(0, 200), 1)]),
+                'steps_taken': rng.randint(0, 20),
+                'backtracks': rng.randint(0, 8),
+                'error_counts': rng.randint(0, 8),
+                'fields_completed': rng.randint(0, total_steps),
+                'total_steps': total_steps,
+            })
+        
+        self.assertEqual(self.score_with_engine(rows), self.score_with_model(rows))
+    
+    def test_empty_batch(self):
+        """Test engine handles empty columns"""
+        results = score_batch([], [], [], [], [], [], [])
+        
+        for field in FormOutput.METRIC_FIELDS:
+            self.assertEqual(len(results[field]), 0)
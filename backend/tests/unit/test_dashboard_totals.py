@@ -0,0 +1,182 @@
+from django.test import TestCase
+from usability.metric_versions import CURRENT_METRICS_VERSION
+from usability.models import DashboardTotals, FormOutput, MetricsRollup
+from usability.totals import TOTAL_FIELDS, totals_by_rollup, totals_by_status
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+
+class DashboardTotalsTestCase(TestCase):
+    """Unit tests for the incrementally maintained dashboard totals"""
+    
+    def setUp(self):
+        for index, status_value in enumerate(['success', 'partial', 'partial', 'failure']):
+            FormOutput.objects.create(
+                session_id=f'totals_{index}',
+                time_spent_sec=30.0 + index * 20,
+                steps_taken=7 + index,
+                backtracks=index,
+                error_counts=index % 2,
+                completion_status=status_value,
+                fields_completed=2 + index,
+                total_steps=7
+            )
+    
+    def assertTotalsMatchTable(self):
+        """Stored totals must equal a fresh aggregate over FormOutput"""
+        expected = totals_by_status(FormOutput.objects.all())
+        rows = {row.completion_status: row for row in DashboardTotals.objects.all()}
+        
+        self.assertEqual(len(rows), 3)
+        for completion_status, row in rows.items():
+            self.assertEqual(row.metrics_version, CURRENT_METRICS_VERSION)
+            for field in TOTAL_FIELDS:
+                self.assertAlmostEqual(
+                    getattr(row, DashboardTotals.column(field)),
+                    expected.get(completion_status, {}).get(field, 0),
+                    places=6,
+                    msg=f'{completion_status} {field}'
+                )
+    
+    def assertRollupsMatchTable(self):
+        """Stored rollups must equal a fresh hourly and daily aggregate over FormOutput"""
+        expected = totals_by_rollup(FormOutput.objects.all())
+        rows = {
+            (row.granularity, row.bucket_start, row.completion_status): row
+            for row in MetricsRollup.objects.all()
+        }
+        
+        for key, values in expected.items():
+            self.assertIn(key, rows)
+            for field in TOTAL_FIELDS:
+                self.assertAlmostEqual(rows[key].total(field), values[field], places=6, msg=f'{key} {field}')
+        # Buckets that were emptied stay behind with zero totals
+        for key, row in rows.items():
+            if key not in expected:
+                self.assertEqual(row.sessions, 0)
+                self.assertAlmostEqual(row.total('usability_index'), 0.0, places=6)
+    
+    def test_create_updates_totals(self):
+        """Test creating sessions adds them to their status totals"""
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 2)
+    
+    def test_status_move(self):
+        """Test a session moving between statuses is moved between totals"""
+        session = FormOutput.objects.get(session_id='totals_1')
+        session.completion_status = 'success'
+        session.fields_completed = 7
+        session.time_spent_sec = 80.0
+        session.save()
+        
+        self.assertEqual(DashboardTotals.objects.get(completion_status='success').sessions, 2)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 1)
+        self.assertTotalsMatchTable()
+    
+    def test_completion_path(self):
+        """Test completing a session through the API moves it to its final status"""
+        session = FormOutput.objects.get(session_id='totals_3')
+        response = self.client.post(
+            '/api/sessions/totals_3/complete/', {'completion_status': 'partial'}, content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='failure').sessions, 0)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 3)
+        self.assertTotalsMatchTable()
+        session.refresh_from_db()
+        self.assertEqual(session.completion_status, 'partial')
+    
+    def test_write_between_load_and_save(self):
+        """Test a heartbeat landing after an instance was loaded is not subtracted twice"""
+        session = FormOutput.objects.get(session_id='totals_1')
+        response = self.client.post(
+            '/api/sessions/totals_1/update/', {'steps_taken': 15, 'error_counts': 3, 'time_spent_sec': 75.0},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        session.completion_status = 'success'
+        session.save()
+        
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 1)
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+    
+    def test_deletes(self):
+        """Test instance and queryset deletes subtract from the totals"""
+        FormOutput.objects.get(session_id='totals_0').delete()
+        FormOutput.objects.filter(completion_status='partial').delete()
+        
+        self.assertEqual(DashboardTotals.objects.get(completion_status='success').sessions, 0)
+        self.assertEqual(DashboardTotals.objects.get(completion_status='partial').sessions, 0)
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+    
+    def test_bulk_writes(self):
+        """Test bulk_create and bulk_update apply deltas"""
+        created = FormOutput.objects.bulk_create([
+            FormOutput(session_id=f'totals_bulk_{index}', time_spent_sec=50.0, steps_taken=8,
+                       completion_status='partial', fields_completed=3, total_steps=7)
+            for index in range(5)
+        ])
+        self.assertTotalsMatchTable()
+        
+        for obj in created[:3]:
+            obj.completion_status = 'failure'
+            obj.error_counts = 4
+        FormOutput.objects.bulk_update(created[:3], ['completion_status', 'error_counts'])
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+    
+    def test_increment_applies_deltas(self):
+        """Test F() increments keep the totals current without a recount"""
+        sessions = FormOutput.objects.filter(session_id='totals_1').increment(
+            {'backtracks': 2, 'error_counts': 1}, completion_status='success', fields_completed=7
+        )
+        
+        self.assertEqual(DashboardTotals.objects.get(completion_status='success').sessions, 2)
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+        
+        session = FormOutput.objects.get(session_id='totals_1')
+        self.assertEqual((session.backtracks, session.error_counts), (3, 2))
+        self.assertEqual(sessions[0].usability_index, session.usability_index)
+        usability_index = session.usability_index
+        session.save()
+        self.assertEqual(session.usability_index, usability_index)
+    
+    def test_queryset_update_rebuilds_on_read(self):
+        """Test updates of input columns mark the totals stale until the next read"""
+        FormOutput.objects.filter(completion_status='partial').update(completion_status='success')
+        self.assertEqual(DashboardTotals.objects.get(completion_status='success').metrics_version, 0)
+        
+        rows = {row.completion_status: row for row in DashboardTotals.current()}
+        
+        self.assertEqual(rows['success'].sessions, 3)
+        self.assertTotalsMatchTable()
+        self.assertRollupsMatchTable()
+    
+    def test_missing_rows_rebuilt(self):
+        """Test the totals are rebuilt when the table is empty"""
+        DashboardTotals.objects.all().delete()
+        
+        self.assertEqual(sum(row.sessions for row in DashboardTotals.current()), 4)
+        self.assertTotalsMatchTable()
+    
+    def test_rollup_buckets(self):
+        """Test sessions land in the UTC hour and day of their created_at"""
+        created_at = datetime(2026, 3, 14, 15, 9, 26, tzinfo=dt_timezone.utc)
+        session = FormOutput.objects.create(session_id='totals_pi', created_at=created_at, fields_completed=2)
+        
+        hour = MetricsRollup.objects.get(granularity='hour', bucket_start=created_at.replace(minute=0, second=0))
+        day = MetricsRollup.objects.get(granularity='day', bucket_start=datetime(2026, 3, 14, tzinfo=dt_timezone.utc))
+        self.assertEqual(hour.sessions, 1)
+        self.assertEqual(day.sessions, 1)
+        
+        # Moving a session in time moves it between buckets
+        session.created_at = created_at + timedelta(days=1)
+        session.save()
+        hour.refresh_from_db()
+        self.assertEqual(hour.sessions, 0)
+        self.assertRollupsMatchTable()
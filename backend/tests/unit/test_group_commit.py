@@ -0,0 +1,77 @@
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from usability import async_views, group_commit, views
+from usability.group_commit import GroupCommitWriter
+from usability.models import FormOutput
+import json
+
+
+class GroupCommitWriterTestCase(TestCase):
+    """Unit tests for batching writes through the group-commit writer"""
+
+    def setUp(self):
+        self.writer = GroupCommitWriter(window=0.05, max_batch=200)
+        self.addCleanup(self.writer.stop)
+
+    def test_writes_queued_together_share_a_batch(self):
+        futures = [self.writer.submit(lambda value: value * 2, value) for value in range(10)]
+
+        self.assertEqual([future.result(timeout=5) for future in futures], list(range(0, 20, 2)))
+        self.assertLessEqual(self.writer.batches, 2)
+        self.assertEqual(self.writer.writes, 10)
+
+    def test_failing_write_does_not_fail_the_batch(self):
+        def fail():
+            raise ValueError('bad heartbeat')
+
+        before = self.writer.submit(int, '1')
+        failing = self.writer.submit(fail)
+        after = self.writer.submit(int, '3')
+
+        self.assertEqual((before.result(timeout=5), after.result(timeout=5)), (1, 3))
+        self.assertIsInstance(failing.exception(timeout=5), ValueError)
+        self.assertEqual(self.writer.writes, 2)
+
+    def test_batch_size_is_capped(self):
+        writer = GroupCommitWriter(window=0.05, max_batch=3)
+        self.addCleanup(writer.stop)
+        futures = [writer.submit(int, value) for value in range(7)]
+
+        self.assertEqual([future.result(timeout=5) for future in futures], list(range(7)))
+        self.assertGreaterEqual(writer.batches, 3)
+
+
+@override_settings(USABILITY_GROUP_COMMIT=True)
+class GroupCommitUpdateTestCase(TransactionTestCase):
+    """Metrics updates go through the writer thread when group commit is enabled"""
+
+    def tearDown(self):
+        # Closes the writer thread's connection before the tables are flushed
+        group_commit.writer.stop()
+
+    def test_sync_and_async_views_write_through_the_writer(self):
+        request = RequestFactory().post(
+            '/', json.dumps({'steps_taken': 4, 'fields_completed': 2}), content_type='application/json'
+        )
+        response = views.update_session_metrics(request, 'group_001')
+        self.assertEqual(response.status_code, 200)
+
+        request = AsyncRequestFactory().post(
+            '/', json.dumps({'deltas': {'backtracks': 2}}), content_type='application/json'
+        )
+        response = async_to_sync(async_views.update_session_metrics)(request, 'group_001')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['backtracks'], 2)
+
+        session = FormOutput.objects.get(session_id='group_001')
+        self.assertEqual((session.steps_taken, session.fields_completed, session.backtracks), (4, 2, 2))
+        self.assertEqual(data['usability_index'], round(session.usability_index, 1))
+        self.assertEqual(group_commit.writer.writes, 2)
+
+        request = AsyncRequestFactory().post(
+            '/', json.dumps({'time_spent_sec': 'invalid'}), content_type='application/json'
+        )
+        response = async_to_sync(async_views.update_session_metrics)(request, 'group_001')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(group_commit.writer.writes, 2)
@@ -0,0 +1,215 @@
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.db import OperationalError
+from unittest import mock
+from usability import journal, views
+from usability.journal import Journal, JournalReader, apply_batch, segment_paths
+from usability.models import FormOutput, JournalCheckpoint, UserGroup
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+def update(session_id, **values):
+    return {'type': 'update', 'session_id': session_id, 'deltas': None, 'values': values}
+
+
+class JournalTestCase(SimpleTestCase):
+    """Unit tests for appending to and reading back the journal segments"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_records_read_back_in_order(self):
+        log = Journal(self.directory).open()
+        seqs = [log.append(update(f'journal_{i}', steps_taken=i)) for i in range(5)]
+        log.close()
+
+        records = JournalReader(self.directory).read(after=2, limit=10)
+        self.assertEqual(seqs, [1, 2, 3, 4, 5])
+        self.assertEqual([record['seq'] for record in records], [3, 4, 5])
+        self.assertEqual(records[0]['values'], {'steps_taken': 2})
+
+    def test_torn_record_is_dropped_on_reopen(self):
+        log = Journal(self.directory).open()
+        log.append(update('journal_1'))
+        log.close()
+        path = segment_paths(self.directory)[-1]
+        with open(path, 'ab') as f:
+            f.write(b'0badc0de {"seq":2,"type":"upd')
+
+        log = Journal(self.directory).open()
+        self.assertEqual(log.append(update('journal_2')), 2)
+        log.close()
+        self.assertEqual(
+            [record['session_id'] for record in JournalReader(self.directory).read(0, 10)],
+            ['journal_1', 'journal_2']
+        )
+
+    def test_corrupt_record_is_not_read(self):
+        log = Journal(self.directory).open()
+        log.append(update('journal_1'))
+        log.close()
+        path = segment_paths(self.directory)[-1]
+        path.write_bytes(path.read_bytes().replace(b'journal_1', b'journal_7'))
+
+        self.assertEqual(JournalReader(self.directory).read(0, 10), [])
+
+    def test_numbering_continues_after_the_checkpoint(self):
+        log = Journal(self.directory).open(after=41)
+        self.assertEqual(log.append(update('journal_1')), 42)
+        log.close()
+
+    def test_segments_rotate_at_the_size_limit(self):
+        log = Journal(self.directory, segment_bytes=200).open()
+        for i in range(10):
+            log.append(update(f'journal_{i}', steps_taken=i))
+        log.close()
+
+        self.assertGreater(len(segment_paths(self.directory)), 2)
+        reader = JournalReader(self.directory)
+        self.assertEqual([record['seq'] for record in reader.read(0, 4)], [1, 2, 3, 4])
+        self.assertEqual([record['seq'] for record in reader.read(4, 10)], list(range(5, 11)))
+
+    def test_concurrent_appends_share_fsyncs(self):
+        log = Journal(self.directory).open()
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.02)
+            fsync(fd)
+
+        seqs = []
+        with mock.patch('usability.journal.os.fsync', slow_fsync):
+            threads = [
+                threading.Thread(target=lambda i=i: seqs.append(log.append(update(f'journal_{i}'))))
+                for i in range(20)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        log.close()
+
+        self.assertEqual(sorted(seqs), list(range(1, 21)))
+        self.assertLess(log.syncs, 20)
+
+
+class JournalApplyTestCase(TestCase):
+    """Unit tests for applying journal records to the database"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.log = Journal(self.directory, segment_bytes=300).open()
+        self.addCleanup(self.log.close)
+
+    def test_batches_advance_the_checkpoint(self):
+        self.log.append(update('journal_apply', steps_taken=3, fields_completed=2))
+        self.log.append({
+            'type': 'update', 'session_id': 'journal_apply', 'deltas': {'backtracks': 2}, 'values': {}
+        })
+        self.log.append({
+            'type': 'complete', 'session_id': 'journal_apply',
+            'completion_status': 'partial', 'user_group_data': {'partial_notes': 'timed out'}
+        })
+
+        reader = JournalReader(self.directory)
+        self.assertEqual(apply_batch(reader, batch_size=2), (2, 0))
+        self.assertEqual(apply_batch(reader, batch_size=2), (1, 0))
+        self.assertEqual(apply_batch(reader, batch_size=2), (0, 0))
+
+        session = FormOutput.objects.get(session_id='journal_apply')
+        self.assertEqual((session.steps_taken, session.backtracks, session.completion_status), (3, 2, 'partial'))
+        self.assertEqual(UserGroup.objects.get(form_output=session).partial_notes, 'timed out')
+        self.assertEqual(JournalCheckpoint.current().applied_seq, 3)
+
+        # A fresh reader, as after a restart, finds nothing left to apply
+        self.assertEqual(apply_batch(JournalReader(self.directory)), (0, 0))
+        self.assertEqual(UserGroup.objects.count(), 1)
+
+    def test_failing_record_is_skipped(self):
+        self.log.append({
+            'type': 'complete', 'session_id': 'journal_missing', 'completion_status': 'success', 'user_group_data': {}
+        })
+        self.log.append(update('journal_after', steps_taken=1))
+
+        with self.assertLogs('usability.journal', 'ERROR'):
+            self.assertEqual(apply_batch(JournalReader(self.directory)), (1, 1))
+        self.assertTrue(FormOutput.objects.filter(session_id='journal_after').exists())
+        self.assertEqual(JournalCheckpoint.current().applied_seq, 2)
+
+    def test_database_errors_are_retried(self):
+        self.log.append(update('journal_retry', steps_taken=2))
+
+        with mock.patch('usability.journal.apply_record', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                apply_batch(JournalReader(self.directory))
+        self.assertEqual(JournalCheckpoint.current().applied_seq, 0)
+        self.assertFalse(FormOutput.objects.filter(session_id='journal_retry').exists())
+
+        self.assertEqual(apply_batch(JournalReader(self.directory)), (1, 0))
+        self.assertEqual(FormOutput.objects.get(session_id='journal_retry').steps_taken, 2)
+
+    def test_applied_segments_are_removed(self):
+        for i in range(10):
+            self.log.append(update(f'journal_{i}', steps_taken=i))
+        self.assertGreater(len(segment_paths(self.directory)), 1)
+
+        apply_batch(JournalReader(self.directory))
+        self.assertEqual(len(segment_paths(self.directory)), 1)
+        self.assertEqual(FormOutput.objects.filter(session_id__startswith='journal_').count(), 10)
+
+
+class JournalModeTestCase(TransactionTestCase):
+    """Metrics updates and completions are journaled and applied by the consumer in journal mode"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(USABILITY_JOURNAL=True, USABILITY_JOURNAL_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Drains the consumer and closes its connection before the tables are flushed
+        self.addCleanup(journal.close)
+
+    def test_requests_are_acknowledged_then_applied(self):
+        response = self.client.post(
+            '/api/sessions/journal_mode/update/', {'steps_taken': 4, 'fields_completed': 6},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['session_id'], 'journal_mode')
+        self.assertEqual(response.json()['journal_seq'], 1)
+
+        response = self.client.post(
+            '/api/sessions/journal_mode/complete/', {'completion_status': 'success'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['journal_seq'], 2)
+
+        response = self.client.post(
+            '/api/sessions/journal_mode/complete/', {'completion_status': 'done'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            '/api/sessions/journal_mode/complete/', {'user_group_data': {'favourite_colour': 'blue'}},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        request = RequestFactory().post(
+            '/', json.dumps({'deltas': {'backtracks': 1}}), content_type='application/json'
+        )
+        response = views.update_session_metrics(request, 'journal_mode')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['journal_seq'], 3)
+
+        journal.close()
+        session = FormOutput.objects.get(session_id='journal_mode')
+        self.assertEqual((session.steps_taken, session.backtracks, session.completion_status), (4, 1, 'success'))
+        self.assertEqual(UserGroup.objects.get(form_output=session).outcome, 'success')
+        self.assertEqual(JournalCheckpoint.current().applied_seq, 3)
@@ -0,0 +1,65 @@
+from django.test import TestCase
+from usability.models import FormOutput
+import itertools
+
+
+class MetricExpressionsTestCase(TestCase):
+    """Consistency tests for the ORM metric expressions against the Python methods"""
+    
+    def setUp(self):
+        """Create sessions covering every formula branch"""
+        sessions = [
+            FormOutput(
+                session_id=f'expr_{i:04d}',
+                completion_status=status,
+                time_spent_sec=time_spent,
+                steps_taken=steps,
+                backtracks=backtracks,
+                error_counts=errors,
+                fields_completed=fields,
+                total_steps=7
+            )
+            for i, (status, time_spent, steps, backtracks, errors, fields) in enumerate(itertools.product(
+                ['success', 'partial', 'failure'],
+                [0.0, 12.3, 45.0, 89.9, 90.0, 150.0],
+                [0, 7, 11],
+                [0, 2, 5],
+                [0, 1, 4],
+                [0, 3, 7],
+            ))
+        ]
+        FormOutput.objects.bulk_create(sessions)
+    
+    def test_computed_metrics_match_python_methods(self):
+        """Test SQL-computed metrics agree with calculate_* methods"""
+        sessions = list(FormOutput.objects.with_computed_metrics())
+        self.assertEqual(len(sessions), 1458)
+        
+        for session in sessions:
+            session.update_all_metrics()
+            for field in FormOutput.METRIC_FIELDS:
+                # Database ROUND may differ by one unit on half-way values
+                self.assertAlmostEqual(
+                    getattr(session, f'computed_{field}'), getattr(session, field), delta=0.011,
+                    msg=f'{field} mismatch for {session.session_id}'
+                )
+    
+    def test_filter_and_order_by_computed_metrics(self):
+        """Test querysets can sort and filter on metrics before they are stored"""
+        queryset = FormOutput.objects.with_computed_metrics()
+        
+        # Stored metrics are still zero because bulk_create skips save()
+        self.assertFalse(FormOutput.objects.filter(usability_index__gt=0).exists())
+        self.assertTrue(queryset.filter(computed_usability_index__gt=0).exists())
+        
+        best = queryset.order_by('-computed_usability_index').first()
+        self.assertEqual(best.completion_status, 'success')
+        self.assertEqual(best.computed_satisfaction, 68.0)
+    
+    def test_recalculate_metrics_single_update(self):
+        """Test rescoring the whole table with one UPDATE"""
+        with self.assertNumQueries(1):
+            updated = FormOutput.objects.recalculate_metrics()
+        
+        self.assertEqual(updated, 1458)
+        self.assertEqual(FormOutput.objects.filter(satisfaction=68.0).count(), 486)
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import TestCase
+from usability.metric_versions import CURRENT_METRICS_VERSION
+from usability.models import FormOutput
+from usability.serializers import FormOutputSerializer
+
+
+class MetricVersionsTestCase(TestCase):
+    """Unit tests for formula versioning and lazy rescoring on read"""
+    
+    def setUp(self):
+        """Create a stale session whose stored metrics were never calculated"""
+        # Reads are cached under the change sequence, which each test's rollback reuses
+        cache.clear()
+        FormOutput.objects.bulk_create([
+            FormOutput(
+                session_id='stale_001',
+                time_spent_sec=60.0,
+                steps_taken=9,
+                backtracks=1,
+                error_counts=2,
+                completion_status='partial',
+                fields_completed=4,
+                total_steps=7
+            )
+        ])
+        self.expected = FormOutput(
+            session_id='expected',
+            time_spent_sec=60.0,
+            steps_taken=9,
+            backtracks=1,
+            error_counts=2,
+            completion_status='partial',
+            fields_completed=4,
+            total_steps=7
+        )
+        self.expected.update_all_metrics()
+    
+    def test_save_records_current_version(self):
+        """Test saving a session stamps the current formula version"""
+        session = FormOutput.objects.create(session_id='fresh_001')
+        
+        self.assertEqual(session.metrics_version, CURRENT_METRICS_VERSION)
+        self.assertFalse(session.metrics_are_stale)
+        self.assertFalse(FormOutput.objects.stale().filter(pk=session.pk).exists())
+    
+    def test_refresh_stale_metrics_in_memory(self):
+        """Test stale rows are rescored on read without being written"""
+        session = FormOutput.objects.get(session_id='stale_001')
+        self.assertTrue(session.metrics_are_stale)
+        
+        self.assertTrue(session.refresh_stale_metrics())
+        self.assertEqual(session.usability_index, self.expected.usability_index)
+        self.assertFalse(session.refresh_stale_metrics())
+        
+        stored = FormOutput.objects.get(session_id='stale_001')
+        self.assertEqual(stored.usability_index, 0.0)
+        self.assertTrue(stored.metrics_are_stale)
+    
+    def test_read_endpoints_report_current_metrics(self):
+        """Test serializer, analytics and dashboard rescore stale rows"""
+        session = FormOutput.objects.get(session_id='stale_001')
+        self.assertEqual(FormOutputSerializer(session).data['efficiency'], self.expected.efficiency)
+        
+        analytics = self.client.get('/api/sessions/stale_001/analytics/').json()
+        self.assertEqual(analytics['usability_index'], round(self.expected.usability_index, 1))
+        
+        summary = self.client.get('/api/dashboard/summary/').json()
+        self.assertEqual(summary['avg_satisfaction'], 34.0)
+        self.assertAlmostEqual(summary['avg_effectiveness'], round(self.expected.effectiveness, 1), delta=0.1)
+        
+        self.assertEqual(FormOutput.objects.stale().count(), 1)
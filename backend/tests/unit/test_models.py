@@ -81,3 +81,19 @@ class FormOutputModelTestCase(TestCase):
         
         # This should be valid
         self.assertLessEqual(session.fields_completed, session.total_steps)
+    
+    def test_change_seq_grows_with_each_write(self):
+        """Test every write moves the session to a higher change sequence number"""
+        from usability.models import current_change_seq
+        
+        first = FormOutput.objects.create(session_id='seq_test_001')
+        second = FormOutput.objects.create(session_id='seq_test_002')
+        self.assertGreater(second.change_seq, first.change_seq)
+        
+        first.steps_taken = 3
+        first.save(update_fields=['steps_taken'])
+        self.assertGreater(first.change_seq, second.change_seq)
+        self.assertEqual(current_change_seq(), first.change_seq)
+        
+        user_group = UserGroup.objects.create(form_output=second, outcome='success')
+        self.assertGreater(user_group.change_seq, first.change_seq)
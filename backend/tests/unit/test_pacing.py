@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+from unittest import mock
+from usability import pacing
+from usability.pacing import IngestLoad, next_update_in_ms
+
+
+class NextUpdateIntervalTestCase(SimpleTestCase):
+    """Unit tests for the heartbeat interval hint"""
+
+    def setUp(self):
+        patcher = mock.patch.object(pacing, 'ingest_load', IngestLoad())
+        self.load = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_interval_follows_session_state(self):
+        self.assertEqual(next_update_in_ms(fields_completed=2, total_steps=7), 2000)
+        self.assertEqual(next_update_in_ms(fields_completed=5, total_steps=7), 1000)
+        self.assertEqual(next_update_in_ms(fields_completed=2, total_steps=7, idle=True), 5000)
+        self.assertEqual(next_update_in_ms(), 2000)
+
+    def test_interval_stretches_with_latency(self):
+        self.load.latency_ms = 150
+
+        self.assertEqual(next_update_in_ms(fields_completed=2), 6000)
+        self.assertEqual(next_update_in_ms(fields_completed=6), 3000)
+        self.assertEqual(next_update_in_ms(idle=True), 15000)
+
+    def test_interval_stretches_with_queue_depth(self):
+        self.load.in_flight = 100
+
+        self.assertEqual(self.load.queue_depth(), 100)
+        self.assertEqual(next_update_in_ms(), 4000)
+
+    def test_interval_is_capped(self):
+        self.load.latency_ms = 5000
+
+        self.assertEqual(next_update_in_ms(idle=True), pacing.MAX_INTERVAL_MS)
+
+    def test_tracked_updates_feed_the_latency_average(self):
+        with mock.patch('usability.pacing.time.perf_counter', side_effect=[0.0, 0.1]):
+            with self.load.track():
+                self.assertEqual(self.load.in_flight, 1)
+
+        self.assertEqual(self.load.in_flight, 0)
+        self.assertAlmostEqual(self.load.latency_ms, 10.0)
@@ -11,7 +11,7 @@ class FormOutputAdmin(admin.ModelAdmin):
     ]
     list_filter = ['completion_status', 'created_at']
     search_fields = ['session_id']
-    readonly_fields = ['effectiveness', 'efficiency', 'satisfaction', 'usability_index']
+    readonly_fields = ['effectiveness', 'efficiency', 'satisfaction', 'usability_index', 'metrics_version']
     ordering = ['-created_at']
 
 
@@ -0,0 +1,225 @@
+"""
+Admission control for the ingest endpoints and dashboard reads
+
+Every completion, metrics update and dashboard read takes a token from a
+global bucket refilled at USABILITY_ADMISSION_RATE per second, holding up to
+USABILITY_ADMISSION_BURST. Metrics updates also take one from their
+session's own bucket (USABILITY_ADMISSION_SESSION_RATE and _BURST), so one
+misbehaving client cannot use up the global budget. A batch takes one global
+token per update and completion it carries, so batching does not get writes
+past the rate.
+
+When demand exceeds the rate, requests are answered at once with 429 Too
+Many Requests and a Retry-After header, instead of queuing on the database
+and stretching everyone's latency. Each class of request must leave a share
+of the global burst behind (RESERVED_SHARE), so dashboard reads are shed
+first, then metrics updates, and completions last. Heartbeats carry absolute
+values, so a shed one is made up for by the next.
+
+Buckets are kept in memory by each server process; with several processes,
+divide the rates between them.
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+from .stats import admitted_requests, shed_requests
+
+
+COMPLETION = 'completion'
+HEARTBEAT = 'heartbeat'
+DASHBOARD = 'dashboard'
+
+# Request class of each admitted route, by URL name and method
+REQUEST_CLASSES = {
+    ('session-complete', 'POST'): COMPLETION,
+    ('session-update', 'POST'): HEARTBEAT,
+    ('session-batch', 'POST'): HEARTBEAT,
+    ('dashboard-summary', 'GET'): DASHBOARD,
+    ('recent-sessions', 'GET'): DASHBOARD,
+    ('dashboard-trends', 'GET'): DASHBOARD,
+    ('dashboard-changes', 'GET'): DASHBOARD,
+    ('dashboard-events', 'GET'): DASHBOARD,
+}
+
+
+
+def batch_entries(request):
+    """Updates and completions in a batch request, each charged one token"""
+    try:
+        data = json.loads(request.body)
+        return max(len(data.get('updates', [])) + len(data.get('completions', [])), 1)
+    except (ValueError, AttributeError, TypeError):
+        # Malformed batches are rejected by the view
+        return 1
+
+
+# Tokens taken by routes whose requests cost more than one, by URL name
+REQUEST_COSTS = {
+    'session-batch': batch_entries,
+}
+
+# Share of the global burst each class must leave in the bucket
+RESERVED_SHARE = {
+    COMPLETION: 0.0,
+    HEARTBEAT: 0.1,
+    DASHBOARD: 0.3,
+}
+
+# Session buckets kept, least recently used dropped first
+MAX_SESSION_BUCKETS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens):
+        """Seconds until the bucket holds tokens, 0 if it already does"""
+        return max(tokens - self.tokens, 0) / self.rate
+
+
+class AdmissionController:
+    def __init__(self, rate=None, burst=None, session_rate=None, session_burst=None):
+        self.rate = rate or settings.USABILITY_ADMISSION_RATE
+        self.burst = burst or settings.USABILITY_ADMISSION_BURST
+        self.session_rate = session_rate or settings.USABILITY_ADMISSION_SESSION_RATE
+        self.session_burst = session_burst or settings.USABILITY_ADMISSION_SESSION_BURST
+        self._lock = threading.Lock()
+        self._global = TokenBucket(self.rate, self.burst, time.monotonic())
+        self._sessions = OrderedDict()
+
+    def admit(self, request_class, session_id=None, tokens=1):
+        """
+        Take the tokens for one request
+
+        A request costing more than the bucket can hold waits for a full
+        bucket and leaves it in debt, so it is still charged in full.
+        Returns None if it is admitted, otherwise the seconds to wait before
+        retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._global.refill(now)
+            reserve = RESERVED_SHARE[request_class] * self.burst
+            wait = self._global.wait_time(reserve + min(tokens, self.burst - reserve))
+
+            session = None
+            if request_class == HEARTBEAT and session_id is not None:
+                session = self._session_bucket(session_id, now)
+                session_wait = session.wait_time(1)
+                if session_wait:
+                    shed_requests.incr('session_limited')
+                    wait = max(wait, session_wait)
+
+            if wait:
+                shed_requests.incr(request_class)
+                return wait
+            self._global.tokens -= tokens
+            if session is not None:
+                session.tokens -= 1
+        admitted_requests.incr(request_class)
+        return None
+
+    def _session_bucket(self, session_id, now):
+        bucket = self._sessions.get(session_id)
+        if bucket is None:
+            bucket = self._sessions[session_id] = TokenBucket(self.session_rate, self.session_burst, now)
+            if len(self._sessions) > MAX_SESSION_BUCKETS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+            bucket.refill(now)
+        return bucket
+
+
+_lock = threading.Lock()
+_controller = None
+
+
+def get_controller():
+    """The process's admission controller, created with the current settings on first use"""
+    global _controller
+    with _lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+def reset():
+    """Start again with full buckets, picking up changed settings"""
+    global _controller
+    with _lock:
+        _controller = None
+
+
+@receiver(setting_changed)
+def reset_on_setting_changed(setting, **kwargs):
+    if setting.startswith('USABILITY_ADMISSION'):
+        reset()
+
+
+def too_many_requests(retry_after):
+    response = JsonResponse({'error': 'Too many requests, retry later'}, status=429)
+    response['Retry-After'] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Sheds requests to the admitted routes that the controller turns away"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.shed(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.shed(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def shed(self, request):
+        """429 response if the request is turned away, None if it is admitted or not controlled"""
+        if not settings.USABILITY_ADMISSION:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        request_class = REQUEST_CLASSES.get((match.url_name, request.method))
+        if request_class is None:
+            return None
+        cost = REQUEST_COSTS.get(match.url_name)
+        retry_after = get_controller().admit(
+            request_class, match.kwargs.get('session_id'), cost(request) if cost else 1
+        )
+        if retry_after is None:
+            return None
+        return too_many_requests(retry_after)
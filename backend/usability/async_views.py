@@ -0,0 +1,167 @@
+"""
+Native async versions of the session hot-path views
+
+update_session_metrics, complete_session and get_session_analytics take the
+same requests and return the same JSON as their synchronous counterparts in
+views.py, but read and write through the async ORM (aget, asave), so under an
+ASGI server (core/asgi.py) a request waiting on the database holds no thread.
+Metrics updates and completions, which take several statements, go through
+views.write_session_update and views.write_session_completion on the sync
+thread, so both paths write alike.
+They are routed instead of the synchronous views when USABILITY_ASYNC_VIEWS is
+enabled.
+
+In journal mode the append, which waits for an fsync, runs in a worker
+thread of its own rather than on the event loop.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.vary import vary_on_headers
+from rest_framework import status
+
+from . import group_commit, journal
+from .conditional import session_conditional_response
+from .models import FormOutput
+from .pacing import ingest_load
+from .serializers import FormOutputSerializer
+from .views import (
+    SESSION_ID_PATTERN, build_session_analytics, update_interval_ms, validate_session_completion,
+    validate_session_update, write_session_completion, write_session_update
+)
+
+
+# Same compact encoding as DRF's JSONRenderer
+JSON_PARAMS = {'separators': (',', ':')}
+
+FORM_CONTENT_TYPES = {'application/x-www-form-urlencoded', 'multipart/form-data'}
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params=JSON_PARAMS)
+
+
+def parse_body(request):
+    """
+    Request payload like DRF's request.data: parsed JSON, or the form fields
+
+    Raises ValueError with DRF's message for malformed JSON.
+    """
+    if request.content_type in FORM_CONTENT_TYPES:
+        return request.POST
+    if not request.body:
+        return {}
+    try:
+        return json.loads(request.body)
+    except ValueError as exc:
+        raise ValueError(f'JSON parse error - {exc}')
+
+
+@csrf_exempt
+@require_POST
+async def update_session_metrics(request, session_id):
+    """
+    Update session metrics in real-time during testing
+    """
+    try:
+        data = parse_body(request)
+    except ValueError as e:
+        return json_response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        return json_response({'error': 'Invalid session_id'}, status=status.HTTP_400_BAD_REQUEST)
+
+    deltas, values, errors = validate_session_update(data)
+    if errors:
+        return json_response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if settings.USABILITY_JOURNAL:
+        # Acknowledged once on disk, applied to the database by the journal consumer
+        with ingest_load.track():
+            seq = await sync_to_async(journal.append, thread_sensitive=False)(
+                {'type': 'update', 'session_id': session_id, 'deltas': deltas, 'values': values}
+            )
+        return json_response({
+            'session_id': session_id,
+            'journal_seq': seq,
+            'next_update_in_ms': update_interval_ms(values=values)
+        }, status=status.HTTP_202_ACCEPTED)
+
+    with ingest_load.track():
+        if settings.USABILITY_GROUP_COMMIT:
+            # Committed together with other heartbeats by the group-commit writer
+            form_output = await asyncio.wrap_future(
+                group_commit.writer.submit(write_session_update, session_id, deltas, values)
+            )
+        else:
+            # Shared with the synchronous view: one transaction of several
+            # statements, run on the sync thread
+            form_output = await sync_to_async(write_session_update)(session_id, deltas, values)
+
+    # Return updated analytics, with when to send the next update
+    return json_response({**build_session_analytics(form_output), 'next_update_in_ms': update_interval_ms(form_output)})
+
+
+@csrf_exempt
+@require_POST
+async def complete_session(request, session_id):
+    """
+    Complete a testing session and create user group entry
+    """
+    try:
+        data = parse_body(request)
+    except ValueError as e:
+        return json_response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    completion_status, user_group_data, errors = validate_session_completion(data)
+    if errors:
+        return json_response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if settings.USABILITY_JOURNAL:
+        seq = await sync_to_async(journal.append, thread_sensitive=False)({
+            'type': 'complete', 'session_id': session_id,
+            'completion_status': completion_status, 'user_group_data': user_group_data
+        })
+        return json_response({
+            'message': f'Session completion accepted with status: {completion_status}',
+            'session_id': session_id,
+            'journal_seq': seq
+        }, status=status.HTTP_202_ACCEPTED)
+
+    try:
+        # Shared with the synchronous view, run on the sync thread
+        form_output = await sync_to_async(write_session_completion)(
+            session_id, completion_status, user_group_data
+        )
+    except FormOutput.DoesNotExist:
+        return json_response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return json_response({
+        'message': f'Session completed with status: {completion_status}',
+        'data': FormOutputSerializer(form_output).data
+    })
+
+
+@cache_control(no_cache=True)
+@vary_on_headers('Accept')
+@require_GET
+async def get_session_analytics(request, session_id):
+    """
+    Get real-time analytics for a specific session
+
+    Answers conditional GETs like the synchronous view, validating against
+    the row it reads, so a 200 costs one query instead of two.
+    """
+    form_output = await FormOutput.objects.filter(session_id=session_id).afirst()
+    if form_output is None:
+        return json_response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return session_conditional_response(
+        request, form_output, lambda: json_response(build_session_analytics(form_output))
+    )
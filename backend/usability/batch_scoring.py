@@ -0,0 +1,127 @@
+"""
+Vectorized usability scoring with NumPy
+
+Computes effectiveness, efficiency, satisfaction and usability index for whole
+columns of FormOutput inputs at once. The formulas mirror the per-instance
+FormOutput.calculate_* methods and produce identical values after rounding,
+so the engine can be used to rescore or simulate large numbers of sessions.
+"""
+import numpy as np
+
+from .scoring_kernel import BASELINE_TIME, SATISFACTION_SCORES, decay as scalar_decay
+
+
+def decay(counts):
+    """Return 1 - exp(-n / 3) for every count, 0 where the count is not positive"""
+    counts = np.asarray(counts, dtype=np.int64)
+    unique, inverse = np.unique(counts, return_inverse=True)
+    # Evaluate the scalar kernel on the distinct counts only, so the values are
+    # exactly those produced by the per-instance methods
+    table = np.array([scalar_decay(int(n)) for n in unique], dtype=np.float64)
+    return table[inverse].reshape(counts.shape)
+
+
+def round2(values):
+    """Round to 2 decimals with the same results as Python's round(value, 2)"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+
+    # np.round scales by 100 before rounding, which can land on the other side
+    # of a half-way point than Python's correctly rounded round(); recompute
+    # anything close to a tie with the builtin
+    scaled = values * 100
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ambiguous.any():
+        rounded[ambiguous] = [round(float(value), 2) for value in values[ambiguous]]
+    return rounded
+
+
+def calculate_effectiveness(completion_status, fields_completed, total_steps, error_counts):
+    """Vectorized FormOutput.calculate_effectiveness"""
+    completion_status = np.asarray(completion_status)
+    fields_completed = np.asarray(fields_completed, dtype=np.int64)
+    total_steps = np.asarray(total_steps, dtype=np.int64)
+
+    steps_completed_successfully = np.select(
+        [completion_status == 'success', completion_status == 'partial'],
+        [total_steps, fields_completed],
+        default=0
+    )
+    base_effectiveness = (steps_completed_successfully / total_steps) * 100
+    effectiveness_penalty = 25 * decay(error_counts)
+
+    return round2(np.maximum(0, base_effectiveness - effectiveness_penalty))
+
+
+def calculate_efficiency(completion_status, time_spent_sec, steps_taken, backtracks, fields_completed, total_steps):
+    """Vectorized FormOutput.calculate_efficiency"""
+    completion_status = np.asarray(completion_status)
+    time_spent_sec = np.asarray(time_spent_sec, dtype=np.float64)
+    steps_taken = np.asarray(steps_taken, dtype=np.int64)
+    backtracks = np.asarray(backtracks, dtype=np.int64)
+    fields_completed = np.asarray(fields_completed, dtype=np.int64)
+    total_steps = np.asarray(total_steps, dtype=np.int64)
+
+    time_m = np.where(
+        time_spent_sec <= 0, 0.0,
+        np.where(time_spent_sec >= BASELINE_TIME, 100.0, (time_spent_sec / BASELINE_TIME) * 100)
+    )
+
+    extra_steps = np.where(steps_taken > total_steps, steps_taken - total_steps, 0)
+    inefficiency_decay = decay(backtracks + extra_steps)
+    base_efficiency = np.maximum(0, time_m - 25 * inefficiency_decay)
+
+    completion_ratio = fields_completed / total_steps
+    partial_efficiency = np.maximum(
+        0, base_efficiency * completion_ratio + 5 * completion_ratio - 15 * inefficiency_decay
+    )
+    failure_efficiency = np.where(
+        fields_completed > 0,
+        np.maximum(0, base_efficiency * completion_ratio * 0.5 + 3 * completion_ratio - 20 * inefficiency_decay),
+        0.0
+    )
+
+    efficiency = np.select(
+        [completion_status == 'success', completion_status == 'partial'],
+        [base_efficiency, partial_efficiency],
+        default=failure_efficiency
+    )
+    return round2(efficiency)
+
+
+def calculate_satisfaction(completion_status):
+    """Vectorized FormOutput.calculate_satisfaction"""
+    completion_status = np.asarray(completion_status)
+    return np.select(
+        [completion_status == 'success', completion_status == 'partial'],
+        [SATISFACTION_SCORES['success'], SATISFACTION_SCORES['partial']],
+        default=SATISFACTION_SCORES['failure']
+    )
+
+
+def calculate_usability_index(effectiveness, efficiency, satisfaction):
+    """Vectorized FormOutput.calculate_usability_index"""
+    return round2(0.40 * np.asarray(effectiveness) + 0.30 * np.asarray(efficiency) + 0.30 * np.asarray(satisfaction))
+
+
+def score_batch(time_spent_sec, steps_taken, backtracks, error_counts,
+                fields_completed, total_steps, completion_status):
+    """
+    Score many sessions at once
+
+    Every argument is a column (list or array) with one entry per session.
+    Returns a dict mapping each FormOutput metric field name to an array of scores.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effectiveness = calculate_effectiveness(completion_status, fields_completed, total_steps, error_counts)
+        efficiency = calculate_efficiency(
+            completion_status, time_spent_sec, steps_taken, backtracks, fields_completed, total_steps
+        )
+    satisfaction = calculate_satisfaction(completion_status)
+
+    return {
+        'effectiveness': effectiveness,
+        'efficiency': efficiency,
+        'satisfaction': satisfaction,
+        'usability_index': calculate_usability_index(effectiveness, efficiency, satisfaction),
+    }
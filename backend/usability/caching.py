@@ -0,0 +1,52 @@
+"""
+Read caching keyed on the change feed's high-water mark
+
+Every write to FormOutput or UserGroup, and every deletion, stamps its rows
+with a higher change sequence number (see usability.models.next_change_seq),
+so the highest one stored identifies the state of the tables. Cached results
+are stored under the high-water mark they were computed at, and the next
+write makes all of them unreachable at once, whichever process or management
+command made it. Reading the mark costs one lookup on the change_seq index of
+each table.
+
+Upgrading stale rows does not move the mark; it changes none of the cached
+results, which are always computed under the current formulas.
+USABILITY_CACHE_TIMEOUT only bounds how long unreachable results stay in the
+cache.
+
+The mark also validates conditional GETs (see usability.conditional).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import current_change_seq
+
+
+def cache_timeout():
+    return getattr(settings, 'USABILITY_CACHE_TIMEOUT', 300)
+
+
+def get_write_generation():
+    """Return the current write generation, the change feed's high-water mark"""
+    return current_change_seq()
+
+
+def request_write_generation(request):
+    """The write generation, read once per request"""
+    # A DRF Request passes attribute reads on to the HttpRequest it wraps
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_write_generation'):
+        request._write_generation = get_write_generation()
+    return request._write_generation
+
+
+def cached_for_generation(name, builder, generation=None):
+    """Return builder() cached under the current write generation, or the given one"""
+    if generation is None:
+        generation = get_write_generation()
+    key = f'usability:{name}:{generation}'
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=cache_timeout())
+    return value
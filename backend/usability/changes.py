@@ -0,0 +1,92 @@
+"""
+Change feed for incremental dashboard sync
+
+Every write to FormOutput and UserGroup stamps the row with the next change
+sequence number, and deletions leave a Tombstone with one (see
+usability.models.next_change_seq). A client that has synced up to sequence N
+asks for the rows with change_seq > N, reading the change_seq indexes, and
+continues from the returned high-water mark: the work per call is
+proportional to the changes, not to the table.
+
+Rows written by one statement share a sequence number, and a sequence
+number belongs to one statement, so changes are ordered by (change_seq, id).
+A response ending partway through the rows of its high-water mark also
+returns the id of its last row (after), and the next call continues from both;
+no response holds more than limit rows.
+"""
+from operator import itemgetter
+
+from django.db.models import Q
+
+from .models import FormOutput, Tombstone, UserGroup
+from .serializers import FormOutputValuesSerializer
+
+
+# Default and maximum number of changed rows per call
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 2000
+
+USER_GROUP_FIELDS = [
+    'id', 'form_output', 'outcome', 'created_at', 'updated_at',
+    'success_best_area', 'success_notes',
+    'partial_fields_completed', 'partial_last_field', 'partial_abandon_reason', 'partial_notes',
+    'failure_steps_completed', 'failure_last_section', 'failure_abort_reason', 'failure_notes',
+]
+
+
+def changes_since(since, after=None, limit=DEFAULT_CHANGES_LIMIT):
+    """
+    Return the sessions, UserGroup entries and deletions written after since
+
+    With after, the rows of since itself with a higher id are included too.
+    Sessions are serialized like the session lists. has_more tells whether
+    another call from high_water_mark and after would return more.
+    """
+    serializer = FormOutputValuesSerializer()
+    sources = {
+        'sessions': serializer.values(FormOutput.objects.all(), 'id', 'change_seq'),
+        'user_groups': UserGroup.objects.values(*USER_GROUP_FIELDS, 'change_seq'),
+        'deleted': Tombstone.objects.values('id', 'table', 'object_id', 'session_id', 'change_seq'),
+    }
+    position = Q(change_seq__gt=since)
+    if after is not None:
+        position |= Q(change_seq=since, id__gt=after)
+
+    # The first limit + 1 changes of each source include every change before
+    # the (limit + 1)th overall
+    changed = []
+    for source, queryset in sources.items():
+        rows = queryset.filter(position).order_by('change_seq', 'id')[:limit + 1]
+        changed += [(row['change_seq'], row['id'], source, row) for row in rows]
+    changed.sort(key=itemgetter(0, 1))
+
+    has_more = len(changed) > limit
+    next_change = changed[limit] if has_more else None
+    changed = changed[:limit]
+    high_water_mark = changed[-1][0] if changed else since
+    if next_change is not None and next_change[0] == high_water_mark:
+        # Stopped partway through the rows of one write
+        after = changed[-1][1]
+    else:
+        after = None
+
+    by_source = {source: [] for source in sources}
+    for _, _, source, row in changed:
+        by_source[source].append(row)
+    deleted = by_source['deleted']
+
+    return {
+        'since': since,
+        'high_water_mark': high_water_mark,
+        'after': after,
+        'has_more': has_more,
+        'sessions': serializer.serialize(by_source['sessions']),
+        'user_groups': [
+            {field: row[field] for field in USER_GROUP_FIELDS} for row in by_source['user_groups']
+        ],
+        'deleted_sessions': [
+            {'id': row['object_id'], 'session_id': row['session_id']}
+            for row in deleted if row['table'] == 'session'
+        ],
+        'deleted_user_groups': [row['object_id'] for row in deleted if row['table'] == 'user_group'],
+    }
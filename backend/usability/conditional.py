@@ -0,0 +1,92 @@
+"""
+Conditional GET (ETag / Last-Modified) for the polled dashboard endpoints
+
+Validators are checked by django.views.decorators.http.condition before the
+view runs, so a matching If-None-Match or If-Modified-Since is answered with
+304 Not Modified without running aggregates or serializing anything.
+
+Table-wide reads are validated by the write generation, the change feed's
+high-water mark, read with one index lookup per table; writes from any
+process or management command move it. A session's analytics are validated by its
+updated_at, read with one lookup on the session_id index. ETags also cover the
+formula version and the request's query string and Accept header, which all
+change the body.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+
+from .caching import request_write_generation
+from .metric_versions import CURRENT_METRICS_VERSION
+from .models import FormOutput
+
+
+def _etag(request, marker):
+    representation = f'{request.get_full_path()}|{request.headers.get("Accept", "")}'
+    digest = hashlib.blake2b(representation.encode(), digest_size=8).hexdigest()
+    return f'{marker}-v{CURRENT_METRICS_VERSION}-{digest}'
+
+
+def table_etag(request, *args, **kwargs):
+    """ETag for reads over all sessions, changes with every write and deletion"""
+    return _etag(request, f'g{request_write_generation(request)}')
+
+
+def session_last_modified(request, session_id):
+    """updated_at of the session, None if it does not exist"""
+    # Looked up once per request, condition() asks for both validators
+    if not hasattr(request, '_session_updated_at'):
+        request._session_updated_at = (
+            FormOutput.objects.filter(session_id=session_id).values_list('updated_at', flat=True).first()
+        )
+    return request._session_updated_at
+
+
+def session_etag(request, session_id):
+    """ETag for reads of one session, changes with every write to its row"""
+    updated_at = session_last_modified(request, session_id)
+    if updated_at is None:
+        return None
+    return _session_etag(request, updated_at)
+
+
+def _session_etag(request, updated_at):
+    return _etag(request, f's{updated_at.timestamp():.6f}')
+
+
+def session_conditional_response(request, form_output, respond):
+    """
+    Answer a conditional GET for a session the view has already read
+    
+    For async views: condition() evaluates its validators synchronously, so
+    they cannot query the database there. Returns 304 when the client's copy
+    is current, otherwise respond(), with ETag and Last-Modified set.
+    """
+    etag = quote_etag(_session_etag(request, form_output.updated_at))
+    last_modified = int(form_output.updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = respond()
+    if request.method in ('GET', 'HEAD'):
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+        response.headers.setdefault('ETag', etag)
+    return response
+
+
+def conditional_get(etag_func, last_modified_func=None):
+    """
+    Decorator answering conditional GETs from the given validators
+
+    Responses are marked Cache-Control: no-cache, so clients revalidate on
+    every poll instead of reusing a heuristically fresh copy, and Vary: Accept
+    since the session lists have several encodings.
+    """
+    def decorator(view):
+        view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+        view = vary_on_headers('Accept')(view)
+        return cache_control(no_cache=True)(view)
+    return decorator
@@ -0,0 +1,167 @@
+"""
+In-process publish/subscribe behind the Server-Sent Events streams
+
+Write paths publish to topics ('session:<session_id>' for a session's
+analytics, 'summary' for dashboard summary changes) from any thread; each
+subscriber is an asyncio queue on the event loop serving its stream, which
+encodes each event for its client as it sends it. Events only reach
+subscribers in the same process: run a single ASGI worker, or put a shared
+broker (e.g. Redis pub/sub) behind publish() when running several.
+
+A subscriber that falls SUBSCRIBER_QUEUE_SIZE events behind is disconnected;
+EventSource clients reconnect and start again from a fresh snapshot.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+# Events a subscriber may fall behind by before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = 100
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15
+
+# Queued in place of an event to end a stream
+CLOSE = object()
+
+SUMMARY_TOPIC = 'summary'
+
+
+def session_topic(session_id):
+    return f'session:{session_id}'
+
+
+def format_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+class Subscription:
+    """One stream's queue of (event, data) pairs, bound to the event loop it was created on"""
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, item):
+        """Queue an event, runs on the subscription's loop"""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and end the stream
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(CLOSE)
+
+
+class EventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, topic):
+        """Subscribe to topic, must be called on the event loop that reads the subscription"""
+        subscription = Subscription(topic)
+        with self._lock:
+            self._subscriptions[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.topic]
+
+    def has_subscribers(self, topic):
+        """Cheap check, so writers only build payloads somebody is listening for"""
+        return topic in self._subscriptions
+
+    def publish(self, topic, event, data):
+        """Send an event to every subscriber of topic, callable from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(topic, ()))
+        if not subscriptions:
+            return 0
+        item = (event, data)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, item)
+            except RuntimeError:
+                # The loop was closed without the stream being unsubscribed
+                self.unsubscribe(subscription)
+        return len(subscriptions)
+
+
+broker = EventBroker()
+
+
+class EventStream:
+    """
+    Async iterator over initial events, then the subscription's events as they are published
+    
+    initial holds already encoded events. Yields a keep-alive comment every
+    KEEPALIVE_INTERVAL seconds without events. close() unsubscribes; the
+    response calls it when the client disconnects.
+    """
+
+    def __init__(self, subscription, initial=()):
+        self.subscription = subscription
+        self.pending = list(initial)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.pending:
+            return self.pending.pop(0)
+        while not self.closed:
+            try:
+                item = await asyncio.wait_for(self.subscription.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                return ': keep-alive\n\n'
+            except asyncio.CancelledError:
+                self.close()
+                raise
+            if item is CLOSE:
+                self.close()
+                break
+            encoded = self.encode(*item)
+            if encoded is not None:
+                return encoded
+        raise StopAsyncIteration
+
+    def encode(self, event, data):
+        """Server-Sent Event sent to this stream's client for a published event, None to send nothing"""
+        return format_event(event, data)
+
+    def close(self):
+        self.closed = True
+        broker.unsubscribe(self.subscription)
+
+
+class SummaryStream(EventStream):
+    """
+    Stream of dashboard summaries sending only the fields that changed
+    
+    Full summaries are published; each stream compares them with what its
+    own client was last sent, so a client that connected in between never
+    misses a field changing back.
+    """
+
+    def __init__(self, subscription, summary):
+        super().__init__(subscription, [format_event('summary', summary)])
+        self.sent = dict(summary)
+
+    def encode(self, event, summary):
+        changed = {field: value for field, value in summary.items() if self.sent.get(field) != value}
+        if not changed:
+            return None
+        self.sent.update(changed)
+        return format_event(event, changed)
@@ -0,0 +1,117 @@
+"""
+Group commit for heartbeat writes
+
+SQLite allows one writer at a time, and every transaction pays for its own
+commit (journal write and fsync). When many workers write heartbeats at once
+they queue on the write lock, time out with "database is locked", and the
+latency tail grows with the number of sessions.
+
+With USABILITY_GROUP_COMMIT enabled, heartbeats are handed to one writer
+thread instead. It takes whatever has queued up within
+USABILITY_GROUP_COMMIT_WINDOW_MS of the first waiting write (at most
+USABILITY_GROUP_COMMIT_MAX_BATCH writes) and applies them in one transaction,
+each in its own savepoint so a failing write does not fail the others. Each
+caller waits on a Future for the result of its own write, which is only
+resolved once the batch has committed.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import connection, transaction
+
+
+# Queued to stop the writer thread
+STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, window=None, max_batch=None):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        # Batches and writes committed, for monitoring
+        self.batches = 0
+        self.writes = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) for the next batch, returns a Future of its result"""
+        future = Future()
+        self._start()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def queue_depth(self):
+        """Writes waiting for the next batch"""
+        return self._queue.qsize()
+
+    def stop(self):
+        """Commit what is queued, then stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(STOP)
+            thread.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        window = self.window if self.window is not None else settings.USABILITY_GROUP_COMMIT_WINDOW_MS / 1000
+        max_batch = self.max_batch or settings.USABILITY_GROUP_COMMIT_MAX_BATCH
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                if batch[0] is STOP:
+                    break
+                deadline = time.monotonic() + window
+                while len(batch) < max_batch:
+                    try:
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if item is STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(batch)
+        finally:
+            connection.close()
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, func(*args, **kwargs), None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+        except Exception as exc:
+            # The commit failed, none of the writes happened
+            for future, *_ in batch:
+                if future.running():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.writes += sum(exc is None for _, _, exc in outcomes)
+        for future, result, exc in outcomes:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
+
+
+writer = GroupCommitWriter()
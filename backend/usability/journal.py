@@ -0,0 +1,386 @@
+"""
+Append-only journal for metrics updates and completions
+
+With USABILITY_JOURNAL enabled, update_session_metrics and complete_session
+validate the payload, append it to the journal and answer 202 Accepted as
+soon as the record is on disk; a consumer thread applies the records to
+FormOutput and UserGroup in batches. Bursts of heartbeats then wait on a
+sequential file append instead of the database.
+
+The journal is a directory of segment files, segment-<first seq>.log, each
+line one record: the CRC32 of its JSON, a space, and the JSON. A record is
+acknowledged only after an fsync, but appends do not fsync one by one: the
+first waiting append syncs everything written so far while later appends
+queue behind it for the next sync.
+
+Each applied batch advances JournalCheckpoint in the same transaction as its
+writes, so a record is applied exactly once even across crashes. On restart
+a torn last line is truncated and the consumer resumes from the checkpoint;
+replay_journal applies the pending records without starting the server.
+Segments are deleted once all of their records are applied.
+
+The journal belongs to one process: run a single server process in journal
+mode, and replay_journal only while it is stopped.
+"""
+import json
+import logging
+import os
+import threading
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import connection, transaction
+
+from .models import JournalCheckpoint
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'segment-'
+
+# Errors a record fails with on every attempt, such as the completion of a
+# session that was never created; the record is skipped
+PERMANENT_ERRORS = (ObjectDoesNotExist, ValidationError, KeyError, TypeError, ValueError)
+SEGMENT_SUFFIX = '.log'
+
+
+def encode_record(seq, record):
+    """Journal line for a record: checksum, space, JSON, newline"""
+    body = json.dumps({'seq': seq, **record}, separators=(',', ':')).encode()
+    return b'%08x %s\n' % (zlib.crc32(body), body)
+
+
+def decode_record(line):
+    """Record of a journal line, None if the line is torn or corrupt"""
+    if not line.endswith(b'\n'):
+        return None
+    checksum, _, body = line[:-1].partition(b' ')
+    try:
+        if int(checksum, 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def segment_paths(directory):
+    """Segment files in sequence order"""
+    return sorted(Path(directory).glob(f'{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}'))
+
+
+def segment_first_seq(path):
+    return int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def read_segment(path, offset=0):
+    """Yield (record, end offset) for each complete record from offset, stopping at a torn or corrupt line"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            record = decode_record(line)
+            if record is None:
+                return
+            offset += len(line)
+            yield record, offset
+
+
+def sync_directory(directory):
+    """Make created or removed segment files durable"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """Appends records to the segment files of a directory"""
+
+    def __init__(self, directory, segment_bytes=None):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes or settings.USABILITY_JOURNAL_SEGMENT_BYTES
+        self._cond = threading.Condition()
+        self._file = None
+        self._next_seq = 1
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        # fsyncs issued, for monitoring
+        self.syncs = 0
+
+    def open(self, after=0):
+        """
+        Recover the end of the journal and start appending
+
+        Truncates a torn last record and continues numbering after the last
+        complete one, or after `after` (the applied checkpoint) if that is
+        higher, so sequence numbers never go back.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = segment_paths(self.directory)
+        last_seq = 0
+        if segments:
+            path = segments[-1]
+            last_seq, end = segment_first_seq(path) - 1, 0
+            for record, end in read_segment(path):
+                last_seq = record['seq']
+            if end < path.stat().st_size:
+                # A record torn by a crash, never acknowledged
+                os.truncate(path, end)
+        self._next_seq = max(last_seq, after) + 1
+        self._written = self._synced = self._next_seq - 1
+        if segments and last_seq >= after:
+            self._file = open(segments[-1], 'ab')
+        else:
+            self._open_segment()
+        return self
+
+    @property
+    def last_seq(self):
+        """Sequence number of the last record appended"""
+        return self._written
+
+    def close(self):
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def append(self, record):
+        """Append a record, returns its sequence number once it is on disk"""
+        with self._cond:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._file.write(encode_record(seq, record))
+            self._file.flush()
+            self._written = seq
+            if self._file.tell() >= self.segment_bytes:
+                self._rotate()
+            while self._synced < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                # Sync everything written so far, appends arriving meanwhile wait for the next sync
+                self._syncing = True
+                target, fileno = self._written, self._file.fileno()
+                self._cond.release()
+                synced = False
+                try:
+                    os.fsync(fileno)
+                    synced = True
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    if synced:
+                        self.syncs += 1
+                        self._synced = max(self._synced, target)
+                    self._cond.notify_all()
+        return seq
+
+    def _rotate(self):
+        # Called with the lock held; the fsync in flight uses the current file
+        while self._syncing:
+            self._cond.wait()
+        if self._file.tell() < self.segment_bytes:
+            # Rotated by another append while waiting
+            return
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._synced = self._written
+        self._open_segment()
+
+    def _open_segment(self):
+        path = self.directory / f'{SEGMENT_PREFIX}{self._next_seq:016d}{SEGMENT_SUFFIX}'
+        self._file = open(path, 'ab')
+        sync_directory(self.directory)
+
+
+class JournalReader:
+    """Reads the records of a journal directory in sequence order, remembering where it stopped"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.segment = None
+        self.offset = 0
+        # Sequence number of the last record returned
+        self.last_seq = 0
+
+    def read(self, after, limit):
+        """Up to limit complete records with a sequence number above after"""
+        records = []
+        for path in segment_paths(self.directory):
+            if self.segment is not None and path < self.segment:
+                continue
+            if path != self.segment:
+                self.segment, self.offset = path, 0
+            for record, end in read_segment(path, self.offset):
+                self.offset = end
+                if record['seq'] > after:
+                    records.append(record)
+                    self.last_seq = record['seq']
+                    if len(records) == limit:
+                        return records
+        return records
+
+
+def apply_record(record):
+    """Apply one journal record to the database"""
+    from .views import write_session_completion, write_session_update
+
+    if record['type'] == 'update':
+        write_session_update(record['session_id'], record['deltas'], record['values'])
+    elif record['type'] == 'complete':
+        write_session_completion(record['session_id'], record['completion_status'], record['user_group_data'])
+    else:
+        raise ValueError(f"Unknown journal record type: {record['type']}")
+
+
+def apply_batch(reader, batch_size=None):
+    """
+    Apply the next batch of pending records in one transaction
+
+    Each record is applied in its own savepoint; a record that can never
+    succeed (PERMANENT_ERRORS) is logged and skipped rather than blocking the
+    records after it. Any other error, such as a locked database, rolls the
+    batch back without advancing the checkpoint, so it is applied again on
+    the next attempt. Returns (applied, failed) counts, (0, 0) once the
+    journal is drained.
+    """
+    with transaction.atomic():
+        checkpoint = JournalCheckpoint.current(for_update=True)
+        records = reader.read(checkpoint.applied_seq, batch_size or settings.USABILITY_JOURNAL_APPLY_BATCH)
+        if not records:
+            return 0, 0
+        failed = 0
+        for record in records:
+            try:
+                with transaction.atomic():
+                    apply_record(record)
+            except PERMANENT_ERRORS:
+                logger.exception('Skipping journal record %s', record['seq'])
+                failed += 1
+        checkpoint.applied_seq = records[-1]['seq']
+        checkpoint.save()
+    remove_applied_segments(reader.directory, checkpoint.applied_seq)
+    return len(records) - failed, failed
+
+
+def remove_applied_segments(directory, applied_seq):
+    """Delete segments whose records are all applied; the newest segment is always kept"""
+    paths = segment_paths(directory)
+    removed = False
+    for path, following in zip(paths, paths[1:]):
+        if segment_first_seq(following) - 1 <= applied_seq:
+            path.unlink()
+            removed = True
+    if removed:
+        sync_directory(directory)
+
+
+class JournalConsumer:
+    """Applies the records of a journal directory in a background thread"""
+
+    def __init__(self, directory, batch_size=None, applied_seq=0):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        # Records applied and skipped, and the sequence number applied up to, for monitoring
+        self.applied = 0
+        self.failed = 0
+        self.applied_seq = applied_seq
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='journal-consumer', daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """Wake the consumer for newly appended records"""
+        self._wakeup.set()
+
+    def stop(self):
+        """Apply what is pending, then stop the consumer thread"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+    def drain(self, reader):
+        while True:
+            applied, failed = apply_batch(reader, self.batch_size)
+            if not applied and not failed:
+                return
+            self.applied += applied
+            self.failed += failed
+            self.applied_seq = reader.last_seq
+
+    def _run(self):
+        reader = JournalReader(self.directory)
+        try:
+            while True:
+                self._wakeup.wait(timeout=1)
+                self._wakeup.clear()
+                stopping = self._stopping
+                try:
+                    self.drain(reader)
+                except Exception:
+                    logger.exception('Applying the journal failed, retrying')
+                    # Read again from the checkpoint, the failed batch was rolled back
+                    reader = JournalReader(self.directory)
+                    connection.close()
+                if stopping:
+                    break
+        finally:
+            connection.close()
+
+
+_lock = threading.Lock()
+_journal = None
+_consumer = None
+
+
+def get_journal():
+    """The process's journal, opened and with its consumer started on first use"""
+    global _journal, _consumer
+    with _lock:
+        if _journal is None:
+            directory = settings.USABILITY_JOURNAL_DIR
+            applied_seq = JournalCheckpoint.current().applied_seq
+            _journal = Journal(directory).open(after=applied_seq)
+            _consumer = JournalConsumer(directory, applied_seq=applied_seq)
+            _consumer.start()
+        return _journal
+
+
+def append(record):
+    """Append a record to the journal and wake the consumer, returns its sequence number"""
+    seq = get_journal().append(record)
+    _consumer.notify()
+    return seq
+
+
+def backlog():
+    """Records appended but not applied yet, 0 outside journal mode"""
+    journal, consumer = _journal, _consumer
+    if journal is None:
+        return 0
+    return max(journal.last_seq - consumer.applied_seq, 0)
+
+
+def close():
+    """Stop the consumer once it has applied what is pending, and close the journal"""
+    global _journal, _consumer
+    with _lock:
+        journal, consumer, _journal, _consumer = _journal, _consumer, None, None
+    if consumer is not None:
+        consumer.stop()
+    if journal is not None:
+        journal.close()
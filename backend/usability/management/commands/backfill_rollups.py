@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from usability.models import FormOutput, MetricsRollup
+from usability.totals import merge, totals_by_rollup
+from usability.workers import worker_pool
+from concurrent.futures import as_completed
+import time
+
+
+def rollup_range(start_pk, end_pk):
+    """Hourly and daily totals of the FormOutput rows with start_pk <= pk < end_pk"""
+    return totals_by_rollup(FormOutput.objects.filter(pk__gte=start_pk, pk__lt=end_pk))
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly and daily metric rollups from all FormOutput records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20000,
+            help='Number of primary keys aggregated per chunk (default: 20000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes aggregating chunks in parallel (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+
+        self.stdout.write('Backfilling hourly and daily rollups...')
+
+        bounds = FormOutput.objects.aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+        ranges = []
+        if bounds['min_pk'] is not None:
+            ranges = [
+                (start_pk, min(start_pk + chunk_size, bounds['max_pk'] + 1))
+                for start_pk in range(bounds['min_pk'], bounds['max_pk'] + 1, chunk_size)
+            ]
+
+        start_time = time.monotonic()
+        # Chunks are aggregated independently (in parallel with --workers) and
+        # merged here, since one bucket can span several chunks
+        by_key = {}
+        if workers == 1:
+            for start_pk, end_pk in ranges:
+                merge(by_key, rollup_range(start_pk, end_pk))
+        else:
+            with worker_pool(workers) as executor:
+                futures = [executor.submit(rollup_range, start_pk, end_pk) for start_pk, end_pk in ranges]
+                for future in as_completed(futures):
+                    merge(by_key, future.result())
+
+        MetricsRollup.replace_all(by_key)
+        elapsed = time.monotonic() - start_time
+
+        sessions = sum(values['sessions'] for key, values in by_key.items() if key[0] == 'day')
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully backfilled {len(by_key)} rollup rows for {sessions} sessions '
+            f'in {len(ranges)} chunks ({elapsed:.2f}s).'
+        ))
@@ -0,0 +1,115 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from usability.group_commit import GroupCommitWriter
+from usability.models import FormOutput
+from usability.views import write_session_update
+import statistics
+import threading
+import time
+import uuid
+
+
+MODES = ['direct', 'group', 'both']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure heartbeat write latency under concurrent sessions, written directly by each worker '
+        'or through the group-commit writer. Runs against the configured database and deletes the '
+        'sessions it created afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sessions',
+            type=int,
+            default=50,
+            help='Concurrent sessions, one worker thread each (default: 50)',
+        )
+        parser.add_argument(
+            '--heartbeats',
+            type=int,
+            default=20,
+            help='Heartbeats sent by each session (default: 20)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Milliseconds each session waits between heartbeats, 0 for back-to-back (default: 0)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=MODES,
+            default='both',
+            help='Write heartbeats directly, through the group-commit writer, or both (default: both)',
+        )
+
+    def handle(self, *args, **options):
+        if options['sessions'] < 1 or options['heartbeats'] < 1:
+            raise CommandError('--sessions and --heartbeats must be positive')
+        if options['interval'] < 0:
+            raise CommandError('--interval cannot be negative')
+
+        modes = ['direct', 'group'] if options['mode'] == 'both' else [options['mode']]
+        for mode in modes:
+            prefix = f'bench-{uuid.uuid4().hex[:8]}-'
+            writer = GroupCommitWriter() if mode == 'group' else None
+            try:
+                latencies, errors, elapsed = self.run(
+                    prefix, options['sessions'], options['heartbeats'], options['interval'] / 1000, writer
+                )
+            finally:
+                if writer is not None:
+                    writer.stop()
+                FormOutput.objects.filter(session_id__startswith=prefix).delete()
+
+            self.report(mode, latencies, errors, elapsed, writer)
+
+    def run(self, prefix, sessions, heartbeats, interval, writer):
+        """Send the heartbeats of every session concurrently, returns (latencies, errors, elapsed)"""
+        latencies = []
+        errors = []
+        start = threading.Barrier(sessions)
+
+        def session(index):
+            session_id = f'{prefix}{index:04d}'
+            start.wait()
+            try:
+                for beat in range(1, heartbeats + 1):
+                    values = {'time_spent_sec': beat * 2.0, 'steps_taken': beat, 'fields_completed': min(beat, 6)}
+                    sent = time.perf_counter()
+                    try:
+                        if writer is None:
+                            write_session_update(session_id, None, values)
+                        else:
+                            writer.submit(write_session_update, session_id, None, values).result()
+                    except OperationalError as exc:
+                        errors.append(str(exc))
+                        continue
+                    latencies.append(time.perf_counter() - sent)
+                    if interval:
+                        time.sleep(interval)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=session, args=(index,)) for index in range(sessions)]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, time.perf_counter() - began
+
+    def report(self, mode, latencies, errors, elapsed, writer):
+        self.stdout.write(f'{mode}:')
+        if latencies:
+            quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f'  latency ms: p50 {quantiles[49] * 1000:.1f}, p95 {quantiles[94] * 1000:.1f}, '
+                f'p99 {quantiles[98] * 1000:.1f}, max {max(latencies) * 1000:.1f}'
+            )
+        self.stdout.write(f'  written: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)')
+        self.stdout.write(f'  failed: {len(errors)}' + (f' ({errors[0]})' if errors else ''))
+        if writer is not None and writer.batches:
+            self.stdout.write(f'  batches: {writer.batches} (avg {writer.writes / writer.batches:.1f} writes)')
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from usability.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, stream_export
+from usability.models import FormOutput
+import time
+
+
+class Command(BaseCommand):
+    help = 'Stream all FormOutput records joined with their UserGroup outcomes to CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='Output format (default: csv)',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (default: standard output)',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Compress the output with gzip (requires --output)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched from the database per round trip (default: {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['gzip'] and not options['output']:
+            raise CommandError('--gzip requires --output')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        chunks = stream_export(
+            FormOutput.objects.all(),
+            options['export_format'],
+            gzip=options['gzip'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        start_time = time.monotonic()
+        written = 0
+        with open(options['output'], 'wb') as output_file:
+            for chunk in chunks:
+                data = chunk if options['gzip'] else chunk.encode()
+                output_file.write(data)
+                written += len(data)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported sessions to {options["output"]} ({written} bytes in {time.monotonic() - start_time:.2f}s).'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from usability.models import DashboardTotals
+import time
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard totals from all FormOutput records'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding dashboard totals...')
+        
+        start_time = time.monotonic()
+        rows = DashboardTotals.rebuild()
+        elapsed = time.monotonic() - start_time
+        
+        for row in rows:
+            self.stdout.write(f'  {row.completion_status}: {row.sessions} sessions')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully rebuilt dashboard totals for {sum(row.sessions for row in rows)} sessions in {elapsed:.2f}s.'
+        ))
@@ -1,43 +1,196 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Max, Min
 from usability.models import FormOutput
+from usability.rescoring import DELTA_BUCKETS, empty_stats, merge_stats, recalculate_range
+from usability.workers import worker_pool
+from concurrent.futures import as_completed
+import json
+import os
+import time
+
+
+class Checkpoint:
+    """
+    Progress of an interrupted run, stored as JSON
+
+    Work is split into fixed primary-key ranges of `span` keys starting at
+    `min_pk`; the checkpoint records which ranges have been committed.
+    """
+
+    def __init__(self, path, min_pk, max_pk, span, completed=None):
+        self.path = path
+        self.min_pk = min_pk
+        self.max_pk = max_pk
+        self.span = span
+        self.completed = set(completed or [])
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as checkpoint_file:
+            data = json.load(checkpoint_file)
+        return cls(path, data['min_pk'], data['max_pk'], data['span'], data['completed'])
+
+    def ranges(self):
+        """Yield (index, start_pk, end_pk) for every range not yet completed"""
+        count = (self.max_pk - self.min_pk) // self.span + 1
+        for index in range(count):
+            if index not in self.completed:
+                start_pk = self.min_pk + index * self.span
+                yield index, start_pk, min(start_pk + self.span, self.max_pk + 1)
+
+    def mark_done(self, index):
+        self.completed.add(index)
+        if self.path:
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as checkpoint_file:
+                json.dump({
+                    'min_pk': self.min_pk,
+                    'max_pk': self.max_pk,
+                    'span': self.span,
+                    'completed': sorted(self.completed),
+                }, checkpoint_file)
+            os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
 
 
 class Command(BaseCommand):
     help = 'Recalculate all usability metrics using updated formulas'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--session_id',
+            help='Recalculate a single session',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of primary keys processed per chunk (default: 2000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes; primary-key ranges are split between them (default: 1)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording committed chunks so an interrupted run can be resumed',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Resume from the file given with --checkpoint',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows would change and the distribution of deltas without writing',
+        )
+        parser.add_argument(
+            '--sql',
+            action='store_true',
+            help='Rescore with a single UPDATE statement computed in the database',
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write('Recalculating usability metrics for all FormOutput records...')
-        
-        all_sessions = FormOutput.objects.all()
-        total_count = all_sessions.count()
-        
-        if total_count == 0:
-            self.stdout.write(self.style.WARNING('No FormOutput records found.'))
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        dry_run = options['dry_run']
+        checkpoint_path = None if dry_run else options['checkpoint']
+
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume requires --checkpoint')
+
+        self.stdout.write('Recalculating usability metrics for FormOutput records...')
+
+        queryset = FormOutput.objects.all()
+        if options['session_id']:
+            queryset = queryset.filter(session_id=options['session_id'])
+
+        if options['sql']:
+            self.recalculate_in_database(queryset, dry_run)
             return
-        
-        updated_count = 0
-        for session in all_sessions:
-            old_effectiveness = session.effectiveness
-            old_efficiency = session.efficiency
-            old_satisfaction = session.satisfaction
-            old_usability = session.usability_index
-            
-            # Recalculate all metrics
-            session.update_all_metrics()
-            session.save()
-            
-            updated_count += 1
-            
-            self.stdout.write(
-                f'Updated {session.session_id}: '
-                f'Effectiveness: {old_effectiveness:.1f}→{session.effectiveness:.1f}, '
-                f'Efficiency: {old_efficiency:.1f}→{session.efficiency:.1f}, '
-                f'Satisfaction: {old_satisfaction:.1f}→{session.satisfaction:.1f}, '
-                f'UI: {old_usability:.1f}→{session.usability_index:.1f}'
-            )
-        
+
+        if options['resume'] and os.path.exists(options['checkpoint']):
+            checkpoint = Checkpoint.load(options['checkpoint'])
+            self.stdout.write(f'Resuming from {options["checkpoint"]} ({len(checkpoint.completed)} chunks done)')
+        else:
+            bounds = queryset.aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+            if bounds['min_pk'] is None:
+                self.stdout.write(self.style.WARNING('No FormOutput records found.'))
+                return
+            checkpoint = Checkpoint(checkpoint_path, bounds['min_pk'], bounds['max_pk'], chunk_size)
+
+        if dry_run:
+            checkpoint.path = None
+
+        totals = empty_stats()
+        start_time = time.monotonic()
+
+        if workers == 1:
+            for index, start_pk, end_pk in checkpoint.ranges():
+                merge_stats(totals, recalculate_range(start_pk, end_pk, dry_run))
+                checkpoint.mark_done(index)
+        else:
+            with worker_pool(workers) as executor:
+                futures = {
+                    executor.submit(recalculate_range, start_pk, end_pk, dry_run): index
+                    for index, start_pk, end_pk in checkpoint.ranges()
+                }
+                for future in as_completed(futures):
+                    merge_stats(totals, future.result())
+                    checkpoint.mark_done(futures[future])
+
+        elapsed = time.monotonic() - start_time
+        checkpoint.remove()
+
+        self.write_summary(totals, elapsed, dry_run)
+
+    def recalculate_in_database(self, queryset, dry_run):
+        """Rescore without loading rows into Python"""
+        start_time = time.monotonic()
+        if dry_run:
+            changed = queryset.with_computed_metrics().exclude(**{
+                field: F(f'computed_{field}') for field in FormOutput.METRIC_FIELDS
+            }).count()
+            self.stdout.write(f'{changed} records would change (dry run, nothing written).')
+        else:
+            updated = queryset.recalculate_metrics()
+            self.stdout.write(self.style.SUCCESS(
+                f'Successfully recalculated metrics for {updated} records with one UPDATE '
+                f'in {time.monotonic() - start_time:.2f}s.'
+            ))
+
+    def write_summary(self, totals, elapsed, dry_run):
+        """Write the throughput summary and, for dry runs, the delta distribution"""
+        rate = totals['scanned'] / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            f'Scanned {totals["scanned"]} records in {elapsed:.2f}s ({rate:.0f} records/s).'
+        )
+
+        if dry_run:
+            self.stdout.write(f'{totals["changed"]} records would change (dry run, nothing written).')
+            labels = [f'<{bound:g}' for bound in DELTA_BUCKETS] + [f'>={DELTA_BUCKETS[-1]:g}']
+            for field, delta in totals['deltas'].items():
+                if not delta['count']:
+                    self.stdout.write(f'  {field}: unchanged')
+                    continue
+                buckets = ', '.join(f'{label}: {count}' for label, count in zip(labels, delta['buckets']) if count)
+                self.stdout.write(
+                    f'  {field}: {delta["count"]} changed, '
+                    f'delta min {delta["min"]:+.2f} / mean {delta["sum"] / delta["count"]:+.2f} / max {delta["max"]:+.2f} '
+                    f'(|delta| {buckets})'
+                )
+            return
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully recalculated metrics for {updated_count} out of {total_count} records.'
+                f'Successfully recalculated metrics: {totals["changed"]} of {totals["scanned"]} records updated.'
             )
         )
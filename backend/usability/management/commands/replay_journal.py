@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from usability.journal import Journal, JournalReader, apply_batch, segment_paths
+from usability.models import JournalCheckpoint
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply the journaled metrics updates and completions that have not reached the database yet, '
+        'e.g. after a crash. Run it while no server process is using the journal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            default=None,
+            help='Journal directory (default: USABILITY_JOURNAL_DIR)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Records applied per transaction (default: USABILITY_JOURNAL_APPLY_BATCH)',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or settings.USABILITY_JOURNAL_DIR
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if not segment_paths(directory):
+            self.stdout.write(f'No journal segments in {directory}.')
+            return
+
+        # Opening recovers the end of the journal, dropping a record torn by the crash
+        Journal(directory).open(after=JournalCheckpoint.current().applied_seq).close()
+
+        start_time = time.monotonic()
+        reader = JournalReader(directory)
+        applied = failed = 0
+        while True:
+            batch_applied, batch_failed = apply_batch(reader, options['batch_size'])
+            if not batch_applied and not batch_failed:
+                break
+            applied += batch_applied
+            failed += batch_failed
+        elapsed = time.monotonic() - start_time
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Skipped {failed} records that could not be applied.'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Applied {applied} journal records in {elapsed:.2f}s, '
+            f'up to sequence {JournalCheckpoint.current().applied_seq}.'
+        ))
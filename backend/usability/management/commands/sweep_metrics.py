@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from usability.metric_versions import CURRENT_METRICS_VERSION
+from usability.models import FormOutput
+from usability.rescoring import empty_stats, merge_stats, recalculate_range
+import time
+
+
+class Command(BaseCommand):
+    help = 'Upgrade FormOutput rows scored under an older formula version, in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of stale rows upgraded per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.5,
+            help='Seconds to wait between batches to leave room for live traffic (default: 0.5)',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches (default: run until no stale rows remain)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        self.stdout.write(f'Upgrading stale metrics to formula version {CURRENT_METRICS_VERSION}...')
+
+        totals = empty_stats()
+        batches = 0
+        last_pk = 0
+        start_time = time.monotonic()
+
+        while options['max_batches'] is None or batches < options['max_batches']:
+            pks = list(
+                FormOutput.objects.stale()
+                .filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            if batches and options['pause']:
+                time.sleep(options['pause'])
+
+            merge_stats(totals, recalculate_range(pks[0], pks[-1] + 1, stale_only=True))
+            last_pk = pks[-1]
+            batches += 1
+
+        elapsed = time.monotonic() - start_time
+        remaining = FormOutput.objects.stale().count()
+        self.stdout.write(
+            f'Upgraded {totals["scanned"]} records in {batches} batches ({elapsed:.2f}s), '
+            f'{totals["scanned"] / elapsed if elapsed > 0 else 0.0:.0f} records/s.'
+        )
+        if remaining:
+            self.stdout.write(self.style.WARNING(f'{remaining} stale records remain.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All records are scored with the current formulas.'))
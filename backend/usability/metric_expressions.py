@@ -0,0 +1,115 @@
+"""
+Usability metric formulas as Django ORM expressions
+
+A second implementation of the FormOutput.calculate_* formulas that runs in
+the database. It lets a whole table be rescored with a single UPDATE and lets
+querysets sort and filter on metrics computed under the current formulas
+before they are stored. Results agree with the Python methods up to the
+database's own ROUND implementation (at most 0.01 apart on half-way values).
+"""
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Exp, Greatest, Round
+from django.db.models.lookups import GreaterThan
+
+from .scoring_kernel import BASELINE_TIME, SATISFACTION_SCORES
+
+
+def _float(field_name):
+    """Reference an integer column as a float so divisions are not truncated"""
+    return Cast(field_name, output_field=FloatField())
+
+
+def _decay(count):
+    """1 - exp(-count / 3) when count > 0, otherwise 0"""
+    return Case(
+        When(GreaterThan(count, 0), then=Value(1.0) - Exp(Value(-1.0) * count / Value(3.0))),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def _completion_ratio():
+    return _float('fields_completed') / _float('total_steps')
+
+
+def effectiveness_expression():
+    """ORM version of FormOutput.calculate_effectiveness"""
+    steps_completed_successfully = Case(
+        When(completion_status='success', then=_float('total_steps')),
+        When(completion_status='partial', then=_float('fields_completed')),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    base_effectiveness = steps_completed_successfully / _float('total_steps') * Value(100.0)
+    effectiveness_penalty = Value(25.0) * _decay(_float('error_counts'))
+
+    return Round(Greatest(Value(0.0), base_effectiveness - effectiveness_penalty), 2)
+
+
+def efficiency_expression():
+    """ORM version of FormOutput.calculate_efficiency"""
+    time_m = Case(
+        When(time_spent_sec__lte=0, then=Value(0.0)),
+        When(time_spent_sec__gte=BASELINE_TIME, then=Value(100.0)),
+        default=F('time_spent_sec') / Value(BASELINE_TIME) * Value(100.0),
+        output_field=FloatField()
+    )
+    extra_steps = Case(
+        When(steps_taken__gt=F('total_steps'), then=_float('steps_taken') - _float('total_steps')),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    inefficiency_decay = _decay(_float('backtracks') + extra_steps)
+    base_efficiency = Greatest(Value(0.0), time_m - Value(25.0) * inefficiency_decay)
+    completion_ratio = _completion_ratio()
+
+    partial_efficiency = Greatest(
+        Value(0.0),
+        base_efficiency * completion_ratio + Value(5.0) * completion_ratio - Value(15.0) * inefficiency_decay
+    )
+    failure_efficiency = Case(
+        When(fields_completed__gt=0, then=Greatest(
+            Value(0.0),
+            base_efficiency * completion_ratio * Value(0.5) + Value(3.0) * completion_ratio
+            - Value(20.0) * inefficiency_decay
+        )),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+    return Round(Case(
+        When(completion_status='success', then=base_efficiency),
+        When(completion_status='partial', then=partial_efficiency),
+        default=failure_efficiency,
+        output_field=FloatField()
+    ), 2)
+
+
+def satisfaction_expression():
+    """ORM version of FormOutput.calculate_satisfaction"""
+    return Case(
+        When(completion_status='success', then=Value(SATISFACTION_SCORES['success'])),
+        When(completion_status='partial', then=Value(SATISFACTION_SCORES['partial'])),
+        default=Value(SATISFACTION_SCORES['failure']),
+        output_field=FloatField()
+    )
+
+
+def usability_index_expression():
+    """ORM version of FormOutput.calculate_usability_index"""
+    return Round(
+        Value(0.40) * effectiveness_expression()
+        + Value(0.30) * efficiency_expression()
+        + Value(0.30) * satisfaction_expression(),
+        2
+    )
+
+
+def metric_expressions():
+    """Return a dict mapping each FormOutput metric field to its ORM expression"""
+    return {
+        'effectiveness': effectiveness_expression(),
+        'efficiency': efficiency_expression(),
+        'satisfaction': satisfaction_expression(),
+        'usability_index': usability_index_expression(),
+    }
@@ -0,0 +1,45 @@
+"""
+Registry of usability metric formula versions
+
+Every FormOutput row records the formula version its stored metrics were
+computed with. When the formulas in usability.scoring_kernel change, update
+the vectorized usability.batch_scoring to match and register a new version
+here with the matching ORM expressions: rows scored under older versions are
+then rescored on read and upgraded in the background by the sweep_metrics
+command, so nothing has to be rewritten at deploy time.
+"""
+from collections import namedtuple
+
+from django.db.models import Case, F, FloatField, When
+
+from .metric_expressions import metric_expressions
+
+
+FormulaVersion = namedtuple('FormulaVersion', ['description', 'expressions'])
+
+FORMULA_VERSIONS = {
+    1: FormulaVersion(
+        description='Effectiveness and efficiency with exponential error/inefficiency decay, fixed satisfaction',
+        expressions=metric_expressions,
+    ),
+}
+
+CURRENT_METRICS_VERSION = max(FORMULA_VERSIONS)
+
+
+def current_metric_expressions():
+    """
+    Return ORM expressions yielding each metric under the current formulas
+
+    Stored values are used for rows that are already current; stale rows are
+    computed in the database on the fly.
+    """
+    expressions = FORMULA_VERSIONS[CURRENT_METRICS_VERSION].expressions()
+    return {
+        field: Case(
+            When(metrics_version=CURRENT_METRICS_VERSION, then=F(field)),
+            default=expression,
+            output_field=FloatField()
+        )
+        for field, expression in expressions.items()
+    }
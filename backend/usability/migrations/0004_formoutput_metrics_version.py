@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0003_remove_formoutput_fields_required_and_more'),
+    ]
+
+    operations = [
+        # Existing rows were scored with formula version 1
+        migrations.AddField(
+            model_name='formoutput',
+            name='metrics_version',
+            field=models.PositiveSmallIntegerField(db_index=True, default=1),
+            preserve_default=False,
+        ),
+        # New rows start unscored until their metrics are calculated
+        migrations.AlterField(
+            model_name='formoutput',
+            name='metrics_version',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0004_formoutput_metrics_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completion_status', models.CharField(choices=[('success', 'Success'), ('partial', 'Partial'), ('failure', 'Failure')], max_length=10, unique=True)),
+                ('sessions', models.BigIntegerField(default=0)),
+                ('effectiveness_sum', models.FloatField(default=0.0)),
+                ('efficiency_sum', models.FloatField(default=0.0)),
+                ('satisfaction_sum', models.FloatField(default=0.0)),
+                ('usability_index_sum', models.FloatField(default=0.0)),
+                ('time_spent_sec_sum', models.FloatField(default=0.0)),
+                ('steps_taken_sum', models.BigIntegerField(default=0)),
+                ('backtracks_sum', models.BigIntegerField(default=0)),
+                ('error_counts_sum', models.BigIntegerField(default=0)),
+                ('metrics_version', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'dashboard totals',
+            },
+        ),
+    ]
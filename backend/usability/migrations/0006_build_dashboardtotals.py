@@ -0,0 +1,51 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+# Formula version every session had been scored with when this migration was
+# written; the stored metrics are summed as they are
+METRICS_VERSION = 1
+SUMMED_FIELDS = [
+    'effectiveness', 'efficiency', 'satisfaction', 'usability_index',
+    'time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+]
+
+
+def build_totals(apps, schema_editor):
+    FormOutput = apps.get_model('usability', 'FormOutput')
+    DashboardTotals = apps.get_model('usability', 'DashboardTotals')
+
+    by_status = {
+        row['completion_status']: row
+        for row in FormOutput.objects.order_by().values('completion_status').annotate(
+            sessions=Count('id'),
+            **{f'{field}_sum': Sum(field) for field in SUMMED_FIELDS}
+        )
+    }
+    DashboardTotals.objects.bulk_create([
+        DashboardTotals(
+            completion_status=completion_status,
+            metrics_version=METRICS_VERSION,
+            sessions=by_status.get(completion_status, {}).get('sessions', 0),
+            **{
+                f'{field}_sum': by_status.get(completion_status, {}).get(f'{field}_sum') or 0
+                for field in SUMMED_FIELDS
+            }
+        )
+        for completion_status in ['success', 'partial', 'failure']
+    ])
+
+
+def remove_totals(apps, schema_editor):
+    apps.get_model('usability', 'DashboardTotals').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0005_dashboardtotals'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_totals, remove_totals),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:47
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+
+SUMMED_FIELDS = [
+    'effectiveness', 'efficiency', 'satisfaction', 'usability_index',
+    'time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+]
+GRANULARITIES = {
+    'hour': TruncHour,
+    'day': TruncDay,
+}
+
+
+def build_rollups(apps, schema_editor):
+    FormOutput = apps.get_model('usability', 'FormOutput')
+    MetricsRollup = apps.get_model('usability', 'MetricsRollup')
+
+    rollups = []
+    for granularity, trunc in GRANULARITIES.items():
+        rows = FormOutput.objects.order_by().annotate(
+            bucket=trunc('created_at', tzinfo=dt_timezone.utc)
+        ).values('bucket', 'completion_status').annotate(
+            sessions=Count('id'),
+            **{f'{field}_sum': Sum(field) for field in SUMMED_FIELDS}
+        )
+        rollups.extend(
+            MetricsRollup(
+                granularity=granularity,
+                bucket_start=row['bucket'],
+                completion_status=row['completion_status'],
+                sessions=row['sessions'],
+                **{f'{field}_sum': row[f'{field}_sum'] or 0 for field in SUMMED_FIELDS}
+            )
+            for row in rows
+        )
+    MetricsRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0006_build_dashboardtotals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sessions', models.BigIntegerField(default=0)),
+                ('effectiveness_sum', models.FloatField(default=0.0)),
+                ('efficiency_sum', models.FloatField(default=0.0)),
+                ('satisfaction_sum', models.FloatField(default=0.0)),
+                ('usability_index_sum', models.FloatField(default=0.0)),
+                ('time_spent_sec_sum', models.FloatField(default=0.0)),
+                ('steps_taken_sum', models.BigIntegerField(default=0)),
+                ('backtracks_sum', models.BigIntegerField(default=0)),
+                ('error_counts_sum', models.BigIntegerField(default=0)),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('completion_status', models.CharField(choices=[('success', 'Success'), ('partial', 'Partial'), ('failure', 'Failure')], max_length=10)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket_start', 'completion_status'), name='unique_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0007_metricsrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='formoutput',
+            index=models.Index(fields=['created_at', 'id'], name='formoutput_created_id_idx'),
+        ),
+    ]
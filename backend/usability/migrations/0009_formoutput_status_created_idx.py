@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0008_formoutput_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='formoutput',
+            index=models.Index(fields=['completion_status', 'created_at'], name='formoutput_status_created_idx'),
+        ),
+    ]
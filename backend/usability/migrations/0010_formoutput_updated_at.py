@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    FormOutput = apps.get_model('usability', 'FormOutput')
+    FormOutput.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0009_formoutput_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formoutput',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # The last write to existing rows is unknown; start from their creation time
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
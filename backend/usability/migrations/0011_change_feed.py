@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def number_existing_rows(apps, schema_editor):
+    # Give every existing row its own sequence number, so a first sync from 0
+    # can page through them
+    FormOutput = apps.get_model('usability', 'FormOutput')
+    UserGroup = apps.get_model('usability', 'UserGroup')
+
+    FormOutput.objects.update(change_seq=models.F('id'))
+    offset = FormOutput.objects.aggregate(max_id=models.Max('id'))['max_id'] or 0
+    UserGroup.objects.update(change_seq=models.F('id') + offset, updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usability', '0010_formoutput_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(choices=[('session', 'Session'), ('user_group', 'User group')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('session_id', models.CharField(blank=True, max_length=100)),
+                ('change_seq', models.BigIntegerField(db_index=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='formoutput',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='usergroup',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='usergroup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(number_existing_rows, migrations.RunPython.noop),
+    ]
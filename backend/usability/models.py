@@ -1,6 +1,137 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
+from .metric_expressions import metric_expressions
+from . import scoring_kernel, totals
+from .metric_versions import CURRENT_METRICS_VERSION
+
+
+class FormOutputQuerySet(models.QuerySet):
+    """
+    QuerySet with database-side metric calculation
+    """
+    
+    def with_computed_metrics(self, prefix='computed_'):
+        """Annotate each row with its metrics computed in SQL under the current formulas"""
+        return self.annotate(**{
+            f'{prefix}{field}': expression for field, expression in metric_expressions().items()
+        })
+    
+    def recalculate_metrics(self):
+        """Rescore all rows with a single UPDATE statement, returns the number of rows"""
+        return self.update(metrics_version=Value(CURRENT_METRICS_VERSION), **metric_expressions())
+    
+    def stale(self):
+        """Rows whose metrics were computed under an older formula version"""
+        return self.exclude(metrics_version=CURRENT_METRICS_VERSION)
+    
+    # Bulk writes bypass save(), so they keep the running totals and the
+    # change feed up to date themselves
+    
+    def update(self, **kwargs):
+        if set(kwargs) - set(self.model.UNCHANGED_FIELDS):
+            kwargs.setdefault('updated_at', timezone.now())
+            kwargs.setdefault('change_seq', next_change_seq())
+        if set(kwargs) & set(self.model.TRACKED_FIELDS):
+            with transaction.atomic(using=self.db, savepoint=False):
+                rows = super().update(**kwargs)
+                # The updated rows cannot be told apart afterwards; recount on the next read
+                DashboardTotals.mark_stale()
+        else:
+            rows = super().update(**kwargs)
+        return rows
+    
+    def increment(self, deltas, **values):
+        """
+        Add deltas to counter fields, set values, and rescore the rows
+        
+        The counters are incremented by the database with F() expressions in
+        a single UPDATE before anything is read, so concurrent increments are
+        never lost. The rows are then read back in the same transaction, which
+        holds the write lock from that UPDATE, and written again with values
+        and their recomputed metrics. The filter must not depend on the
+        incremented fields. Returns the updated rows.
+        """
+        with transaction.atomic(using=self.db):
+            rows = super().update(
+                **{field: F(field) + delta for field, delta in deltas.items()},
+                updated_at=timezone.now(), change_seq=next_change_seq()
+            )
+            if not rows:
+                return []
+            objs = list(self.all())
+            previous = [
+                tuple(
+                    getattr(obj, field) - deltas[field] if field in deltas else getattr(obj, field)
+                    for field in self.model.TRACKED_FIELDS
+                )
+                for obj in objs
+            ]
+            # A plain QuerySet, so the internal update() does not recount the totals
+            plain = models.QuerySet(self.model, using=self.db)
+            for obj in objs:
+                for attr, value in values.items():
+                    setattr(obj, attr, value)
+                obj.update_all_metrics()
+                plain.filter(pk=obj.pk).update(**{
+                    field: getattr(obj, field)
+                    for field in [*values, *self.model.METRIC_FIELDS, 'metrics_version']
+                })
+            apply_running_totals(removed=previous, added=[obj.tracked_values() for obj in objs])
+        return objs
+    
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            removed_by_status = totals.totals_by_status(self)
+            removed_by_rollup = totals.totals_by_rollup(self)
+            sessions = list(self.values_list('id', 'session_id'))
+            user_groups = list(
+                UserGroup.objects.filter(form_output__in=[pk for pk, _ in sessions]).values_list('id', flat=True)
+            )
+            Tombstone.record(sessions=sessions, user_groups=user_groups)
+            deleted = super().delete()
+            DashboardTotals.apply_deltas(totals.negate(removed_by_status))
+            MetricsRollup.apply_deltas(totals.negate(removed_by_rollup))
+        return deleted
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            stamp_changes(objs)
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Which rows were inserted is unknown; recount on the next read
+                DashboardTotals.mark_stale()
+            else:
+                apply_running_totals(added=[obj.tracked_values() for obj in objs])
+        return objs
+    
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        # Rescoring alone is not a change (see UNCHANGED_FIELDS)
+        if not set(fields) <= set(self.model.UNCHANGED_FIELDS):
+            fields = [*fields, *(field for field in ('updated_at', 'change_seq') if field not in fields)]
+        with transaction.atomic(using=self.db):
+            if 'change_seq' in fields:
+                stamp_changes(objs)
+            if not set(fields) & set(self.model.TRACKED_FIELDS):
+                rows = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size)
+            else:
+                previous = {
+                    row[0]: row[1:] for row in self.model.objects.filter(
+                        pk__in=[obj.pk for obj in objs]
+                    ).values_list('pk', *self.model.TRACKED_FIELDS)
+                }
+                # A plain QuerySet, so the internal update() does not recount the totals
+                rows = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size)
+                apply_running_totals(
+                    removed=previous.values(),
+                    added=[obj.tracked_values(fields, previous[obj.pk]) for obj in objs if obj.pk in previous]
+                )
+        return rows
+
 
 class FormOutput(models.Model):
     """
@@ -9,6 +140,10 @@ class FormOutput(models.Model):
     # Session identification
     session_id = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Last write to the row, the validator for conditional GETs of the session
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position of the last write in the change feed, see next_change_seq()
+    change_seq = models.BigIntegerField(default=0, db_index=True, editable=False)
     
     # Interaction tracking
     time_spent_sec = models.FloatField(default=0.0)
@@ -34,142 +169,358 @@ class FormOutput(models.Model):
     fields_completed = models.IntegerField(default=0)
     total_steps = models.IntegerField(default=7)  # Unified naming: total steps including all form fields + register button
     
+    # Formula version the stored metrics were computed with (0 = never scored)
+    metrics_version = models.PositiveSmallIntegerField(default=0, db_index=True)
+    
+    objects = FormOutputQuerySet.as_manager()
+    
+    # Fields reported by the client during testing and the metrics derived from them
+    INPUT_FIELDS = [
+        'time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+        'extra_clicks', 'completion_status', 'fields_completed'
+    ]
+    METRIC_FIELDS = ['effectiveness', 'efficiency', 'satisfaction', 'usability_index']
+    # Input fields that only grow, which clients may send as increments
+    COUNTER_FIELDS = ['steps_taken', 'backtracks', 'error_counts', 'extra_clicks']
+    # Fields the metrics are calculated from
+    SCORE_FIELDS = [
+        'time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+        'fields_completed', 'total_steps', 'completion_status'
+    ]
+    # Fields the dashboard totals and rollups depend on
+    TRACKED_FIELDS = SCORE_FIELDS + ['created_at']
+    # Fields whose updates alone do not change what the API reports (stale
+    # metrics are rescored on read), so they are not fed to the change feed
+    UNCHANGED_FIELDS = METRIC_FIELDS + ['metrics_version', 'updated_at', 'change_seq']
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination newest first; also serves created_at ranges
+            models.Index(fields=['created_at', 'id'], name='formoutput_created_id_idx'),
+            # Dashboard filters by status within a date range
+            models.Index(fields=['completion_status', 'created_at'], name='formoutput_status_created_idx'),
+        ]
+    
     def calculate_effectiveness(self):
         """Calculate effectiveness: (steps completed successfully / total steps) x 100 - effectiveness_penalty"""
-        # Steps completed successfully based on completion status
-        if self.completion_status == 'success':
-            steps_completed_successfully = self.total_steps
-        elif self.completion_status == 'partial':
-            steps_completed_successfully = self.fields_completed
-        else:  # failure
-            steps_completed_successfully = 0
-        
-        # Calculate base effectiveness and penalty with smooth degradation
-        import math
-        base_effectiveness = (steps_completed_successfully / self.total_steps) * 100
-        
-        # Smooth effectiveness penalty calculation using logarithmic decay
-        if self.error_counts > 0:
-            effectiveness_penalty = 25 * (1 - math.exp(-self.error_counts / 3))
-        else:
-            effectiveness_penalty = 0
-        
-        self.effectiveness = round(max(0, base_effectiveness - effectiveness_penalty), 2)
+        self.effectiveness = scoring_kernel.effectiveness(
+            self.completion_status, self.fields_completed, self.total_steps, self.error_counts
+        )
         return self.effectiveness
     
     def calculate_efficiency(self):
         """Calculate efficiency: TimeM - efficiency_penalty (smooth degradation based on backtracks and extra steps)"""
-        baseline_time = 90.0
-        
-        # TimeM: 100% only if time is within baseline AND all fields were completed (success status)
-        if self.time_spent_sec <= 0:
-            time_m = 0
-        elif self.time_spent_sec >= baseline_time:
-            time_m = 100.0
-        else:
-            time_m = (self.time_spent_sec / baseline_time) * 100
-        
-        # Calculate extra steps beyond the optimal path
-        extra_steps = self.steps_taken - self.total_steps if self.steps_taken > self.total_steps else 0
-        
-        # Smooth efficiency penalty calculation
-        import math
-        total_inefficiencies = self.backtracks + extra_steps
-        
-        if total_inefficiencies > 0:
-            # Base penalty per inefficiency, with diminishing returns
-            efficiency_penalty = 25 * (1 - math.exp(-total_inefficiencies / 3))
-        else:
-            efficiency_penalty = 0
-        
-        # Calculate base efficiency (same formula for all statuses)
-        base_efficiency = max(0, time_m - efficiency_penalty)
-        
-        # Apply status-specific completion penalties
-        if self.completion_status == 'success':
-            # No additional penalty for successful completion
-            self.efficiency = round(base_efficiency, 2)
-        
-        elif self.completion_status == 'partial':
-            # For partial: scale base efficiency by completion ratio, then add small bonus
-            completion_ratio = self.fields_completed / self.total_steps  # 7 form fields (including register button)
-
-            # Scale the base efficiency by how much was completed (more fields = higher efficiency)
-            scaled_efficiency = base_efficiency * completion_ratio
-            
-            # Add a small bonus for partial completion (up to 5 points to ensure non-zero)
-            completion_bonus = 5 * completion_ratio
-            
-            # Calculate inefficiency penalty from backtracks and extra steps
-            total_inefficiencies = self.backtracks + extra_steps
-            if total_inefficiencies > 0:
-                inefficiency_penalty = 15 * (1 - math.exp(-total_inefficiencies / 3))
-            else:
-                inefficiency_penalty = 0
-            
-            # Combine: scaled efficiency + bonus - inefficiency penalty
-            partial_efficiency = max(0, scaled_efficiency + completion_bonus - inefficiency_penalty)
-            self.efficiency = round(partial_efficiency, 2)
-        
-        else:  # failure
-            # For failure, only give minimal credit if fields were completed
-            if self.fields_completed > 0:
-                completion_ratio = self.fields_completed / self.total_steps  # 7 form fields (including register button)
-                
-                # Scale base efficiency by completion ratio with heavy discount (50% of scaled value)
-                scaled_efficiency = base_efficiency * completion_ratio * 0.5
-                
-                # Add minimal bonus
-                completion_bonus = 3 * completion_ratio
-                
-                # Heavy inefficiency penalty
-                total_inefficiencies = self.backtracks + extra_steps
-                if total_inefficiencies > 0:
-                    inefficiency_penalty = 20 * (1 - math.exp(-total_inefficiencies / 3))
-                else:
-                    inefficiency_penalty = 0
-                
-                # Combine: scaled efficiency + bonus - inefficiency penalty
-                failure_efficiency = max(0, scaled_efficiency + completion_bonus - inefficiency_penalty)
-                self.efficiency = round(failure_efficiency, 2)
-            else:
-                # No fields completed = 0 efficiency
-                self.efficiency = 0.0
-        
+        self.efficiency = scoring_kernel.efficiency(
+            self.completion_status, self.time_spent_sec, self.steps_taken,
+            self.backtracks, self.fields_completed, self.total_steps
+        )
         return self.efficiency
     
     def calculate_satisfaction(self):
         """Calculate satisfaction based on completion status"""
-        if self.completion_status == 'success':
-            self.satisfaction = 68.0
-        elif self.completion_status == 'partial':
-            self.satisfaction = 34.0
-        else:  # failure
-            self.satisfaction = 0.0
+        self.satisfaction = scoring_kernel.satisfaction(self.completion_status)
         return self.satisfaction
     
     def calculate_usability_index(self):
         """Calculate overall usability index: UI = 0.40*E + 0.30*F + 0.30*S"""
-        self.usability_index = round(0.40 * self.effectiveness + 
-                                     0.30 * self.efficiency + 
-                                     0.30 * self.satisfaction, 2)
+        self.usability_index = scoring_kernel.usability_index(
+            self.effectiveness, self.efficiency, self.satisfaction
+        )
         return self.usability_index
     
     def update_all_metrics(self):
         """Update all calculated metrics"""
-        self.calculate_effectiveness()
-        self.calculate_efficiency()
-        self.calculate_satisfaction()
-        self.calculate_usability_index()
+        (self.effectiveness, self.efficiency,
+         self.satisfaction, self.usability_index) = scoring_kernel.score(
+            self.time_spent_sec, self.steps_taken, self.backtracks, self.error_counts,
+            self.fields_completed, self.total_steps, self.completion_status
+        )
+        self.metrics_version = CURRENT_METRICS_VERSION
+    
+    def tracked_values(self, fields=None, previous=None):
+        """
+        Return the TRACKED_FIELDS values as a tuple
+        
+        When fields is given, only those are read from the instance and the
+        rest are taken from previous.
+        """
+        if fields is None:
+            return tuple(getattr(self, field) for field in self.TRACKED_FIELDS)
+        return tuple(
+            getattr(self, field) if field in fields else value
+            for field, value in zip(self.TRACKED_FIELDS, previous)
+        )
+    
+    def _stored_values(self):
+        """
+        TRACKED_FIELDS values currently in the database, None for a new row
+        
+        Read inside the caller's transaction with the row locked, not taken
+        from when the instance was loaded, so a write that landed in between
+        is not subtracted from the totals a second time.
+        """
+        if self._state.adding and self.pk is None:
+            return None
+        return FormOutput.objects.select_for_update().filter(pk=self.pk).values_list(*self.TRACKED_FIELDS).first()
+    
+    @property
+    def metrics_are_stale(self):
+        return self.metrics_version != CURRENT_METRICS_VERSION
+    
+    def refresh_stale_metrics(self):
+        """
+        Rescore in memory if the stored metrics come from an older formula version
+        
+        Nothing is written; stale rows are upgraded by the sweep_metrics command.
+        The scoring kernel memoizes results per input combination.
+        Returns True when the metrics were rescored.
+        """
+        if not self.metrics_are_stale:
+            return False
+        
+        metrics = scoring_kernel.score(*(getattr(self, field) for field in self.SCORE_FIELDS))
+        for field, value in zip(self.METRIC_FIELDS, metrics):
+            setattr(self, field, value)
+        self.metrics_version = CURRENT_METRICS_VERSION
+        return True
         
     def save(self, *args, **kwargs):
         self.update_all_metrics()
-        super().save(*args, **kwargs)
+        self.change_seq = next_change_seq()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # Metrics recomputed from the saved score fields are saved with them
+            derived = self.METRIC_FIELDS + ['metrics_version'] if set(update_fields) & set(self.SCORE_FIELDS) else []
+            kwargs['update_fields'] = [
+                *update_fields,
+                *(field for field in ['updated_at', 'change_seq', *derived] if field not in update_fields)
+            ]
+        with transaction.atomic():
+            previous = self._stored_values()
+            super().save(*args, **kwargs)
+            forget_change_seq([self])
+            current = self.tracked_values(update_fields, previous) if update_fields and previous else self.tracked_values()
+            # Moves the row between completion statuses when its status changed
+            apply_running_totals(removed=[previous] if previous else [], added=[current])
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._stored_values()
+            session = (self.pk, self.session_id)
+            user_groups = list(self.user_groups.values_list('id', flat=True))
+            Tombstone.record(sessions=[session], user_groups=user_groups)
+            deleted = super().delete(*args, **kwargs)
+            if previous:
+                apply_running_totals(removed=[previous])
+        return deleted
     
     def __str__(self):
         return f"Session {self.session_id} - {self.completion_status} (UI: {self.usability_index:.1f})"
 
 
+class RunningTotals(models.Model):
+    """
+    Session count and metric sums kept up to date with F() deltas
+    """
+    sessions = models.BigIntegerField(default=0)
+    
+    # Sums over all sessions counted in this row
+    effectiveness_sum = models.FloatField(default=0.0)
+    efficiency_sum = models.FloatField(default=0.0)
+    satisfaction_sum = models.FloatField(default=0.0)
+    usability_index_sum = models.FloatField(default=0.0)
+    time_spent_sec_sum = models.FloatField(default=0.0)
+    steps_taken_sum = models.BigIntegerField(default=0)
+    backtracks_sum = models.BigIntegerField(default=0)
+    error_counts_sum = models.BigIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+    
+    @staticmethod
+    def column(field):
+        """Model field holding the total of a totals.TOTAL_FIELDS entry"""
+        return field if field == 'sessions' else f'{field}_sum'
+    
+    @classmethod
+    def from_totals(cls, values, **kwargs):
+        """Build an unsaved row from {total field: value}"""
+        return cls(**kwargs, **{cls.column(field): values.get(field, 0) for field in totals.TOTAL_FIELDS})
+    
+    @classmethod
+    def increment(cls, lookup, values):
+        """Add {total field: delta} to the rows matching lookup, returns the number of rows"""
+        changes = {
+            cls.column(field): F(cls.column(field)) + value
+            for field, value in values.items() if value
+        }
+        return cls.objects.filter(**lookup).update(**changes) if changes else None
+    
+    def total(self, field):
+        return getattr(self, self.column(field))
+
+
+class DashboardTotals(RunningTotals):
+    """
+    Running totals of sessions and their metrics for one completion status
+    
+    Kept up to date with F() deltas by every FormOutput write, so the dashboard
+    summary reads three rows instead of scanning all sessions. Metric sums are
+    under the formula version in metrics_version; rows that are missing, built
+    under an older version or marked stale (0) are rebuilt on the next read
+    together with the rollups, or with the rebuild_totals command.
+    """
+    completion_status = models.CharField(max_length=10, choices=FormOutput.COMPLETION_CHOICES, unique=True)
+    metrics_version = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = 'dashboard totals'
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Add {completion_status: {total field: delta}} with one UPDATE per status"""
+        for completion_status, values in deltas.items():
+            cls.increment({'completion_status': completion_status}, values)
+    
+    @classmethod
+    def mark_stale(cls):
+        """Have the next read rebuild the totals and rollups"""
+        cls.objects.update(metrics_version=0)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute all totals from FormOutput, returns the new rows"""
+        with transaction.atomic():
+            by_status = totals.totals_by_status(FormOutput.objects.all())
+            cls.objects.all().delete()
+            return cls.objects.bulk_create([
+                cls.from_totals(
+                    by_status.get(completion_status, {}),
+                    completion_status=completion_status,
+                    metrics_version=CURRENT_METRICS_VERSION
+                )
+                for completion_status, _ in FormOutput.COMPLETION_CHOICES
+            ])
+    
+    @classmethod
+    def current(cls):
+        """
+        Return the totals rows, rebuilding them first if missing or outdated
+        
+        The rollups depend on the same formula version and are rebuilt with them.
+        """
+        rows = list(cls.objects.all())
+        if len(rows) != len(FormOutput.COMPLETION_CHOICES) or any(
+            row.metrics_version != CURRENT_METRICS_VERSION for row in rows
+        ):
+            with transaction.atomic():
+                MetricsRollup.rebuild()
+                rows = cls.rebuild()
+        return rows
+    
+    def __str__(self):
+        return f"{self.completion_status.title()}: {self.sessions} sessions"
+
+
+class MetricsRollup(RunningTotals):
+    """
+    Running totals for one completion status within an hour or a day
+    
+    Buckets are UTC hours and days of FormOutput.created_at. Maintained with
+    F() deltas alongside DashboardTotals so trend charts read a few rows per
+    bucket; the backfill_rollups command rebuilds them from scratch.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    completion_status = models.CharField(max_length=10, choices=FormOutput.COMPLETION_CHOICES)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'completion_status'], name='unique_rollup_bucket'
+            ),
+        ]
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Add {(granularity, bucket_start, completion_status): {total field: delta}}, creating missing buckets"""
+        for (granularity, bucket_start, completion_status), values in deltas.items():
+            lookup = {'granularity': granularity, 'bucket_start': bucket_start, 'completion_status': completion_status}
+            if cls.increment(lookup, values) != 0:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.from_totals(values, **lookup).save()
+            except IntegrityError:
+                # Created concurrently since the UPDATE
+                cls.increment(lookup, values)
+    
+    @classmethod
+    def replace_all(cls, by_key, batch_size=1000):
+        """Replace every rollup with {(granularity, bucket_start, completion_status): totals}"""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls.from_totals(
+                        values, granularity=granularity, bucket_start=bucket_start, completion_status=completion_status
+                    )
+                    for (granularity, bucket_start, completion_status), values in by_key.items()
+                ],
+                batch_size=batch_size
+            )
+    
+    @classmethod
+    def rebuild(cls):
+        cls.replace_all(totals.totals_by_rollup(FormOutput.objects.all()))
+    
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:00} {self.completion_status}: {self.sessions} sessions"
+
+
+def apply_running_totals(removed=(), added=()):
+    """Apply the contributions of FormOutput rows removed and added (TRACKED_FIELDS tuples)"""
+    removed = list(removed)
+    added = list(added)
+    DashboardTotals.apply_deltas(totals.deltas(removed, added))
+    MetricsRollup.apply_deltas(totals.deltas(removed, added, keys=totals.rollup_keys))
+
+
+class UserGroupQuerySet(models.QuerySet):
+    """
+    QuerySet keeping the change feed up to date on bulk writes
+    """
+    
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        kwargs.setdefault('change_seq', next_change_seq())
+        return super().update(**kwargs)
+    
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            user_groups = list(self.values_list('id', flat=True))
+            Tombstone.record(user_groups=user_groups)
+            deleted = super().delete()
+        return deleted
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            stamp_changes(objs)
+            return super().bulk_create(objs, *args, **kwargs)
+    
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        fields = [*fields, *(field for field in ('updated_at', 'change_seq') if field not in fields)]
+        with transaction.atomic(using=self.db):
+            stamp_changes(objs)
+            return models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size)
+
+
 class UserGroup(models.Model):
     """
     Model to group user outcomes and analyze patterns
@@ -211,6 +562,11 @@ class UserGroup(models.Model):
                                    help_text="Additional notes about the failure")
     
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position of the last write in the change feed, see next_change_seq()
+    change_seq = models.BigIntegerField(default=0, db_index=True, editable=False)
+    
+    objects = UserGroupQuerySet.as_manager()
     
     def auto_populate_fields(self):
         """Auto-populate fields based on the linked FormOutput data"""
@@ -224,7 +580,117 @@ class UserGroup(models.Model):
         # Auto-populate fields if they're not already set
         if self.form_output and not self.pk:  # Only on creation
             self.auto_populate_fields()
+        self.change_seq = next_change_seq()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = [*update_fields, *(field for field in ('updated_at', 'change_seq') if field not in update_fields)]
         super().save(*args, **kwargs)
+        forget_change_seq([self])
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            Tombstone.record(user_groups=[self.pk])
+            deleted = super().delete(*args, **kwargs)
+        return deleted
     
     def __str__(self):
         return f"{self.outcome.title()} - {self.form_output.session_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Deleted session or UserGroup row, so the change feed can report it
+    """
+    TABLE_CHOICES = [
+        ('session', 'Session'),
+        ('user_group', 'User group'),
+    ]
+    table = models.CharField(max_length=10, choices=TABLE_CHOICES)
+    object_id = models.BigIntegerField()
+    # session_id of a deleted session, empty for UserGroup rows
+    session_id = models.CharField(max_length=100, blank=True)
+    change_seq = models.BigIntegerField(db_index=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    @classmethod
+    def record(cls, sessions=(), user_groups=()):
+        """
+        Record sessions, given as (id, session_id), and UserGroup ids about to be deleted
+        
+        Called in the deleting transaction before the rows are removed: the
+        change sequence is the highest change_seq stored, so while the rows
+        still exist the tombstones are stamped above them, also when they are
+        the most recently written rows.
+        """
+        tombstones = [
+            cls(table='session', object_id=pk, session_id=session_id) for pk, session_id in sessions
+        ] + [
+            cls(table='user_group', object_id=pk) for pk in user_groups
+        ]
+        if tombstones:
+            stamp_changes(tombstones)
+            cls.objects.bulk_create(tombstones)
+
+
+class JournalCheckpoint(models.Model):
+    """
+    Sequence number of the last journal record applied to the database
+    
+    Advanced in the same transaction as the writes of each applied batch, so
+    after a crash replay resumes exactly where the database left off.
+    """
+    applied_seq = models.BigIntegerField(default=0)
+    
+    @classmethod
+    def current(cls, for_update=False):
+        """The single checkpoint row, created on first use"""
+        objects = cls.objects.select_for_update() if for_update else cls.objects
+        return objects.get_or_create(pk=1)[0]
+
+
+# Tables whose change_seq columns together make up the change sequence
+CHANGE_SEQ_MODELS = [FormOutput, UserGroup, Tombstone]
+
+
+def current_change_seq():
+    """Highest change sequence number written so far (the change feed's high-water mark)"""
+    return max(
+        model.objects.order_by('-change_seq').values_list('change_seq', flat=True).first() or 0
+        for model in CHANGE_SEQ_MODELS
+    )
+
+
+def next_change_seq():
+    """
+    Expression for the change sequence number of a single-statement write
+    
+    One more than the highest change_seq written so far, read from the
+    change_seq indexes. It is evaluated inside the writing statement, which
+    holds the database write lock, so sequence numbers grow in commit order.
+    All rows written by one statement share the same number.
+    """
+    return Greatest(*(
+        Coalesce(Subquery(model.objects.order_by('-change_seq').values('change_seq')[:1]), Value(0))
+        for model in CHANGE_SEQ_MODELS
+    )) + 1
+
+
+def stamp_changes(objs):
+    """
+    Give objects about to be bulk written the next change sequence number
+    
+    Bulk writes read the sequence once, inside their transaction, instead of
+    compiling next_change_seq() for every row.
+    """
+    change_seq = current_change_seq() + 1
+    now = timezone.now()
+    for obj in objs:
+        obj.change_seq = change_seq
+        if hasattr(obj, 'updated_at'):
+            obj.updated_at = now
+
+
+def forget_change_seq(objs):
+    """Drop the next_change_seq() expressions of saved objects; change_seq is loaded again on access"""
+    for obj in objs:
+        obj.__dict__.pop('change_seq', None)
@@ -0,0 +1,88 @@
+"""
+Adaptive heartbeat interval
+
+update_session_metrics answers with next_update_in_ms, how long the client
+should wait before its next heartbeat. The interval starts from the
+session's state: short near completion, when the final counts are about to
+matter, and long while its updates no longer change anything. It then
+stretches with the load on the ingest path, measured as the recent write
+latency against LATENCY_TARGET_MS and the updates in flight or queued (in
+the group-commit writer or the journal) against QUEUE_TARGET. Heartbeats
+carry absolute counters, so under load clients send fewer of them without
+losing any counts.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from . import group_commit, journal
+
+
+NEAR_COMPLETION_INTERVAL_MS = 1000
+ACTIVE_INTERVAL_MS = 2000
+IDLE_INTERVAL_MS = 5000
+MAX_INTERVAL_MS = 30000
+
+# Steps left (of total_steps) at which a session counts as near completion
+NEAR_COMPLETION_STEPS = 2
+
+# Write latency and queue depth above which intervals stretch proportionally
+LATENCY_TARGET_MS = 50
+QUEUE_TARGET = 50
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.1
+
+
+class IngestLoad:
+    """Recent write latency and the number of updates in flight in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency_ms = 0.0
+        self.in_flight = 0
+
+    @contextmanager
+    def track(self):
+        """Count an update as in flight, and its duration in the latency average"""
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.in_flight -= 1
+                self.latency_ms += LATENCY_SMOOTHING * (elapsed_ms - self.latency_ms)
+
+    def queue_depth(self):
+        """Updates in flight, plus those waiting in the group-commit writer or the journal"""
+        return self.in_flight + group_commit.writer.queue_depth() + journal.backlog()
+
+    def load_factor(self):
+        """How far the ingest path is beyond its targets, at least 1"""
+        return max(1.0, self.latency_ms / LATENCY_TARGET_MS, self.queue_depth() / QUEUE_TARGET)
+
+    def reset(self):
+        with self._lock:
+            self.latency_ms = 0.0
+
+
+ingest_load = IngestLoad()
+
+
+def next_update_in_ms(fields_completed=None, total_steps=7, idle=False):
+    """
+    Milliseconds until a session's next heartbeat
+
+    fields_completed is None when the session's progress is unknown; idle
+    sessions are those whose last update changed nothing.
+    """
+    if fields_completed is not None and total_steps - fields_completed <= NEAR_COMPLETION_STEPS:
+        interval = NEAR_COMPLETION_INTERVAL_MS
+    elif idle:
+        interval = IDLE_INTERVAL_MS
+    else:
+        interval = ACTIVE_INTERVAL_MS
+    return min(round(interval * ingest_load.load_factor()), MAX_INTERVAL_MS)
@@ -0,0 +1,119 @@
+"""
+Keyset (cursor) pagination over sessions, newest first by default
+
+Pages are selected with WHERE (created_at, id) < (cursor) ORDER BY created_at
+DESC, id DESC LIMIT n, which the (created_at, id) index answers without
+scanning skipped rows. Cursors stay stable while new sessions are created.
+Other orderings page on (field, id) the same way.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# Default and maximum number of sessions per page
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(session, ordering):
+    """Cursor after session, a FormOutput or a .values() row including the ordering field and id"""
+    field = ordering.lstrip('-')
+    if isinstance(session, dict):
+        value, pk = session[field], session['id']
+    else:
+        value, pk = getattr(session, field), session.pk
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    position = json.dumps([ordering, value, pk])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor, ordering):
+    """Return (value, pk) for a cursor, raises NotFound if it is invalid or for another ordering"""
+    try:
+        cursor_ordering, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_ordering != ordering or not isinstance(pk, int):
+            raise ValueError(cursor)
+        if ordering.lstrip('-') == 'created_at':
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError(cursor)
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            # The other orderings are all numeric
+            raise ValueError(cursor)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise NotFound('Invalid cursor')
+    return value, pk
+
+
+class SessionCursorPagination(BasePagination):
+    """
+    Forward-only cursor pagination on (ordering field, id)
+
+    Query parameters: cursor (from the previous page's next_cursor) and
+    page_size (capped at MAX_PAGE_SIZE).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering='-created_at'):
+        self.ordering = ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = DEFAULT_PAGE_SIZE
+        return max(1, min(page_size, MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+        queryset = queryset.order_by(self.ordering, '-id' if descending else 'id')
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = decode_cursor(cursor, self.ordering)
+            beyond = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{beyond}': value}) | Q(**{field: value, f'id__{beyond}': pk})
+            )
+
+        # One extra row tells whether there is a next page
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = encode_cursor(page[page_size - 1], self.ordering) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
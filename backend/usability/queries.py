@@ -0,0 +1,102 @@
+"""
+Server-side session filtering for the dashboard
+
+Filters map onto the (completion_status, created_at) and (created_at, id)
+indexes. Metric ranges and orderings use the metrics under the current
+formulas, the values the responses report: stored for current rows, computed
+in the query for stale ones.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .metric_versions import current_metric_expressions
+from .models import FormOutput
+
+
+# Fields sessions can be ordered by (prefix with '-' for descending)
+ORDERING_FIELDS = [
+    'created_at', 'time_spent_sec', 'steps_taken', 'backtracks', 'error_counts',
+    'fields_completed', 'effectiveness', 'efficiency', 'satisfaction', 'usability_index',
+]
+DEFAULT_ORDERING = '-created_at'
+
+# Prefix of the annotations holding each metric under the current formulas
+CURRENT_METRIC_PREFIX = 'current_'
+
+# Query parameter -> (model field, lookup) for numeric ranges
+RANGE_FILTERS = {
+    'min_usability_index': ('usability_index', 'gte'),
+    'max_usability_index': ('usability_index', 'lte'),
+    'min_time_spent': ('time_spent_sec', 'gte'),
+    'max_time_spent': ('time_spent_sec', 'lte'),
+}
+
+
+def parse_datetime_param(value):
+    """
+    Parse an ISO date or datetime query parameter, None if invalid
+
+    Naive values are taken as UTC.
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is None:
+                return None
+            parsed = datetime.combine(parsed_date, datetime.min.time())
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def build_session_query(params):
+    """
+    Build the filtered FormOutput queryset and ordering for query parameters
+
+    Supported parameters: completion_status (comma-separated), created_after
+    (inclusive), created_before (exclusive), min/max_usability_index,
+    min/max_time_spent and ordering. Metric orderings are returned as the
+    name of their current_ annotation. Raises ValueError with a message for
+    invalid parameters.
+    """
+    metrics = current_metric_expressions()
+    queryset = FormOutput.objects.annotate(**{
+        f'{CURRENT_METRIC_PREFIX}{field}': expression for field, expression in metrics.items()
+    })
+
+    def column(field):
+        return f'{CURRENT_METRIC_PREFIX}{field}' if field in metrics else field
+
+    if params.get('completion_status'):
+        statuses = params['completion_status'].split(',')
+        valid_statuses = [choice[0] for choice in FormOutput.COMPLETION_CHOICES]
+        if any(value not in valid_statuses for value in statuses):
+            raise ValueError(f'Invalid completion_status. Must be one of: {", ".join(valid_statuses)}')
+        queryset = queryset.filter(completion_status__in=statuses)
+
+    for param, lookup in (('created_after', 'gte'), ('created_before', 'lt')):
+        if params.get(param):
+            value = parse_datetime_param(params[param])
+            if value is None:
+                raise ValueError(f'{param} must be an ISO date or datetime')
+            queryset = queryset.filter(**{f'created_at__{lookup}': value})
+
+    for param, (field, lookup) in RANGE_FILTERS.items():
+        if params.get(param):
+            try:
+                value = float(params[param])
+            except ValueError:
+                raise ValueError(f'{param} must be a number')
+            queryset = queryset.filter(**{f'{column(field)}__{lookup}': value})
+
+    ordering = params.get('ordering', DEFAULT_ORDERING)
+    field = ordering.lstrip('-')
+    if field not in ORDERING_FIELDS:
+        raise ValueError(f'Invalid ordering. Must be one of: {", ".join(ORDERING_FIELDS)} (prefix with - for descending)')
+
+    return queryset, ordering[:len(ordering) - len(field)] + column(field)
@@ -0,0 +1,56 @@
+"""
+Columnar encodings for session list responses
+
+Session lists are rendered with one array per field instead of one object per
+session, so keys are not repeated on every row:
+
+    [{"session_id": "a", "usability_index": 70.0}, {"session_id": "b", ...}]
+    -> {"session_id": ["a", "b"], "usability_index": [70.0, ...]}
+
+Paginated responses keep next/next_cursor and only results is turned into
+columns; any other response (errors, single objects) is rendered unchanged.
+Clients opt in with the Accept header or ?format=; plain JSON stays the
+default.
+"""
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+def to_columns(rows):
+    """Turn a list of dicts sharing the same keys into {key: [values]}"""
+    if not rows:
+        return {}
+    return {field: [row[field] for row in rows] for field in rows[0]}
+
+
+def columnar(data):
+    """Columnar form of a session list or paginated page, other data unchanged"""
+    if isinstance(data, list):
+        return to_columns(data)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': to_columns(data['results'])}
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.usability.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar(data), accepted_media_type, renderer_context)
+
+
+class ColumnarMessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(columnar(data), use_bin_type=True)
+
+
+# Renderers offered by the session list endpoints, JSON first as the default
+SESSION_LIST_RENDERERS = [JSONRenderer, ColumnarJSONRenderer, ColumnarMessagePackRenderer]
@@ -0,0 +1,97 @@
+"""
+Bulk rescoring of stored FormOutput metrics
+
+Shared by the recalculate_metrics and sweep_metrics commands. Rows are
+processed by primary-key range and scored with the NumPy batch engine.
+"""
+from django.db import transaction
+
+from .batch_scoring import score_batch
+from .metric_versions import CURRENT_METRICS_VERSION
+from .models import FormOutput
+
+
+# Upper bounds of the absolute delta buckets reported by --dry-run
+DELTA_BUCKETS = [0.01, 0.1, 1.0, 5.0, 10.0, 25.0]
+
+def empty_stats():
+    """Return an empty statistics record for a recalculation run"""
+    return {
+        'scanned': 0,
+        'changed': 0,
+        'deltas': {
+            field: {'count': 0, 'sum': 0.0, 'min': None, 'max': None, 'buckets': [0] * (len(DELTA_BUCKETS) + 1)}
+            for field in FormOutput.METRIC_FIELDS
+        }
+    }
+
+
+def merge_stats(total, stats):
+    """Merge the statistics of one primary-key range into the running total"""
+    total['scanned'] += stats['scanned']
+    total['changed'] += stats['changed']
+    for field, delta in stats['deltas'].items():
+        merged = total['deltas'][field]
+        merged['count'] += delta['count']
+        merged['sum'] += delta['sum']
+        for key, pick in (('min', min), ('max', max)):
+            if delta[key] is not None:
+                merged[key] = delta[key] if merged[key] is None else pick(merged[key], delta[key])
+        merged['buckets'] = [a + b for a, b in zip(merged['buckets'], delta['buckets'])]
+    return total
+
+
+def recalculate_range(start_pk, end_pk, dry_run=False, stale_only=False):
+    """
+    Recalculate metrics for all FormOutput rows with start_pk <= pk < end_pk
+
+    Only rows whose metrics or formula version change are written, with a
+    single bulk_update. With stale_only, rows already scored under the current
+    formula version are skipped. Runs in worker processes, so it only takes
+    and returns plain values.
+    """
+    queryset = FormOutput.objects.filter(pk__gte=start_pk, pk__lt=end_pk)
+    if stale_only:
+        queryset = queryset.stale()
+    rows = list(
+        queryset
+        .order_by('pk')
+        .values_list('pk', *FormOutput.SCORE_FIELDS, *FormOutput.METRIC_FIELDS, 'metrics_version')
+    )
+    stats = empty_stats()
+    stats['scanned'] = len(rows)
+    if not rows:
+        return stats
+
+    columns = list(zip(*rows))
+    inputs = dict(zip(FormOutput.SCORE_FIELDS, columns[1:len(FormOutput.SCORE_FIELDS) + 1]))
+    stored = dict(zip(FormOutput.METRIC_FIELDS, columns[len(FormOutput.SCORE_FIELDS) + 1:-1]))
+    versions = columns[-1]
+    scores = score_batch(**inputs)
+
+    changed = []
+    for i, pk in enumerate(columns[0]):
+        new_values = {field: float(scores[field][i]) for field in FormOutput.METRIC_FIELDS}
+        if versions[i] == CURRENT_METRICS_VERSION and all(
+            new_values[field] == stored[field][i] for field in FormOutput.METRIC_FIELDS
+        ):
+            continue
+
+        changed.append(FormOutput(pk=pk, metrics_version=CURRENT_METRICS_VERSION, **new_values))
+        for field, value in new_values.items():
+            delta = value - stored[field][i]
+            if delta == 0:
+                continue
+            record = stats['deltas'][field]
+            record['count'] += 1
+            record['sum'] += delta
+            record['min'] = delta if record['min'] is None else min(record['min'], delta)
+            record['max'] = delta if record['max'] is None else max(record['max'], delta)
+            bucket = next((b for b, bound in enumerate(DELTA_BUCKETS) if abs(delta) < bound), len(DELTA_BUCKETS))
+            record['buckets'][bucket] += 1
+
+    stats['changed'] = len(changed)
+    if changed and not dry_run:
+        with transaction.atomic():
+            FormOutput.objects.bulk_update(changed, fields=FormOutput.METRIC_FIELDS + ['metrics_version'])
+    return stats
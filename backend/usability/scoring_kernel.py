@@ -0,0 +1,202 @@
+"""
+Scalar scoring kernel for FormOutput metrics
+
+Apart from time_spent_sec, which only matters up to the 90 s baseline, every
+metric input is a small bounded integer. The exponential decay terms are
+precomputed for all counts below DECAY_TABLE_SIZE and everything that does not
+depend on time is memoized per input combination, so scoring a heartbeat is a
+few table lookups and multiplications. Values outside the tables (negative,
+very large or non-integer counts) are computed directly.
+"""
+import math
+
+
+BASELINE_TIME = 90.0
+
+SATISFACTION_SCORES = {
+    'success': 68.0,
+    'partial': 34.0,
+    'failure': 0.0,
+}
+
+# Counts below this size use the precomputed decay table
+DECAY_TABLE_SIZE = 64
+
+# Maximum number of memoized input combinations
+TERMS_CACHE_SIZE = 65536
+
+
+def exp_decay(count):
+    """Smooth penalty growth with diminishing returns: 1 - exp(-count / 3)"""
+    return 1 - math.exp(-count / 3)
+
+
+DECAY_TABLE = tuple(exp_decay(count) for count in range(DECAY_TABLE_SIZE))
+
+
+def decay(count):
+    """exp_decay for positive counts (0 otherwise), read from the precomputed table when possible"""
+    if count <= 0:
+        return 0
+    if type(count) is int and count < DECAY_TABLE_SIZE:
+        return DECAY_TABLE[count]
+    return exp_decay(count)
+
+
+def _effectiveness(completion_status, fields_completed, total_steps, error_counts):
+    # Steps completed successfully based on completion status
+    if completion_status == 'success':
+        steps_completed_successfully = total_steps
+    elif completion_status == 'partial':
+        steps_completed_successfully = fields_completed
+    else:  # failure
+        steps_completed_successfully = 0
+
+    base_effectiveness = (steps_completed_successfully / total_steps) * 100
+
+    # Smooth effectiveness penalty calculation using logarithmic decay
+    effectiveness_penalty = 25 * decay(error_counts)
+
+    return round(max(0, base_effectiveness - effectiveness_penalty), 2)
+
+
+def _efficiency_terms(completion_status, fields_completed, total_steps, total_inefficiencies):
+    """
+    Time-independent parts of the efficiency formula
+
+    Returns (efficiency_penalty, completion_ratio, completion_bonus, inefficiency_penalty,
+    scale) where scale is the discount applied to the scaled base efficiency, or None
+    when the efficiency is 0 regardless of time.
+    """
+    # Base penalty per inefficiency (backtracks and extra steps), with diminishing returns
+    inefficiency_decay = decay(total_inefficiencies)
+    efficiency_penalty = 25 * inefficiency_decay
+
+    if completion_status == 'success':
+        # No additional penalty for successful completion
+        return efficiency_penalty, 1, 0, 0, 1
+    if completion_status == 'partial':
+        # Scale by how much was completed, add a small bonus (up to 5 points) and a lighter penalty
+        completion_ratio = fields_completed / total_steps
+        return efficiency_penalty, completion_ratio, 5 * completion_ratio, 15 * inefficiency_decay, 1
+    # failure: only give minimal credit if fields were completed
+    if fields_completed > 0:
+        # Heavy discount (50% of scaled value), minimal bonus and heavy inefficiency penalty
+        completion_ratio = fields_completed / total_steps
+        return efficiency_penalty, completion_ratio, 3 * completion_ratio, 20 * inefficiency_decay, 0.5
+    return efficiency_penalty, 0, 0, 0, None
+
+
+def _efficiency(completion_status, time_spent_sec, efficiency_terms):
+    efficiency_penalty, completion_ratio, completion_bonus, inefficiency_penalty, scale = efficiency_terms
+    if scale is None:
+        # No fields completed = 0 efficiency
+        return 0.0
+
+    # TimeM: share of the baseline time used, capped at 100
+    if time_spent_sec <= 0:
+        time_m = 0
+    elif time_spent_sec >= BASELINE_TIME:
+        time_m = 100.0
+    else:
+        time_m = (time_spent_sec / BASELINE_TIME) * 100
+
+    # Calculate base efficiency (same formula for all statuses)
+    base_efficiency = max(0, time_m - efficiency_penalty)
+    if completion_status == 'success':
+        return round(base_efficiency, 2)
+
+    # Combine: scaled efficiency + bonus - inefficiency penalty
+    if scale == 1:
+        scaled_efficiency = base_efficiency * completion_ratio
+    else:
+        scaled_efficiency = base_efficiency * completion_ratio * scale
+    return round(max(0, scaled_efficiency + completion_bonus - inefficiency_penalty), 2)
+
+
+def satisfaction(completion_status):
+    """Satisfaction: fixed score per completion status"""
+    return SATISFACTION_SCORES.get(completion_status, SATISFACTION_SCORES['failure'])
+
+
+def usability_index(effectiveness, efficiency, satisfaction):
+    """Usability index: UI = 0.40*E + 0.30*F + 0.30*S"""
+    return round(0.40 * effectiveness + 0.30 * efficiency + 0.30 * satisfaction, 2)
+
+
+_TERMS = {}
+
+
+def _terms(completion_status, fields_completed, total_steps, total_inefficiencies, error_counts):
+    """
+    Everything that does not depend on time_spent_sec, memoized per input combination
+
+    Returns (effectiveness, satisfaction, efficiency_terms, scores_at_baseline), where
+    scores_at_baseline are the four metrics for any time at or beyond the baseline.
+    """
+    key = (completion_status, fields_completed, total_steps, total_inefficiencies, error_counts)
+    terms = _TERMS.get(key)
+    if terms is not None:
+        return terms
+
+    effectiveness_score = _effectiveness(completion_status, fields_completed, total_steps, error_counts)
+    satisfaction_score = satisfaction(completion_status)
+    efficiency_terms = _efficiency_terms(completion_status, fields_completed, total_steps, total_inefficiencies)
+    efficiency_at_baseline = _efficiency(completion_status, BASELINE_TIME, efficiency_terms)
+    terms = (
+        effectiveness_score,
+        satisfaction_score,
+        efficiency_terms,
+        (
+            effectiveness_score,
+            efficiency_at_baseline,
+            satisfaction_score,
+            usability_index(effectiveness_score, efficiency_at_baseline, satisfaction_score),
+        ),
+    )
+
+    # Only bounded integer inputs are kept; anything else is computed on every call
+    if len(_TERMS) < TERMS_CACHE_SIZE and all(
+        type(count) is int and 0 <= count < DECAY_TABLE_SIZE
+        for count in (fields_completed, total_steps, total_inefficiencies, error_counts)
+    ):
+        _TERMS[key] = terms
+    return terms
+
+
+def effectiveness(completion_status, fields_completed, total_steps, error_counts):
+    """Effectiveness: (steps completed successfully / total steps) x 100 - effectiveness_penalty"""
+    return _terms(completion_status, fields_completed, total_steps, 0, error_counts)[0]
+
+
+def efficiency(completion_status, time_spent_sec, steps_taken, backtracks, fields_completed, total_steps):
+    """Efficiency: TimeM - efficiency_penalty, scaled for partial and failed sessions"""
+    # Calculate extra steps beyond the optimal path
+    extra_steps = steps_taken - total_steps if steps_taken > total_steps else 0
+    terms = _terms(completion_status, fields_completed, total_steps, backtracks + extra_steps, 0)
+    return _efficiency(completion_status, time_spent_sec, terms[2])
+
+
+def score(time_spent_sec, steps_taken, backtracks, error_counts,
+          fields_completed, total_steps, completion_status):
+    """
+    Score one session
+
+    Takes the inputs in FormOutput.SCORE_FIELDS order and returns
+    (effectiveness, efficiency, satisfaction, usability_index). Sessions at or
+    beyond the baseline time are answered with a single lookup.
+    """
+    extra_steps = steps_taken - total_steps if steps_taken > total_steps else 0
+    effectiveness_score, satisfaction_score, efficiency_terms, scores_at_baseline = _terms(
+        completion_status, fields_completed, total_steps, backtracks + extra_steps, error_counts
+    )
+    if time_spent_sec >= BASELINE_TIME:
+        return scores_at_baseline
+
+    efficiency_score = _efficiency(completion_status, time_spent_sec, efficiency_terms)
+    return (
+        effectiveness_score,
+        efficiency_score,
+        satisfaction_score,
+        round(0.40 * effectiveness_score + 0.30 * efficiency_score + 0.30 * satisfaction_score, 2),
+    )
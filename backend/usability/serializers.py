@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from . import scoring_kernel
+from .metric_versions import CURRENT_METRICS_VERSION
 from .models import FormOutput, UserGroup
 
 
@@ -16,6 +18,68 @@ class FormOutputSerializer(serializers.ModelSerializer):
             'completion_status', 'fields_completed', 'total_steps'
         ]
         read_only_fields = ['id', 'created_at', 'effectiveness', 'efficiency', 'satisfaction', 'usability_index']
+    
+    def to_representation(self, instance):
+        # Report metrics under the current formulas even if the row is not upgraded yet
+        instance.refresh_stale_metrics()
+        return super().to_representation(instance)
+
+
+class FormOutputValuesSerializer:
+    """
+    Lean read-only equivalent of FormOutputSerializer over .values() rows
+    
+    Converters are resolved once from FormOutputSerializer's fields, so rows
+    are serialized without per-row field introspection and the output matches
+    FormOutputSerializer for the same fields. fields selects a sparse fieldset
+    (default: all of FormOutputSerializer's fields).
+    """
+    # Field classes whose to_representation is the builtin conversion
+    FAST_CONVERTERS = {
+        serializers.IntegerField: int,
+        serializers.FloatField: float,
+        serializers.CharField: str,
+    }
+    
+    def __init__(self, fields=None):
+        declared = FormOutputSerializer().fields
+        if fields is None:
+            fields = list(declared)
+        unknown = [field for field in fields if field not in declared]
+        if unknown or not fields:
+            raise ValueError(f'Invalid fields. Must be a subset of: {", ".join(declared)}')
+        
+        self.fields = list(dict.fromkeys(fields))
+        self.converters = [
+            (field, self.FAST_CONVERTERS.get(type(declared[field]), declared[field].to_representation))
+            for field in self.fields
+        ]
+        # Stale metrics are rescored from the inputs, as FormOutputSerializer does
+        self.rescores = bool(set(self.fields) & set(FormOutput.METRIC_FIELDS))
+    
+    @classmethod
+    def from_query_param(cls, value):
+        """Serializer for a comma-separated ?fields= value, all fields when empty"""
+        return cls([field.strip() for field in value.split(',')] if value else None)
+    
+    def values(self, queryset, *extra):
+        """queryset.values() with the columns to_representation needs, plus extra"""
+        columns = self.fields + list(extra)
+        if self.rescores:
+            columns += ['metrics_version'] + FormOutput.SCORE_FIELDS
+        return queryset.values(*dict.fromkeys(columns))
+    
+    def to_representation(self, row):
+        if self.rescores and row['metrics_version'] != CURRENT_METRICS_VERSION:
+            metrics = scoring_kernel.score(*(row[field] for field in FormOutput.SCORE_FIELDS))
+            row.update(zip(FormOutput.METRIC_FIELDS, metrics))
+        return {
+            field: None if (value := row[field]) is None else convert(value)
+            for field, convert in self.converters
+        }
+    
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
 
 
 class FormOutputCreateSerializer(serializers.ModelSerializer):
@@ -40,6 +104,24 @@ class FormOutputUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
+class FormOutputDeltasSerializer(serializers.Serializer):
+    """
+    Serializer for the counter increments of a delta-mode metrics update
+    """
+    steps_taken = serializers.IntegerField(min_value=0, required=False)
+    backtracks = serializers.IntegerField(min_value=0, required=False)
+    error_counts = serializers.IntegerField(min_value=0, required=False)
+    extra_clicks = serializers.IntegerField(min_value=0, required=False)
+    
+    def validate(self, attrs):
+        unknown = set(self.initial_data) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown counters: {", ".join(sorted(unknown))}. Must be a subset of: {", ".join(self.fields)}'
+            )
+        return attrs
+
+
 class UserGroupSerializer(serializers.ModelSerializer):
     """
     Serializer for UserGroup model
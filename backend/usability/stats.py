@@ -0,0 +1,36 @@
+"""
+Counters for monitoring the ingest path
+
+Counted in memory by each server process since it started, and served by
+the ingest/stats/ endpoint; with several processes, sum their readings.
+"""
+import threading
+
+
+class Counters:
+    """Named counters that can be incremented from any thread"""
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._values = dict.fromkeys(names, 0)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values = dict.fromkeys(self._values, 0)
+
+
+# Metrics updates written to the database, and those skipped as unchanged
+heartbeat_writes = Counters('applied', 'skipped')
+
+# Requests admitted and shed by admission control, per request class;
+# session_limited counts the heartbeats shed by their session's own bucket
+admitted_requests = Counters('completion', 'heartbeat', 'dashboard')
+shed_requests = Counters('completion', 'heartbeat', 'dashboard', 'session_limited')
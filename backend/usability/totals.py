@@ -0,0 +1,147 @@
+"""
+Running totals behind the dashboard summary and trends
+
+Each FormOutput row contributes one session plus its metrics and interaction
+counts to the totals of its completion status, and to the hourly and daily
+rollup buckets its created_at falls in. Metrics are always taken under the
+current formula version (computed from the row's inputs), so upgrading stale
+rows never changes the totals. Writers turn the contributions they remove and
+add into deltas that are applied with F() expressions.
+
+Rows are described by their FormOutput.TRACKED_FIELDS values: the
+SCORE_FIELDS followed by created_at.
+"""
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+from . import scoring_kernel
+from .metric_versions import current_metric_expressions
+
+
+METRIC_FIELDS = ['effectiveness', 'efficiency', 'satisfaction', 'usability_index']
+# Input columns summed as they are
+COUNTER_FIELDS = ['time_spent_sec', 'steps_taken', 'backtracks', 'error_counts']
+TOTAL_FIELDS = ['sessions'] + METRIC_FIELDS + COUNTER_FIELDS
+
+# Rollup granularities and the database functions truncating created_at to them
+GRANULARITIES = {
+    'hour': TruncHour,
+    'day': TruncDay,
+}
+
+
+def bucket_start(created_at, granularity):
+    """Start of the UTC hour or day created_at falls in"""
+    created_at = created_at.astimezone(dt_timezone.utc)
+    if granularity == 'hour':
+        return created_at.replace(minute=0, second=0, microsecond=0)
+    return created_at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def status_keys(values):
+    """Key of the per-status totals a row contributes to"""
+    return [values[6]]
+
+
+def rollup_keys(values):
+    """Keys (granularity, bucket_start, completion_status) of the rollups a row contributes to"""
+    return [(granularity, bucket_start(values[7], granularity), values[6]) for granularity in GRANULARITIES]
+
+
+def contribution(values):
+    """
+    Return {total field: value} for one row
+
+    Only the leading FormOutput.SCORE_FIELDS values are used.
+    """
+    time_spent_sec, steps_taken, backtracks, error_counts = values[:4]
+    try:
+        metrics = scoring_kernel.score(*values[:7])
+    except ZeroDivisionError:
+        # total_steps == 0: the database yields NULL, which SUM skips
+        metrics = (0.0, 0.0, 0.0, 0.0)
+
+    values = dict(zip(METRIC_FIELDS, metrics))
+    values.update(
+        sessions=1,
+        time_spent_sec=time_spent_sec,
+        steps_taken=steps_taken,
+        backtracks=backtracks,
+        error_counts=error_counts,
+    )
+    return values
+
+
+def deltas(removed=(), added=(), keys=status_keys):
+    """Return {key: {total field: delta}} for rows removed and added, keyed by keys(row)"""
+    result = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    for sign, rows in ((-1, removed), (1, added)):
+        for values in rows:
+            row_contribution = contribution(values)
+            for key in keys(values):
+                key_deltas = result[key]
+                for field, value in row_contribution.items():
+                    key_deltas[field] += sign * value
+    return dict(result)
+
+
+def negate(grouped_totals):
+    """Turn {key: {field: total}} into the deltas that remove it"""
+    return {
+        key: {field: -value for field, value in values.items()}
+        for key, values in grouped_totals.items()
+    }
+
+
+def merge(target, grouped_totals):
+    """Add {key: {field: total}} into target in place"""
+    for key, values in grouped_totals.items():
+        key_totals = target.setdefault(key, dict.fromkeys(TOTAL_FIELDS, 0))
+        for field, value in values.items():
+            key_totals[field] += value
+    return target
+
+
+def _grouped_totals(queryset, **group_by):
+    metrics = current_metric_expressions()
+    return (
+        queryset
+        .order_by()
+        .annotate(**group_by)
+        .values('completion_status', *group_by)
+        .annotate(
+            total_sessions=Count('id'),
+            **{f'total_{field}': Sum(metrics[field]) for field in METRIC_FIELDS},
+            **{f'total_{field}': Sum(field) for field in COUNTER_FIELDS}
+        )
+    )
+
+
+def _row_totals(row):
+    return {field: row[f'total_{field}'] or 0 for field in TOTAL_FIELDS}
+
+
+def totals_by_status(queryset):
+    """Compute {completion_status: {total field: sum}} for a FormOutput queryset in one query"""
+    return {row['completion_status']: _row_totals(row) for row in _grouped_totals(queryset)}
+
+
+def totals_by_bucket(queryset, granularity):
+    """Compute {(granularity, bucket_start, completion_status): {total field: sum}} in one query"""
+    trunc = GRANULARITIES[granularity]
+    rows = _grouped_totals(queryset, bucket=trunc('created_at', tzinfo=dt_timezone.utc))
+    return {
+        (granularity, row['bucket'], row['completion_status']): _row_totals(row)
+        for row in rows
+    }
+
+
+def totals_by_rollup(queryset):
+    """totals_by_bucket for every granularity"""
+    result = {}
+    for granularity in GRANULARITIES:
+        result.update(totals_by_bucket(queryset, granularity))
+    return result
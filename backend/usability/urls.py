@@ -1,20 +1,36 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'usability'
 
+# Session hot path: native async views under ASGI, DRF views otherwise
+hot_path = async_views if settings.USABILITY_ASYNC_VIEWS else views
+
 urlpatterns = [
     # Session management
     path('sessions/', views.FormOutputListCreateView.as_view(), name='session-list-create'),
     path('sessions/create/', views.create_session, name='session-create'),
+    path('sessions/batch/', views.batch_update_sessions, name='session-batch'),
+    path('sessions/query/', views.query_sessions, name='session-query'),
     path('sessions/<str:session_id>/', views.FormOutputDetailView.as_view(), name='session-detail'),
-    path('sessions/<str:session_id>/update/', views.update_session_metrics, name='session-update'),
-    path('sessions/<str:session_id>/complete/', views.complete_session, name='session-complete'),
-    path('sessions/<str:session_id>/analytics/', views.get_session_analytics, name='session-analytics'),
+    path('sessions/<str:session_id>/update/', hot_path.update_session_metrics, name='session-update'),
+    path('sessions/<str:session_id>/complete/', hot_path.complete_session, name='session-complete'),
+    path('sessions/<str:session_id>/analytics/', hot_path.get_session_analytics, name='session-analytics'),
+    path('sessions/<str:session_id>/events/', views.session_events, name='session-events'),
     
     # Dashboard endpoints
     path('dashboard/summary/', views.dashboard_summary, name='dashboard-summary'),
     path('dashboard/recent/', views.recent_sessions, name='recent-sessions'),
+    path('dashboard/trends/', views.dashboard_trends, name='dashboard-trends'),
+    path('dashboard/changes/', views.dashboard_changes, name='dashboard-changes'),
+    path('dashboard/events/', views.dashboard_events, name='dashboard-events'),
+    
+    # Monitoring
+    path('ingest/stats/', views.ingest_stats, name='ingest-stats'),
+    
+    # Data export
+    path('export/sessions/', views.export_sessions, name='export-sessions'),
     
     # Admin API endpoints
     path('admin/api/formoutput/<int:pk>/', views.get_formoutput_details, name='formoutput-details'),
@@ -1,24 +1,288 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg, Count
+from django.views.decorators.http import require_GET
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+import re
 import uuid
 from datetime import timedelta
 
-from .models import FormOutput, UserGroup
+from . import group_commit, journal
+from .caching import cached_for_generation, request_write_generation
+from .changes import DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT, changes_since
+from .conditional import conditional_get, session_etag, session_last_modified, table_etag
+from .events import SUMMARY_TOPIC, EventStream, SummaryStream, broker, format_event, session_topic
+from .export import EXPORT_FORMATS, stream_export
+from .models import DashboardTotals, FormOutput, MetricsRollup, UserGroup
+from .pacing import ingest_load, next_update_in_ms
+from .pagination import MAX_PAGE_SIZE, SessionCursorPagination
+from .queries import build_session_query, parse_datetime_param
+from .renderers import SESSION_LIST_RENDERERS
 from .serializers import (
-    FormOutputSerializer, FormOutputCreateSerializer, FormOutputUpdateSerializer,
-    UserGroupSerializer, DashboardSummarySerializer, SessionAnalyticsSerializer
+    FormOutputSerializer, FormOutputCreateSerializer, FormOutputUpdateSerializer, FormOutputDeltasSerializer,
+    FormOutputValuesSerializer, UserGroupSerializer, DashboardSummarySerializer, SessionAnalyticsSerializer
 )
+from .stats import admitted_requests, heartbeat_writes, shed_requests
+from .totals import bucket_start
+
+
+# Maximum number of updates plus completions accepted by one batch request
+MAX_BATCH_SIZE = 500
+
+# Session IDs clients may create sessions under with their first update
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,100}')
+
+# UserGroup fields a completion's user_group_data may set
+USER_GROUP_DATA_FIELDS = {
+    field.name for field in UserGroup._meta.concrete_fields
+} - {'id', 'form_output', 'created_at', 'updated_at', 'change_seq'}
+
+# Bucket size and default range of each trends granularity
+TREND_GRANULARITIES = {
+    'hour': (timedelta(hours=1), timedelta(days=7)),
+    'day': (timedelta(days=1), timedelta(days=90)),
+}
+# Maximum number of buckets one trends request may cover
+MAX_TREND_BUCKETS = 2400
+
+
+def build_session_analytics(form_output):
+    """
+    Build the real-time analytics payload for a session
+    """
+    form_output.refresh_stale_metrics()
+    
+    # Calculate current step based on form progress (1-7: 6 fields + register button)
+    if form_output.completion_status == 'success':
+        current_step = 7  # All fields + register button completed
+    elif form_output.completion_status == 'partial':
+        current_step = form_output.fields_completed
+    else:  # failure
+        current_step = form_output.fields_completed
+    
+    return {
+        'session_id': form_output.session_id,
+        'current_step': current_step,
+        'task_time': f"{int(form_output.time_spent_sec // 60)}:{int(form_output.time_spent_sec % 60):02d}",
+        'steps': form_output.steps_taken,
+        'backtracks': form_output.backtracks,
+        'errors': form_output.error_counts,
+        'extra_clicks': form_output.extra_clicks,
+        'effectiveness': round(form_output.effectiveness, 1),
+        'efficiency': round(form_output.efficiency, 1),
+        'satisfaction': round(form_output.satisfaction, 1),
+        'usability_index': round(form_output.usability_index, 1)
+    }
+
+
+def publish_session_analytics(form_output):
+    """
+    Push the session's analytics to its event streams once the write commits
+    """
+    topic = session_topic(form_output.session_id)
+    if broker.has_subscribers(topic):
+        analytics = build_session_analytics(form_output)
+        transaction.on_commit(lambda: broker.publish(topic, 'analytics', analytics))
+
+
+def publish_summary():
+    """
+    Push the dashboard summary to its event streams once a completion commits
+    
+    Each stream sends its client only the fields that changed (SummaryStream).
+    """
+    def publish():
+        broker.publish(SUMMARY_TOPIC, 'summary', cached_for_generation('dashboard-summary', build_dashboard_summary))
+    
+    if broker.has_subscribers(SUMMARY_TOPIC):
+        transaction.on_commit(publish)
+
+
+def validate_session_update(data):
+    """
+    Validate a metrics update payload
+    
+    Counters are sent either as absolute values or, in delta mode, as
+    increments: {"deltas": {"backtracks": 1}, <other fields>}. Returns
+    (deltas, values, errors); deltas is None outside delta mode.
+    """
+    if 'deltas' not in data:
+        serializer = FormOutputUpdateSerializer(data=data, partial=True)
+        if not serializer.is_valid():
+            return None, None, serializer.errors
+        return None, serializer.validated_data, {}
+    
+    deltas = FormOutputDeltasSerializer(data=data['deltas'])
+    serializer = FormOutputUpdateSerializer(
+        data={key: value for key, value in data.items() if key != 'deltas'}, partial=True
+    )
+    errors = {}
+    if not deltas.is_valid():
+        errors['deltas'] = deltas.errors
+    if not serializer.is_valid():
+        errors.update(serializer.errors)
+    if errors:
+        return None, None, errors
+    
+    both = set(deltas.validated_data) & set(serializer.validated_data)
+    if both:
+        return None, None, {'deltas': [f'Sent both as a delta and as a value: {", ".join(sorted(both))}']}
+    return deltas.validated_data, serializer.validated_data, {}
+
+
+def is_unchanged(form_output, values):
+    """
+    Whether writing values would leave the session as it is
+    
+    time_spent_sec counts as unchanged while within
+    USABILITY_HEARTBEAT_TIME_RESOLUTION_SEC of the stored value (0 by default,
+    so the last update before a completion is never skipped for its time).
+    """
+    for field, value in values.items():
+        if field == 'time_spent_sec':
+            if abs(value - form_output.time_spent_sec) > settings.USABILITY_HEARTBEAT_TIME_RESOLUTION_SEC:
+                return False
+        elif getattr(form_output, field) != value:
+            return False
+    return True
+
+
+def write_session_update(session_id, deltas, values):
+    """
+    Write a validated metrics update and return the session
+    
+    Absolute values are written to the row read to compare them with (see
+    is_unchanged()), saving only the fields sent and the metrics derived from
+    them; deltas are added by the database without reading the row first. A
+    session that does not exist yet is created, with the deltas as its
+    counters. Analytics are published once the write commits. write_skipped
+    is set on the returned session.
+    """
+    if deltas is None:
+        form_output = FormOutput.objects.filter(session_id=session_id).first()
+        created = False
+        if form_output is None:
+            try:
+                with transaction.atomic():
+                    form_output = FormOutput.objects.create(session_id=session_id, **values)
+                created = True
+            except IntegrityError:
+                # Created by a concurrent first update
+                form_output = FormOutput.objects.get(session_id=session_id)
+        if not created:
+            if is_unchanged(form_output, values):
+                heartbeat_writes.incr('skipped')
+                form_output.write_skipped = True
+                return form_output
+            for field, value in values.items():
+                setattr(form_output, field, value)
+            form_output.save(update_fields=list(values))
+    else:
+        sessions = FormOutput.objects.filter(session_id=session_id)
+        form_outputs = sessions.increment(deltas, **values)
+        if form_outputs:
+            form_output = form_outputs[0]
+        else:
+            try:
+                with transaction.atomic():
+                    form_output = FormOutput.objects.create(session_id=session_id, **deltas, **values)
+            except IntegrityError:
+                # Created by a concurrent first update
+                form_output = sessions.increment(deltas, **values)[0]
+    heartbeat_writes.incr('applied')
+    form_output.write_skipped = False
+    publish_session_analytics(form_output)
+    return form_output
+
+
+def update_interval_ms(form_output=None, values=None):
+    """
+    Hint for when the client should send its next update (see usability.pacing)
+    
+    Taken from the session as written, or in journal mode, where the session
+    is not read, from the update's values.
+    """
+    if form_output is None:
+        total_steps = values.get('total_steps', FormOutput._meta.get_field('total_steps').default)
+        return next_update_in_ms(values.get('fields_completed'), total_steps)
+    return next_update_in_ms(form_output.fields_completed, form_output.total_steps, idle=form_output.write_skipped)
+
+
+def validate_session_completion(data):
+    """
+    Validate a completion payload
+    
+    Checked before anything is written, and in journal mode before the
+    completion is acknowledged, since it is only applied afterwards. Returns
+    (completion_status, user_group_data, errors).
+    """
+    completion_status = data.get('completion_status', 'failure')
+    user_group_data = data.get('user_group_data') or {}
+    if completion_status not in {choice for choice, _ in FormOutput.COMPLETION_CHOICES}:
+        return None, None, {'error': f'Invalid completion_status: {completion_status}'}
+    if not isinstance(user_group_data, dict):
+        return None, None, {'error': 'user_group_data must be an object'}
+    unknown = set(user_group_data) - USER_GROUP_DATA_FIELDS
+    if unknown:
+        return None, None, {'error': f'Unknown user_group_data fields: {", ".join(sorted(unknown))}'}
+    return completion_status, dict(user_group_data), {}
+
+
+def write_session_completion(session_id, completion_status, user_group_data):
+    """
+    Set the final status of a session, create its UserGroup entry, and return the session
+    
+    Raises FormOutput.DoesNotExist for an unknown session.
+    """
+    form_output = FormOutput.objects.get(session_id=session_id)
+    form_output.completion_status = completion_status
+    form_output.save(update_fields=['completion_status'])
+    
+    build_user_group(form_output, completion_status, user_group_data).save()
+    publish_session_analytics(form_output)
+    publish_summary()
+    return form_output
+
+
+def build_user_group(form_output, completion_status, user_group_data):
+    """
+    Build an unsaved UserGroup entry for a completed session
+    """
+    # Map FormOutput completion_status to UserGroup outcome
+    outcome_mapping = {
+        'success': 'success',
+        'partial': 'partial', 
+        'failure': 'failure'
+    }
+    outcome = outcome_mapping.get(completion_status, 'failure')
+    
+    user_group_data = {
+        'outcome': outcome,
+        **user_group_data
+    }
+    
+    # Auto-populate fields based on FormOutput data for partial completion
+    if outcome == 'partial':
+        user_group_data.setdefault('partial_fields_completed', form_output.fields_completed)
+    elif outcome == 'failure':
+        user_group_data.setdefault('failure_steps_completed', form_output.steps_taken)
+    
+    return UserGroup(form_output=form_output, **user_group_data)
 
 
 class FormOutputListCreateView(generics.ListCreateAPIView):
     """
-    List all form outputs or create a new one
+    List all form outputs (cursor-paginated, newest first) or create a new one
     """
-    queryset = FormOutput.objects.all().order_by('-created_at')
+    queryset = FormOutput.objects.all().order_by('-created_at', '-id')
+    pagination_class = SessionCursorPagination
+    renderer_classes = SESSION_LIST_RENDERERS
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -67,42 +331,41 @@ def create_session(request):
 def update_session_metrics(request, session_id):
     """
     Update session metrics in real-time during testing
+    
+    The session is created by its first update, so clients can generate the
+    session_id themselves instead of calling sessions/create/ first. Counters
+    are sent either as absolute values or, in delta mode, as increments:
+    {"deltas": {"backtracks": 1}, <other fields>}.
     """
-    try:
-        form_output = FormOutput.objects.get(session_id=session_id)
-    except FormOutput.DoesNotExist:
-        return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        return Response({'error': 'Invalid session_id'}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = FormOutputUpdateSerializer(form_output, data=request.data, partial=True)
-    if serializer.is_valid():
-        serializer.save()
-        
-        # Calculate current step based on form progress (1-7: 6 fields + register button)
-        if form_output.completion_status == 'success':
-            current_step = 7  # All fields + register button completed
-        elif form_output.completion_status == 'partial':
-            current_step = form_output.fields_completed
-        else:  # failure
-            current_step = form_output.fields_completed
-        
-        # Return updated analytics
-        analytics_data = {
+    deltas, values, errors = validate_session_update(request.data)
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    if settings.USABILITY_JOURNAL:
+        # Acknowledged once on disk, applied to the database by the journal consumer
+        with ingest_load.track():
+            seq = journal.append({'type': 'update', 'session_id': session_id, 'deltas': deltas, 'values': values})
+        return Response({
             'session_id': session_id,
-            'current_step': current_step,
-            'task_time': f"{int(form_output.time_spent_sec // 60)}:{int(form_output.time_spent_sec % 60):02d}",
-            'steps': form_output.steps_taken,
-            'backtracks': form_output.backtracks,
-            'errors': form_output.error_counts,
-            'extra_clicks': form_output.extra_clicks,
-            'effectiveness': round(form_output.effectiveness, 1),
-            'efficiency': round(form_output.efficiency, 1),
-            'satisfaction': round(form_output.satisfaction, 1),
-            'usability_index': round(form_output.usability_index, 1)
-        }
-        
-        return Response(analytics_data, status=status.HTTP_200_OK)
+            'journal_seq': seq,
+            'next_update_in_ms': update_interval_ms(values=values)
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    with ingest_load.track():
+        if settings.USABILITY_GROUP_COMMIT:
+            # Committed together with other heartbeats by the group-commit writer
+            form_output = group_commit.writer.submit(write_session_update, session_id, deltas, values).result()
+        else:
+            form_output = write_session_update(session_id, deltas, values)
+    
+    # Return updated analytics, with when to send the next update
+    analytics_data = build_session_analytics(form_output)
+    analytics_data['next_update_in_ms'] = update_interval_ms(form_output)
     
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response(analytics_data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -110,48 +373,152 @@ def complete_session(request, session_id):
     """
     Complete a testing session and create user group entry
     """
+    completion_status, user_group_data, errors = validate_session_completion(request.data)
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    if settings.USABILITY_JOURNAL:
+        seq = journal.append({
+            'type': 'complete', 'session_id': session_id,
+            'completion_status': completion_status, 'user_group_data': user_group_data
+        })
+        return Response({
+            'message': f'Session completion accepted with status: {completion_status}',
+            'session_id': session_id,
+            'journal_seq': seq
+        }, status=status.HTTP_202_ACCEPTED)
+    
     try:
-        form_output = FormOutput.objects.get(session_id=session_id)
+        form_output = write_session_completion(session_id, completion_status, user_group_data)
     except FormOutput.DoesNotExist:
         return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Update final status
-    completion_status = request.data.get('completion_status', 'failure')
-    form_output.completion_status = completion_status
-    form_output.save()
+    serializer = FormOutputSerializer(form_output)
+    return Response({
+        'message': f'Session completed with status: {completion_status}',
+        'data': serializer.data
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def batch_update_sessions(request):
+    """
+    Apply metric updates and completions for many sessions in one request
     
-    # Create UserGroup entry
-    # Map FormOutput completion_status to UserGroup outcome
-    outcome_mapping = {
-        'success': 'success',
-        'partial': 'partial', 
-        'failure': 'failure'
-    }
-    outcome = outcome_mapping.get(completion_status, 'failure')
+    Expects {"updates": [{"session_id": ..., <metric fields>}, ...],
+    "completions": [{"session_id": ..., "completion_status": ..., "user_group_data": {...}}, ...]}.
+    Updates are applied before completions, all sessions are loaded with a single
+    lookup and written back with one bulk_update inside a single transaction.
+    """
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Expected a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
     
-    user_group_data = {
-        'outcome': outcome,
-        **request.data.get('user_group_data', {})
-    }
+    updates = request.data.get('updates', [])
+    completions = request.data.get('completions', [])
     
-    # Auto-populate fields based on FormOutput data for partial completion
-    if outcome == 'partial':
-        user_group_data.setdefault('partial_fields_completed', form_output.fields_completed)
-    elif outcome == 'failure':
-        user_group_data.setdefault('failure_steps_completed', form_output.steps_taken)
+    if not isinstance(updates, list) or not isinstance(completions, list):
+        return Response({'error': 'updates and completions must be lists'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(updates) + len(completions) > MAX_BATCH_SIZE:
+        return Response({'error': f'Batch exceeds {MAX_BATCH_SIZE} entries'}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(isinstance(item, dict) for item in updates + completions):
+        return Response({'error': 'Batch entries must be objects'}, status=status.HTTP_400_BAD_REQUEST)
     
-    UserGroup.objects.create(
-        form_output=form_output,
-        **user_group_data
-    )
+    session_ids = {str(item.get('session_id')) for item in updates + completions if item.get('session_id')}
+    valid_statuses = {choice for choice, _ in FormOutput.COMPLETION_CHOICES}
+    
+    errors = []
+    touched = {}
+    user_groups = []
+    
+    with transaction.atomic():
+        sessions = FormOutput.objects.in_bulk(session_ids, field_name='session_id')
+        
+        for item in updates:
+            form_output = sessions.get(str(item.get('session_id')))
+            if form_output is None:
+                errors.append({'session_id': item.get('session_id'), 'error': 'Session not found'})
+                continue
+            
+            serializer = FormOutputUpdateSerializer(form_output, data=item, partial=True)
+            if not serializer.is_valid():
+                errors.append({'session_id': form_output.session_id, 'error': serializer.errors})
+                continue
+            
+            for attr, value in serializer.validated_data.items():
+                setattr(form_output, attr, value)
+            touched[form_output.session_id] = form_output
+        
+        for item in completions:
+            form_output = sessions.get(str(item.get('session_id')))
+            if form_output is None:
+                errors.append({'session_id': item.get('session_id'), 'error': 'Session not found'})
+                continue
+            
+            completion_status = item.get('completion_status', 'failure')
+            if completion_status not in valid_statuses:
+                errors.append({'session_id': form_output.session_id, 'error': f'Invalid completion_status: {completion_status}'})
+                continue
+            
+            form_output.completion_status = completion_status
+            try:
+                user_groups.append(build_user_group(form_output, completion_status, item.get('user_group_data') or {}))
+            except TypeError as exc:
+                errors.append({'session_id': form_output.session_id, 'error': str(exc)})
+                continue
+            touched[form_output.session_id] = form_output
+        
+        for form_output in touched.values():
+            form_output.update_all_metrics()
+        
+        if touched:
+            FormOutput.objects.bulk_update(
+                touched.values(),
+                fields=FormOutput.INPUT_FIELDS + FormOutput.METRIC_FIELDS + ['metrics_version']
+            )
+        if user_groups:
+            UserGroup.objects.bulk_create(user_groups)
+    
+    for form_output in touched.values():
+        publish_session_analytics(form_output)
+    if user_groups:
+        publish_summary()
     
-    serializer = FormOutputSerializer(form_output)
     return Response({
-        'message': f'Session completed with status: {completion_status}',
-        'data': serializer.data
+        'results': [build_session_analytics(form_output) for form_output in touched.values()],
+        'errors': errors
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def ingest_stats(request):
+    """
+    Counters of this server process's ingest path, for monitoring
+    """
+    return Response({
+        'heartbeat_writes': heartbeat_writes.snapshot(),
+        'admitted_requests': admitted_requests.snapshot(),
+        'shed_requests': shed_requests.snapshot()
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@renderer_classes(SESSION_LIST_RENDERERS)
+def query_sessions(request):
+    """
+    Filter and order sessions on the server, one cursor page at a time
+    """
+    try:
+        sessions, ordering = build_session_query(request.GET)
+        serializer = FormOutputValuesSerializer.from_query_param(request.GET.get('fields'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    paginator = SessionCursorPagination(ordering)
+    page = paginator.paginate_queryset(serializer.values(sessions, 'id', ordering.lstrip('-')), request)
+    return paginator.get_paginated_response(serializer.serialize(page))
+
+
+@conditional_get(session_etag, session_last_modified)
 @api_view(['GET'])
 def get_session_analytics(request, session_id):
     """
@@ -162,112 +529,269 @@ def get_session_analytics(request, session_id):
     except FormOutput.DoesNotExist:
         return Response({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Calculate current step based on form progress (1-7: 6 fields + register button)
-    if form_output.completion_status == 'success':
-        current_step = 7  # All fields + register button completed
-    elif form_output.completion_status == 'partial':
-        current_step = form_output.fields_completed
-    else:  # failure
-        current_step = form_output.fields_completed
-    
-    analytics_data = {
-        'session_id': session_id,
-        'current_step': current_step,
-        'task_time': f"{int(form_output.time_spent_sec // 60)}:{int(form_output.time_spent_sec % 60):02d}",
-        'steps': form_output.steps_taken,
-        'backtracks': form_output.backtracks,
-        'errors': form_output.error_counts,
-        'extra_clicks': form_output.extra_clicks,
-        'effectiveness': round(form_output.effectiveness, 1),
-        'efficiency': round(form_output.efficiency, 1),
-        'satisfaction': round(form_output.satisfaction, 1),
-        'usability_index': round(form_output.usability_index, 1)
-    }
+    analytics_data = build_session_analytics(form_output)
     
     return Response(analytics_data, status=status.HTTP_200_OK)
 
 
-@api_view(['GET'])
-def dashboard_summary(request):
+def build_dashboard_summary():
     """
-    Get overall dashboard summary statistics
+    Compute dashboard summary statistics from the per-status running totals
     """
-    # Get all sessions
-    all_sessions = FormOutput.objects.all()
-    
-    if not all_sessions.exists():
-        # Return empty dashboard data when no sessions exist
-        summary_data = {
-            'total_sessions': 0,
-            'successful_sessions': 0,
-            'partial_sessions': 0,
-            'failed_sessions': 0,
-            'success_rate': 0.0,
-            'avg_effectiveness': 0.0,
-            'avg_efficiency': 0.0,
-            'avg_satisfaction': 0.0,
-            'avg_usability_index': 0.0,
-            'avg_time_spent': 0.0,
-            'avg_steps': 0.0,
-            'avg_backtracks': 0.0,
-            'avg_errors': 0.0
-        }
-        return Response(summary_data, status=status.HTTP_200_OK)
-    
-    # Calculate summary statistics
-    successful_sessions = all_sessions.filter(completion_status='success').count()
-    partial_sessions = all_sessions.filter(completion_status='partial').count()
-    failed_sessions = all_sessions.filter(completion_status='failure').count()
-    total_sessions = all_sessions.count()
-    
-    aggregates = all_sessions.aggregate(
-        avg_effectiveness=Avg('effectiveness'),
-        avg_efficiency=Avg('efficiency'),
-        avg_satisfaction=Avg('satisfaction'),
-        avg_usability_index=Avg('usability_index'),
-        avg_time_spent=Avg('time_spent_sec'),
-        avg_steps=Avg('steps_taken'),
-        avg_backtracks=Avg('backtracks'),
-        avg_errors=Avg('error_counts')
-    )
+    rows = {row.completion_status: row for row in DashboardTotals.current()}
+    
+    def total(field):
+        return sum(getattr(row, DashboardTotals.column(field)) for row in rows.values())
+    
+    def average(field):
+        return round(total(field) / total_sessions, 1) if total_sessions > 0 else 0.0
+    
+    total_sessions = total('sessions')
+    successful_sessions = rows['success'].sessions
     
-    summary_data = {
+    return {
         'total_sessions': total_sessions,
         'successful_sessions': successful_sessions,
-        'partial_sessions': partial_sessions,
-        'failed_sessions': failed_sessions,
+        'partial_sessions': rows['partial'].sessions,
+        'failed_sessions': rows['failure'].sessions,
         'success_rate': round((successful_sessions / total_sessions) * 100, 1) if total_sessions > 0 else 0.0,
-        'avg_effectiveness': round(aggregates['avg_effectiveness'] or 0.0, 1),
-        'avg_efficiency': round(aggregates['avg_efficiency'] or 0.0, 1),
-        'avg_satisfaction': round(aggregates['avg_satisfaction'] or 0.0, 1),
-        'avg_usability_index': round(aggregates['avg_usability_index'] or 0.0, 1),
-        'avg_time_spent': round(aggregates['avg_time_spent'] or 0.0, 1),
-        'avg_steps': round(aggregates['avg_steps'] or 0.0, 1),
-        'avg_backtracks': round(aggregates['avg_backtracks'] or 0.0, 1),
-        'avg_errors': round(aggregates['avg_errors'] or 0.0, 1)
+        'avg_effectiveness': average('effectiveness'),
+        'avg_efficiency': average('efficiency'),
+        'avg_satisfaction': average('satisfaction'),
+        'avg_usability_index': average('usability_index'),
+        'avg_time_spent': average('time_spent_sec'),
+        'avg_steps': average('steps_taken'),
+        'avg_backtracks': average('backtracks'),
+        'avg_errors': average('error_counts')
     }
-    
+
+
+@conditional_get(table_etag)
+@api_view(['GET'])
+def dashboard_summary(request):
+    """
+    Get overall dashboard summary statistics
+    """
+    # Cached until the next write moves the change feed's high-water mark
+    summary_data = cached_for_generation(
+        'dashboard-summary', build_dashboard_summary, request_write_generation(request)
+    )
     return Response(summary_data, status=status.HTTP_200_OK)
 
 
+@conditional_get(table_etag)
 @api_view(['GET'])
+@renderer_classes(SESSION_LIST_RENDERERS)
 def recent_sessions(request):
     """
     Get list of recent sessions for dashboard
+    
+    ?limit=N returns the N newest sessions (at most MAX_PAGE_SIZE) as a list.
+    ?limit=all or ?cursor= pages through every session with a stable cursor.
+    ?fields=a,b returns only those session fields.
     """
-    # Check if we need all sessions for filtering
     limit = request.GET.get('limit', '10')
-    if limit == 'all':
-        sessions = FormOutput.objects.all().order_by('-created_at')
-    else:
-        try:
-            limit_int = int(limit)
-            sessions = FormOutput.objects.all().order_by('-created_at')[:limit_int]
-        except ValueError:
-            sessions = FormOutput.objects.all().order_by('-created_at')[:10]
-    
-    serializer = FormOutputSerializer(sessions, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    try:
+        serializer = FormOutputValuesSerializer.from_query_param(request.GET.get('fields'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    sessions = serializer.values(FormOutput.objects.all(), 'id', 'created_at')
+    
+    if limit == 'all' or 'cursor' in request.GET:
+        paginator = SessionCursorPagination()
+        page = paginator.paginate_queryset(sessions, request)
+        return paginator.get_paginated_response(serializer.serialize(page))
+    
+    try:
+        limit_int = int(limit)
+    except ValueError:
+        limit_int = 10
+    sessions = sessions.order_by('-created_at', '-id')[:max(0, min(limit_int, MAX_PAGE_SIZE))]
+    
+    return Response(serializer.serialize(sessions), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def dashboard_changes(request):
+    """
+    Get the sessions, UserGroup entries and deletions written since a change sequence number
+    
+    Query parameters: since and after (high_water_mark and after of the
+    previous call, since=0 for a full sync) and limit. Call again from
+    high_water_mark and after while has_more.
+    """
+    try:
+        since = int(request.GET.get('since', 0))
+        after = int(request.GET['after']) if request.GET.get('after') else None
+        limit = int(request.GET.get('limit', DEFAULT_CHANGES_LIMIT))
+    except ValueError:
+        return Response({'error': 'since, after and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if since < 0:
+        return Response({'error': 'since must not be negative'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    changes = changes_since(since, after, max(1, min(limit, MAX_CHANGES_LIMIT)))
+    return Response(changes, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def dashboard_trends(request):
+    """
+    Get usability index, success rate and average time per hour or day
+    
+    Reads only the rollup tables. Query parameters: granularity (hour or day),
+    from and to (ISO dates or datetimes, to is exclusive).
+    """
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in TREND_GRANULARITIES:
+        return Response(
+            {'error': f'Invalid granularity. Must be one of: {", ".join(TREND_GRANULARITIES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    bucket_size, default_range = TREND_GRANULARITIES[granularity]
+    
+    end = parse_datetime_param(request.GET['to']) if request.GET.get('to') else timezone.now()
+    start = parse_datetime_param(request.GET['from']) if request.GET.get('from') else end - default_range
+    if start is None or end is None:
+        return Response({'error': 'from and to must be ISO dates or datetimes'}, status=status.HTTP_400_BAD_REQUEST)
+    if start >= end:
+        return Response({'error': 'from must be before to'}, status=status.HTTP_400_BAD_REQUEST)
+    if (end - start) / bucket_size > MAX_TREND_BUCKETS:
+        return Response(
+            {'error': f'Range too large: at most {MAX_TREND_BUCKETS} {granularity} buckets per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Rebuilds the totals and rollups if they were marked stale
+    DashboardTotals.current()
+    rollups = MetricsRollup.objects.filter(
+        granularity=granularity,
+        bucket_start__gte=bucket_start(start, granularity),
+        bucket_start__lt=end
+    ).order_by('bucket_start')
+    
+    buckets = {}
+    for rollup in rollups:
+        bucket = buckets.setdefault(rollup.bucket_start, {'rows': {}, 'sessions': 0})
+        bucket['rows'][rollup.completion_status] = rollup
+        bucket['sessions'] += rollup.sessions
+    
+    trend = []
+    for start_time, bucket in buckets.items():
+        sessions = bucket['sessions']
+        if sessions <= 0:
+            continue
+        rows = bucket['rows'].values()
+        counts = {status_value: row.sessions for status_value, row in bucket['rows'].items()}
+        trend.append({
+            'bucket_start': start_time.isoformat(),
+            'sessions': sessions,
+            'successful_sessions': counts.get('success', 0),
+            'partial_sessions': counts.get('partial', 0),
+            'failed_sessions': counts.get('failure', 0),
+            'success_rate': round(counts.get('success', 0) / sessions * 100, 1),
+            'avg_usability_index': round(sum(row.total('usability_index') for row in rows) / sessions, 1),
+            'avg_time_spent': round(sum(row.total('time_spent_sec') for row in rows) / sessions, 1),
+        })
+    
+    return Response({
+        'granularity': granularity,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'buckets': trend
+    }, status=status.HTTP_200_OK)
+
+
+@require_GET
+def export_sessions(request):
+    """
+    Stream all sessions joined with their UserGroup outcomes as CSV or NDJSON
+    
+    A plain Django view, since the response is streamed rather than rendered.
+    Query parameters: format (csv or ndjson), gzip (1 to compress) and the
+    filters of the session query endpoint.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse(
+            {'error': f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        sessions, _ = build_session_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    use_gzip = request.GET.get('gzip') in ('1', 'true')
+    filename = f'sessions.{export_format}' + ('.gz' if use_gzip else '')
+    response = StreamingHttpResponse(
+        stream_export(sessions, export_format, gzip=use_gzip),
+        content_type='application/gzip' if use_gzip else EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def event_streams_unavailable(request):
+    """
+    501 response when the request is not served by an ASGI server, else None
+    
+    Under WSGI a stream would hold a server thread for as long as the client
+    stays connected, without ever delivering an event. EventSource clients
+    do not reconnect after an error status, and fall back to polling.
+    """
+    if isinstance(request, ASGIRequest):
+        return None
+    return JsonResponse(
+        {'error': 'Event streams need an ASGI server, poll instead'}, status=status.HTTP_501_NOT_IMPLEMENTED
+    )
+
+
+def event_stream_response(stream):
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+async def session_events(request, session_id):
+    """
+    Stream a session's analytics as Server-Sent Events
+    
+    Sends the current analytics, then an 'analytics' event whenever the
+    session's metrics change. Needs an ASGI server (core/asgi.py).
+    """
+    unavailable = event_streams_unavailable(request)
+    if unavailable is not None:
+        return unavailable
+    # Subscribe before reading the snapshot, so no change in between is missed
+    subscription = broker.subscribe(session_topic(session_id))
+    form_output = await FormOutput.objects.filter(session_id=session_id).afirst()
+    if form_output is None:
+        broker.unsubscribe(subscription)
+        return JsonResponse({'error': 'Session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return event_stream_response(
+        EventStream(subscription, [format_event('analytics', build_session_analytics(form_output))])
+    )
+
+
+@require_GET
+async def dashboard_events(request):
+    """
+    Stream dashboard summary changes as Server-Sent Events
+    
+    Sends the full summary, then a 'summary' event with the fields that
+    changed for this client whenever a session completes. Needs an ASGI
+    server (core/asgi.py).
+    """
+    unavailable = event_streams_unavailable(request)
+    if unavailable is not None:
+        return unavailable
+    subscription = broker.subscribe(SUMMARY_TOPIC)
+    summary = await sync_to_async(cached_for_generation)('dashboard-summary', build_dashboard_summary)
+    return event_stream_response(SummaryStream(subscription, summary))
 
 
 @api_view(['GET'])
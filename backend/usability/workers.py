@@ -0,0 +1,27 @@
+"""
+Worker processes for the management commands that split work by primary-key range
+
+Workers are spawned rather than forked, so they start the same way on every
+platform and never inherit the parent's database connections or threads.
+Each one sets Django up from DJANGO_SETTINGS_MODULE before taking work.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+
+
+def init_worker():
+    """Set Django up in a freshly started worker process"""
+    django.setup()
+    connections.close_all()
+
+
+def worker_pool(workers):
+    """ProcessPoolExecutor of `workers` processes ready to use the ORM"""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+    )
@@ -53,6 +53,16 @@ const Dashboard: React.FC = () => {
     }
   }, [location]);
 
+  // Live updates while the page is open
+  useEffect(() => {
+    if (currentSessionId) {
+      return apiService.subscribeToSessionAnalytics(currentSessionId, setSessionAnalytics);
+    }
+    return apiService.subscribeToSummary((changes) => {
+      setDashboardSummary((summary) => (summary ? { ...summary, ...changes } : (changes as DashboardSummary)));
+    });
+  }, [currentSessionId]);
+
   const loadSessionAnalytics = async (sessionId: string) => {
     try {
       setLoading(true);
@@ -1,6 +1,7 @@
 
 import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
+import axios from 'axios';
 import apiService from '../services/api';
 import '../styles/pages/Test.css';
 
@@ -50,23 +51,20 @@ const Test: React.FC = () => {
   const timeIntervalRef = useRef<number | null>(null);
   const startTimeRef = useRef<Date | null>(null);
   const lastClickTimeRef = useRef<{[key: string]: number[]}>({});
-
-  const startNewTest = async () => {
-    try {
-      const response = await apiService.createSession();
-      console.log('Session created successfully:', response);
-      setSessionId(response.session_id);
-      setShowStartModal(false);
-      const now = new Date();
-      setStartTime(now);
-      startTimeRef.current = now;
-      
-      // Start timer immediately and then every second
-      updateTimer();
-      timeIntervalRef.current = setInterval(updateTimer, 1000);
-    } catch (error) {
-      console.error('Failed to create session:', error);
-    }
+  // Delay before the next heartbeat, as hinted by the server
+  const heartbeatDelayRef = useRef(2000);
+
+  const startNewTest = () => {
+    // The backend creates the session on its first metrics update
+    setSessionId(crypto.randomUUID().replace(/-/g, '').slice(0, 16));
+    setShowStartModal(false);
+    const now = new Date();
+    setStartTime(now);
+    startTimeRef.current = now;
+    
+    // Start timer immediately and then every second
+    updateTimer();
+    timeIntervalRef.current = setInterval(updateTimer, 1000);
   };
 
   const updateTimer = () => {
@@ -231,7 +229,7 @@ const Test: React.FC = () => {
     const fieldsCompleted = Object.values(formData).filter(value => value.trim() !== '').length;
     
     try {
-      await apiService.updateSessionMetrics(sessionId, {
+      const analytics = await apiService.updateSessionMetrics(sessionId, {
         time_spent_sec: timeSpent,
         steps_taken: activityMetrics.steps,
         backtracks: activityMetrics.backtracks,
@@ -240,9 +238,16 @@ const Test: React.FC = () => {
         fields_completed: fieldsCompleted,
         completion_status: fieldsCompleted === 6 ? 'success' : fieldsCompleted > 0 ? 'partial' : 'failure'
       });
+      if (analytics?.next_update_in_ms) {
+        heartbeatDelayRef.current = analytics.next_update_in_ms;
+      }
 
 
     } catch (error) {
+      // Shed under load: wait as long as the server asks before the next heartbeat
+      if (axios.isAxiosError(error) && error.response?.status === 429) {
+        heartbeatDelayRef.current = Number(error.response.headers['retry-after'] ?? 2) * 1000;
+      }
       console.error('Failed to update metrics:', error);
     }
   };
@@ -405,6 +410,9 @@ const Test: React.FC = () => {
     }
 
     try {
+      // Save final session metrics, creating the session if no update reached the backend yet
+      await updateSessionMetrics();
+      
       const result = await apiService.completeSession(sessionId, {
         completion_status: 'success',
         user_group_data: {
@@ -458,14 +466,25 @@ const Test: React.FC = () => {
     return fieldsCompleted > 0;
   };
 
-  // Update metrics periodically
+  // Update metrics periodically, as often as the server asks for
   useEffect(() => {
     if (sessionId && startTime && !showStartModal) {
-      const intervalId = setInterval(() => {
-        updateSessionMetrics();
-      }, 2000); // Update every 2 seconds
-
-      return () => clearInterval(intervalId);
+      let cancelled = false;
+      let timeoutId: ReturnType<typeof setTimeout>;
+      const scheduleUpdate = () => {
+        timeoutId = setTimeout(async () => {
+          await updateSessionMetrics();
+          if (!cancelled) {
+            scheduleUpdate();
+          }
+        }, heartbeatDelayRef.current);
+      };
+      scheduleUpdate();
+
+      return () => {
+        cancelled = true;
+        clearTimeout(timeoutId);
+      };
     }
   }, [sessionId, startTime, showStartModal, activityMetrics, extraClicks, formData]);
 
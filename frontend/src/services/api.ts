@@ -43,6 +43,8 @@ export interface SessionAnalytics {
   efficiency: number;
   satisfaction: number;
   usability_index: number;
+  // Milliseconds the server asks the client to wait before its next update
+  next_update_in_ms?: number;
 }
 
 export interface DashboardSummary {
@@ -61,6 +63,95 @@ export interface DashboardSummary {
   avg_errors: number;
 }
 
+export interface SessionPage {
+  next: string | null;
+  next_cursor: string | null;
+  results: FormOutputData[];
+}
+
+// Columnar page (?format=columnar): one array per session field
+export interface ColumnarSessionPage {
+  next: string | null;
+  next_cursor: string | null;
+  results: { [K in keyof FormOutputData]?: FormOutputData[K][] };
+}
+
+// Turns one array per field back into one object per session
+const fromColumns = (columns: ColumnarSessionPage['results']): FormOutputData[] => {
+  const fields = Object.keys(columns) as (keyof FormOutputData)[];
+  const count = fields.length ? columns[fields[0]]!.length : 0;
+  return Array.from({ length: count }, (_, index) =>
+    Object.fromEntries(fields.map((field) => [field, columns[field]![index]])) as unknown as FormOutputData
+  );
+};
+
+// Polling interval used when the server cannot stream events (WSGI)
+const LIVE_POLL_INTERVAL_MS = 10000;
+
+// Listens to a Server-Sent Events stream, and polls instead when the server
+// refuses it (EventSource then closes rather than reconnecting); returns a
+// function stopping the updates
+const subscribe = <T>(path: string, eventName: string, onData: (data: T) => void, poll: () => Promise<T>): (() => void) => {
+  let timer: ReturnType<typeof setInterval> | undefined;
+  const source = new EventSource(`${API_BASE_URL}${path}`);
+  source.addEventListener(eventName, (event) => onData(JSON.parse((event as MessageEvent).data)));
+  source.onerror = () => {
+    if (source.readyState === EventSource.CLOSED && timer === undefined) {
+      timer = setInterval(() => {
+        poll().then(onData).catch((err) => console.error(err));
+      }, LIVE_POLL_INTERVAL_MS);
+    }
+  };
+  return () => {
+    source.close();
+    clearInterval(timer);
+  };
+};
+
+export interface SessionQuery {
+  completion_status?: string;
+  created_after?: string;
+  created_before?: string;
+  min_usability_index?: number;
+  max_usability_index?: number;
+  min_time_spent?: number;
+  max_time_spent?: number;
+  ordering?: string;
+  page_size?: number;
+  cursor?: string;
+}
+
+export interface TrendBucket {
+  bucket_start: string;
+  sessions: number;
+  successful_sessions: number;
+  partial_sessions: number;
+  failed_sessions: number;
+  success_rate: number;
+  avg_usability_index: number;
+  avg_time_spent: number;
+}
+
+export interface DashboardTrends {
+  granularity: 'hour' | 'day';
+  from: string;
+  to: string;
+  buckets: TrendBucket[];
+}
+
+// Rows written after a change sequence number, see /dashboard/changes/
+export interface DashboardChanges {
+  since: number;
+  high_water_mark: number;
+  // Set when the response stopped partway through the rows of high_water_mark
+  after: number | null;
+  has_more: boolean;
+  sessions: FormOutputData[];
+  user_groups: ({ id: number; form_output: number; outcome: 'success' | 'partial' | 'failure' } & Record<string, unknown>)[];
+  deleted_sessions: { id: number; session_id: string }[];
+  deleted_user_groups: number[];
+}
+
 export interface CreateSessionResponse {
   session_id: string;
   message: string;
@@ -109,8 +200,46 @@ export const apiService = {
     return response.data;
   },
 
+  // Pages through every session with the keyset cursor returned by the server,
+  // in the columnar encoding to keep large reads compact
   getAllSessions: async (): Promise<FormOutputData[]> => {
-    const response = await apiClient.get('/dashboard/recent/?limit=all');
+    const sessions: FormOutputData[] = [];
+    let cursor: string | null = null;
+    do {
+      const response: { data: ColumnarSessionPage } = await apiClient.get('/dashboard/recent/', {
+        params: {
+          ...(cursor ? { cursor } : { limit: 'all' }),
+          page_size: 500,
+          format: 'columnar',
+        },
+      });
+      sessions.push(...fromColumns(response.data.results));
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return sessions;
+  },
+
+  querySessions: async (query: SessionQuery = {}): Promise<SessionPage> => {
+    const response = await apiClient.get('/sessions/query/', { params: query });
+    return response.data;
+  },
+
+  getChanges: async (since: number, after?: number | null, limit?: number): Promise<DashboardChanges> => {
+    const response = await apiClient.get('/dashboard/changes/', { params: { since, after: after ?? undefined, limit } });
+    return response.data;
+  },
+
+  // Live updates over Server-Sent Events, or polling without an ASGI server;
+  // each returns a function stopping the updates
+  subscribeToSessionAnalytics: (sessionId: string, onAnalytics: (analytics: SessionAnalytics) => void): (() => void) =>
+    subscribe(`/sessions/${sessionId}/events/`, 'analytics', onAnalytics, () => apiService.getSessionAnalytics(sessionId)),
+
+  // The first event is the full summary, later ones only the changed fields
+  subscribeToSummary: (onSummary: (summary: Partial<DashboardSummary>) => void): (() => void) =>
+    subscribe<Partial<DashboardSummary>>('/dashboard/events/', 'summary', onSummary, () => apiService.getDashboardSummary()),
+
+  getTrends: async (granularity: 'hour' | 'day' = 'day', from?: string, to?: string): Promise<DashboardTrends> => {
+    const response = await apiClient.get('/dashboard/trends/', { params: { granularity, from, to } });
     return response.data;
   },
 };